@@ -29,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its latency covers the rest of the stack
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -59,26 +61,86 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'annapurna_project.wsgi.application'
 
-# PostgreSQL Database
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': 'annapurnadb',
-#         'USER': 'postgres',
-#         'PASSWORD': 'Ashu1565',
-#         'HOST': 'localhost',
-#         'PORT': '5432',
-#     }
-# }
-
-# SQLite Database
-DATABASES = {
+# Database (DB_ENGINE=postgres for production; SQLite is tuned for small single-server sites)
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'annapurnadb'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Keep connections open across requests instead of reconnecting every time,
+            # and check them before reuse so a restarted server does not surface as errors
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            # Server-side cursors do not survive PgBouncer's transaction pooling
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER', '') == '1',
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5')),
+            },
+        }
+    }
+
+    # Optional streaming replica for read-heavy views (see api.routers.replica_reads)
+    if os.getenv('DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'HOST': os.getenv('DB_REPLICA_HOST'),
+            'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            # WAL journal, synchronous=NORMAL and BEGIN IMMEDIATE transactions
+            'ENGINE': 'api.db_backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # Seconds a writer waits for the lock before "database is locked" (SQLite's busy_timeout)
+                'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+            },
+        }
+    }
+
+DATABASE_ROUTERS = ['api.routers.ReadReplicaRouter']
+
+# Cache (locmem per process by default; point at a shared backend such as Redis in production)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'annapurna'),
+        'OPTIONS': {
+            # LocMemCache evicts least recently used entries beyond this size
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '1000')),
+        },
     }
 }
 
+# Slug of the kitchen that registrations and seeded data use when none is given
+DEFAULT_KITCHEN = os.getenv('DEFAULT_KITCHEN', 'main')
+
+# Seconds a cached AI forecast stays valid
+FORECAST_CACHE_TIMEOUT = int(os.getenv('FORECAST_CACHE_TIMEOUT', '300'))
+
+# Fraction of the forest's per-tree predictions spanned by precomputed forecast intervals
+FORECAST_INTERVAL_COVERAGE = float(os.getenv('FORECAST_INTERVAL_COVERAGE', '0.8'))
+
+# Model inference runs on a bounded thread pool; beyond INFERENCE_MAX_PENDING queued batches,
+# or after INFERENCE_TIMEOUT seconds, requests get the heuristic estimate instead
+INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', '2'))
+INFERENCE_MAX_PENDING = int(os.getenv('INFERENCE_MAX_PENDING', '8'))
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', '2'))
+
+# Seconds a rendered menu listing stays cached (entries are also keyed by menu version)
+MENU_CACHE_TIMEOUT = int(os.getenv('MENU_CACHE_TIMEOUT', '3600'))
+
+# Bearer token required to scrape /metrics (empty leaves the endpoint open)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 AUTH_USER_MODEL = 'api.User'
 
 REST_FRAMEWORK = {
@@ -121,8 +183,12 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'if-none-match',
+    'if-modified-since',
 ]
 
+CORS_EXPOSE_HEADERS = ['etag', 'last-modified']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
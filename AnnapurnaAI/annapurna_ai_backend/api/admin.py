@@ -1,36 +1,86 @@
 from django.contrib import admin
-from .models import User, Menu, MenuItem, Attendance, Feedback
+from .models import (
+    User, Menu, MenuItem, Attendance, Feedback, Counter, Ingredient, RecipeLine, Forecast, Kitchen, CalendarDay, MealFeatures
+)
+
+@admin.register(Kitchen)
+class KitchenAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'slug']
+    search_fields = ['name', 'slug']
+    prepopulated_fields = {'slug': ['name']}
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
-    list_display = ['id', 'username', 'email', 'role', 'is_active', 'date_joined']
-    list_filter = ['role', 'is_active']
+    list_display = ['id', 'username', 'email', 'role', 'kitchen', 'is_active', 'date_joined']
+    list_filter = ['kitchen', 'role', 'is_active']
     search_fields = ['username', 'email']
     ordering = ['-date_joined']
 
+class RecipeLineInline(admin.TabularInline):
+    model = RecipeLine
+    extra = 1
+    autocomplete_fields = ['ingredient']
+
 @admin.register(MenuItem)
 class MenuItemAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name', 'category']
+    list_display = ['id', 'name', 'category', 'uptake_rate']
     list_filter = ['category']
     search_fields = ['name']
+    inlines = [RecipeLineInline]
+
+@admin.register(Ingredient)
+class IngredientAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'unit']
+    search_fields = ['name']
 
 @admin.register(Menu)
 class MenuAdmin(admin.ModelAdmin):
-    list_display = ['id', 'meal_date', 'meal_type']
-    list_filter = ['meal_type', 'meal_date']
+    list_display = ['id', 'kitchen', 'meal_date', 'meal_type', 'skip_count']
+    list_filter = ['kitchen', 'meal_type', 'meal_date']
     filter_horizontal = ['items']
+    readonly_fields = ['skip_count']
     ordering = ['-meal_date']
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
-    list_display = ['id', 'student', 'menu', 'status', 'timestamp']
-    list_filter = ['status', 'timestamp']
+    list_display = ['id', 'kitchen', 'student', 'menu', 'status', 'timestamp']
+    list_filter = ['kitchen', 'status', 'timestamp']
     search_fields = ['student__email', 'student__username']
     ordering = ['-timestamp']
 
 @admin.register(Feedback)
 class FeedbackAdmin(admin.ModelAdmin):
-    list_display = ['id', 'student', 'menu_item', 'rating', 'created_at']
-    list_filter = ['rating', 'created_at']
+    list_display = ['id', 'kitchen', 'student', 'menu_item', 'rating', 'created_at']
+    list_filter = ['kitchen', 'rating', 'created_at']
     search_fields = ['student__email', 'comments']
-    ordering = ['created_at']
+    list_select_related = ['student', 'menu_item']
+    # Newest first, served by the created_at index
+    ordering = ['-created_at']
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'value']
+    readonly_fields = ['name', 'value']
+
+@admin.register(Forecast)
+class ForecastAdmin(admin.ModelAdmin):
+    list_display = ['id', 'menu', 'predicted_headcount', 'lower_bound', 'upper_bound', 'model_version', 'computed_at']
+    list_filter = ['menu__kitchen', 'menu__meal_type', 'computed_at']
+    list_select_related = ['menu']
+    ordering = ['-computed_at']
+    readonly_fields = [field.name for field in Forecast._meta.fields]
+
+@admin.register(CalendarDay)
+class CalendarDayAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kitchen', 'date', 'is_holiday', 'is_exam', 'note']
+    list_filter = ['kitchen', 'is_holiday', 'is_exam']
+    ordering = ['-date']
+
+@admin.register(MealFeatures)
+class MealFeaturesAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kitchen', 'meal_date', 'meal_type', 'enrolled_students', 'skips', 'actual_headcount',
+                    'rate_lag_7', 'rate_rolling_7', 'updated_at']
+    list_filter = ['kitchen', 'meal_type', 'is_holiday', 'is_exam']
+    ordering = ['-meal_date']
+    # Derived data, rebuilt by build_meal_features
+    readonly_fields = [field.name for field in MealFeatures._meta.fields]
@@ -0,0 +1,85 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _revoked_key(user_id):
+    return f"auth:revoked:{user_id}"
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject every access token issued to the user up to now.
+
+    The cutoff is a sub-second timestamp compared with the tokens'
+    auth_time claim, so a token issued right after the revocation, even in
+    the same second, is accepted. The entry has to outlive every token it
+    rejects: access tokens minted from an older refresh token keep its
+    auth_time and can be used until the refresh token's lifetime plus
+    their own has passed, so it expires after both. With several processes
+    the cache must be a shared backend for revocations to reach all of them.
+    """
+    lifetime = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'] + settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']
+    cache.set(_revoked_key(user_id), time.time(), timeout=int(lifetime.total_seconds()))
+
+
+def issued_at(token):
+    """
+    Sub-second time the token's login happened.
+
+    Access tokens minted from a refresh token carry the refresh token's
+    auth_time, so they are revoked along with it. Tokens without the claim
+    fall back to their whole-second iat.
+    """
+    return token.get('auth_time', token.get('iat', 0))
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user built from the role, kitchen, email and name claims of a verified access token."""
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @cached_property
+    def kitchen_id(self):
+        return self.token.get('kitchen')
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def username(self):
+        return self.token.get('name', '')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token's claims instead of loading the User row.
+
+    Opt in per view for read-only endpoints: request.user is a ClaimsUser,
+    so filter on request.user.id and request.user.kitchen_id rather than
+    passing the user to the ORM. Tokens issued before a role or kitchen
+    change, deactivation, password change or deletion are rejected through
+    a cached deny-list; tokens without role and kitchen claims fall back to
+    the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token or 'kitchen' not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        revoked_at = cache.get(_revoked_key(user_id))
+        if revoked_at is not None and issued_at(validated_token) < revoked_at:
+            raise AuthenticationFailed("Token has been revoked, please log in again.", code='token_revoked')
+        return ClaimsUser(validated_token)
@@ -0,0 +1,57 @@
+import datetime
+from .forecast_cache import get_cached_predictions
+from .forecasts import precomputed_predictions
+from .models import Menu, Counter
+
+
+def next_meal_type(now=None):
+    """Return the meal type being served next, based on the wall-clock time."""
+    now = now or datetime.datetime.now().time()
+
+    # Define mealtime intervals
+    if datetime.time(5, 0) <= now < datetime.time(11, 0):
+        return 'Breakfast'
+    elif datetime.time(11, 0) <= now < datetime.time(16, 0):
+        return 'Lunch'
+    return 'Dinner'
+
+
+def build_live_snapshot(kitchen_id):
+    """
+    Build the live headcount and forecast for each of a kitchen's menus today.
+
+    Reads the denormalized counters and precomputed or cached forecasts,
+    so it costs three queries however large the attendance table is.
+    """
+    today = datetime.date.today()
+    total_students = Counter.get_value(Counter.student_total(kitchen_id))
+    menus = list(Menu.objects.filter(kitchen_id=kitchen_id, meal_date=today).order_by('id'))
+
+    precomputed = precomputed_predictions(kitchen_id, menus, total_students)
+    computed = iter(get_cached_predictions(kitchen_id, [
+        {
+            'meal_date': menu.meal_date,
+            'meal_type': menu.meal_type,
+            'total_students': total_students,
+            'live_skips': menu.skip_count
+        }
+        for menu in menus if menu.id not in precomputed
+    ]))
+    predictions = [precomputed.get(menu.id) or next(computed) for menu in menus]
+
+    return {
+        "date": today.strftime('%Y-%m-%d'),
+        "next_meal_type": next_meal_type(),
+        "total_students": total_students,
+        "meals": [
+            {
+                "menu_id": menu.id,
+                "type": menu.meal_type,
+                "skipped_students": menu.skip_count,
+                "live_headcount": total_students - menu.skip_count,
+                "predicted_headcount": prediction['predicted_headcount'],
+                "model_version": prediction.get('model_version')
+            }
+            for menu, prediction in zip(menus, predictions)
+        ]
+    }
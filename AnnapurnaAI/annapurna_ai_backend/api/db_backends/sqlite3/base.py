@@ -0,0 +1,30 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite tuned for concurrent web traffic.
+
+    Each connection switches to the WAL journal (readers no longer block the
+    writer) with synchronous=NORMAL, and transactions start with BEGIN
+    IMMEDIATE so a get_or_create waits for the write lock up front instead
+    of failing with "database is locked" when upgrading from a read.
+
+    Extra OPTIONS: journal_mode, synchronous, immediate_transactions.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.journal_mode = params.pop('journal_mode', 'WAL')
+        self.synchronous = params.pop('synchronous', 'NORMAL')
+        self.immediate_transactions = params.pop('immediate_transactions', True)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE" if self.immediate_transactions else "BEGIN")
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from .dashboard import build_live_snapshot, next_meal_type
+
+def _revision_key(kitchen_id):
+    return f'dashboard:revision:{kitchen_id}'
+
+
+def _increment_revision(kitchen_id):
+    key = _revision_key(kitchen_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+        cache.incr(key)
+
+
+def bump_dashboard_revision(kitchen_id):
+    """Record a headcount change in a kitchen once the current transaction commits."""
+    transaction.on_commit(lambda: _increment_revision(kitchen_id))
+
+
+def format_event(event, data, event_id=None):
+    """Encode one Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class DashboardBroker:
+    """
+    Fans one kitchen's dashboard changes out to every stream subscriber in this process.
+
+    A single watcher task per kitchen and process checks the kitchen's
+    shared revision counter (bumped by api.signals on every skip or student
+    change), rebuilds the snapshot once per change and pushes only the
+    meals that changed to each subscriber's queue. The watcher runs only
+    while someone is subscribed, so idle kitchens cost nothing.
+    """
+
+    poll_interval = 1.0
+    queue_size = 100
+
+    def __init__(self, kitchen_id):
+        self.kitchen_id = kitchen_id
+        self._subscribers = set()
+        self._task = None
+        self._state = None
+        self._meals = {}
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._watch())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    async def snapshot(self):
+        snapshot = await sync_to_async(build_live_snapshot)(self.kitchen_id)
+        revision = await cache.aget(_revision_key(self.kitchen_id), 0)
+        return revision, snapshot
+
+    async def _watch(self):
+        # Subscribers start from a full snapshot of their own, so the meals as they are now
+        # are the baseline and only later changes go out as deltas
+        revision = await cache.aget(_revision_key(self.kitchen_id), 0)
+        self._state = (revision, next_meal_type())
+        snapshot = await sync_to_async(build_live_snapshot)(self.kitchen_id)
+        self._meals = {meal['menu_id']: meal for meal in snapshot['meals']}
+
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            revision = await cache.aget(_revision_key(self.kitchen_id), 0)
+            # Meal rollover also changes what managers should see
+            state = (revision, next_meal_type())
+            if state != self._state:
+                self._state = state
+                snapshot = await sync_to_async(build_live_snapshot)(self.kitchen_id)
+                changed = [meal for meal in snapshot['meals'] if self._meals.get(meal['menu_id']) != meal]
+                self._meals = {meal['menu_id']: meal for meal in snapshot['meals']}
+                if changed:
+                    snapshot['meals'] = changed
+                    self._publish(revision, snapshot)
+
+    def _publish(self, revision, delta):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait((revision, delta))
+            except asyncio.QueueFull:
+                # Slow client: skip this delta, it gets a full snapshot when it reconnects
+                pass
+
+
+_brokers = {}
+
+
+def get_broker(kitchen_id):
+    """Return this process's broker for a kitchen, creating it on first subscription."""
+    broker = _brokers.get(kitchen_id)
+    if broker is None:
+        broker = _brokers[kitchen_id] = DashboardBroker(kitchen_id)
+    return broker
@@ -0,0 +1,237 @@
+import bisect
+import datetime
+import logging
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+from ml_model.features import LAG_DAYS, lag_features
+
+logger = logging.getLogger(__name__)
+
+# MealFeatures columns that models may read as inputs, besides meal_type, day_of_week and total_students
+STORE_FEATURES = ('is_holiday', 'is_exam', 'rate_lag_7', 'rate_rolling_7')
+
+
+def enrollment_by_day(kitchen_id):
+    """
+    Running number of a kitchen's students by the day they joined, from one aggregate query.
+
+    Returns:
+        (days, totals) sorted lists; students enrolled on a date are
+        totals[i] for the last days[i] on or before it
+    """
+    from .models import User
+
+    days, totals, running = [], [], 0
+    joined = (
+        User.objects.filter(kitchen_id=kitchen_id, role='student')
+        .annotate(day=TruncDate('date_joined'))
+        .values('day')
+        .annotate(n=Count('id'))
+        .order_by('day')
+    )
+    for row in joined:
+        running += row['n']
+        days.append(row['day'])
+        totals.append(running)
+    return days, totals
+
+
+def refresh_meal_features(kitchen_id, since=None, until=None, today=None, batch_size=500):
+    """
+    Recompute a kitchen's MealFeatures rows for its menus from since through until.
+
+    Skips come from the menus' denormalized skip counts, so no Attendance
+    row is read. Lag features reach back LAG_DAYS before since into rows
+    already in the store, so an incremental refresh only touches the days
+    that changed and the upcoming ones whose lags depend on them. Rows in
+    the range are replaced in one transaction.
+
+    A meal with more skips than students enrolled by join date was skipped
+    by accounts created after it (e.g. imported in bulk), so the kitchen's
+    current student total is used as its enrollment instead.
+
+    Args:
+        kitchen_id: Kitchen whose meals to aggregate
+        since: First date to refresh; None starts from the kitchen's first menu
+        until: Last date to refresh; None runs through its last menu
+        today: Meals before this date count as served (default: today)
+        batch_size: Rows per insert
+
+    Returns:
+        Number of rows written
+    """
+    from .models import CalendarDay, MealFeatures, Menu
+
+    today = today or datetime.date.today()
+    menus = Menu.objects.filter(kitchen_id=kitchen_id)
+    stale = MealFeatures.objects.filter(kitchen_id=kitchen_id)
+    calendar = CalendarDay.objects.filter(kitchen_id=kitchen_id)
+    if since:
+        menus = menus.filter(meal_date__gte=since)
+        stale = stale.filter(meal_date__gte=since)
+        calendar = calendar.filter(date__gte=since)
+    if until:
+        menus = menus.filter(meal_date__lte=until)
+        stale = stale.filter(meal_date__lte=until)
+        calendar = calendar.filter(date__lte=until)
+
+    menus = menus.values_list('meal_date', 'meal_type', 'skip_count').order_by('meal_date', 'meal_type')
+    flags = {day.date: (day.is_holiday, day.is_exam) for day in calendar}
+    days, totals = enrollment_by_day(kitchen_id)
+    current_total = totals[-1] if totals else 0
+
+    rows, backfilled = [], 0
+    for meal_date, meal_type, skips in menus:
+        index = bisect.bisect_right(days, meal_date)
+        enrolled = totals[index - 1] if index else 0
+        if enrolled < skips:
+            enrolled = max(current_total, skips)
+            backfilled += 1
+        served = meal_date < today and enrolled > 0
+        headcount = max(enrolled - skips, 0) if served else None
+        is_holiday, is_exam = flags.get(meal_date, (False, False))
+        rows.append(MealFeatures(
+            kitchen_id=kitchen_id,
+            meal_date=meal_date,
+            meal_type=meal_type,
+            day_of_week=meal_date.weekday(),
+            enrolled_students=enrolled,
+            skips=skips,
+            actual_headcount=headcount,
+            attendance_rate=headcount / enrolled if served else None,
+            is_holiday=is_holiday,
+            is_exam=is_exam,
+        ))
+
+    # Rates of the week before the range, already aggregated, feed the first rows' lags
+    history = []
+    if since:
+        history = list(
+            MealFeatures.objects.filter(
+                kitchen_id=kitchen_id,
+                meal_date__gte=since - datetime.timedelta(days=LAG_DAYS),
+                meal_date__lt=since
+            ).values_list('meal_date', 'meal_type', 'attendance_rate')
+        )
+    series = history + [(row.meal_date, row.meal_type, row.attendance_rate) for row in rows]
+    meal_codes = {}
+    lag, rolling = lag_features(
+        [meal_codes.setdefault(meal_type, len(meal_codes)) for _, meal_type, _ in series],
+        [meal_date.toordinal() for meal_date, _, _ in series],
+        [np.nan if rate is None else rate for _, _, rate in series],
+        missing=np.nan
+    )
+    for row, rate_lag, rate_rolling in zip(rows, lag[len(history):], rolling[len(history):]):
+        row.rate_lag_7 = None if np.isnan(rate_lag) else float(rate_lag)
+        row.rate_rolling_7 = None if np.isnan(rate_rolling) else float(rate_rolling)
+
+    if backfilled:
+        logger.warning(
+            "Kitchen %s: %d meals have more skips than students who had joined by then; "
+            "using the current total of %d students for them.", kitchen_id, backfilled, current_total
+        )
+    with transaction.atomic():
+        stale.delete()
+        MealFeatures.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def next_refresh_date(kitchen_id, lookback_days=1):
+    """
+    First date an incremental refresh of a kitchen's features has to cover.
+
+    Everything after the last served day in the store was upcoming when it
+    was aggregated; the last lookback_days served days are redone too, to
+    pick up late skip corrections. Returns None when nothing has been
+    aggregated yet, i.e. a full build.
+    """
+    from .models import MealFeatures
+
+    last_served = MealFeatures.objects.filter(
+        kitchen_id=kitchen_id, actual_headcount__isnull=False
+    ).aggregate(day=Max('meal_date'))['day']
+    if last_served is None:
+        return None
+    return last_served - datetime.timedelta(days=lookback_days - 1)
+
+
+def stored_meal_features(kitchen_id, start, end):
+    """
+    Return {(meal_date, meal_type): {feature: value, ..., 'updated_at': ...}} for a kitchen's stored meals.
+
+    Args:
+        kitchen_id: Kitchen to read
+        start: First meal date
+        end: Last meal date
+    """
+    from .models import MealFeatures
+
+    stored = MealFeatures.objects.filter(kitchen_id=kitchen_id, meal_date__range=(start, end)).values(
+        'meal_date', 'meal_type', 'updated_at', *STORE_FEATURES
+    )
+    return {(row.pop('meal_date'), row.pop('meal_type')): row for row in stored}
+
+
+def attach_meal_features(kitchen_id, rows):
+    """
+    Add the stored STORE_FEATURES of each meal to prediction rows, in place and in one query.
+
+    Meals the store has no row for are left as they are, so the model
+    reads its default values for them.
+
+    Args:
+        kitchen_id: Kitchen the rows belong to
+        rows: List of dicts with meal_date and meal_type keys
+
+    Returns:
+        rows
+    """
+    if not rows:
+        return rows
+    dates = [row['meal_date'] for row in rows]
+    stored = stored_meal_features(kitchen_id, min(dates), max(dates))
+    for row in rows:
+        features = stored.get((row['meal_date'], row['meal_type']))
+        if features:
+            row.update({name: features[name] for name in STORE_FEATURES})
+    return rows
+
+
+def uses_meal_features(features):
+    """Whether a model with these raw inputs reads anything from the feature store."""
+    return any(name in STORE_FEATURES for name in features)
+
+
+def training_frame(kitchen_ids, since=None, until=None, chunk_size=2000):
+    """
+    DataFrame of the kitchens' served meals in the feature store, oldest first, for training.
+
+    Columns are meal_date, the raw model inputs (enrolled students as
+    total_students, missing lags as their defaults) and actual_attendance.
+
+    Args:
+        kitchen_ids: Kitchens whose meals to read
+        since: Only meals after this date
+        until: Only meals on or before this date
+        chunk_size: Rows fetched per database round trip
+    """
+    import pandas as pd
+    from ml_model.features import FEATURE_DEFAULTS
+    from .models import MealFeatures
+
+    meals = MealFeatures.objects.filter(
+        kitchen_id__in=kitchen_ids, actual_headcount__isnull=False, enrolled_students__gt=0
+    )
+    if since:
+        meals = meals.filter(meal_date__gt=since)
+    if until:
+        meals = meals.filter(meal_date__lte=until)
+    columns = ('meal_date', 'meal_type', 'day_of_week', 'enrolled_students', 'actual_headcount') + STORE_FEATURES
+    rows = meals.values_list(*columns).order_by('meal_date', 'kitchen_id', 'meal_type').iterator(chunk_size=chunk_size)
+
+    frame = pd.DataFrame(list(rows), columns=columns).rename(columns={
+        'enrolled_students': 'total_students', 'actual_headcount': 'actual_attendance'
+    })
+    return frame.fillna(FEATURE_DEFAULTS)
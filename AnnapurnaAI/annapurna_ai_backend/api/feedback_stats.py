@@ -0,0 +1,87 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+HISTOGRAM_FIELDS = {rating: f'rating_{rating}' for rating in range(1, 6)}
+
+
+def apply_feedback(feedbacks, sign=1):
+    """
+    Fold feedback rows into the per-kitchen item aggregates; sign=-1 removes them.
+
+    Deltas are summed per (kitchen, item) and per (kitchen, item, day) in
+    Python first, so a batch costs one atomic F() update per touched row
+    rather than per feedback.
+    """
+    from .models import MenuItemDailyRating, MenuItemRatingStats
+
+    totals = defaultdict(lambda: defaultdict(int))
+    daily = defaultdict(lambda: [0, 0])
+    for feedback in feedbacks:
+        rating = int(feedback.rating)
+        item = totals[(feedback.kitchen_id, feedback.menu_item_id)]
+        item['count'] += 1
+        item['rating_sum'] += rating
+        item['rating_sum_sq'] += rating * rating
+        if rating in HISTOGRAM_FIELDS:
+            item[HISTOGRAM_FIELDS[rating]] += 1
+
+        bucket = daily[(feedback.kitchen_id, feedback.menu_item_id, timezone.localdate(feedback.created_at))]
+        bucket[0] += 1
+        bucket[1] += rating
+
+    if not totals:
+        return
+
+    with transaction.atomic():
+        MenuItemRatingStats.objects.bulk_create(
+            [MenuItemRatingStats(kitchen_id=kitchen_id, menu_item_id=item_id) for kitchen_id, item_id in totals],
+            ignore_conflicts=True
+        )
+        MenuItemDailyRating.objects.bulk_create(
+            [
+                MenuItemDailyRating(kitchen_id=kitchen_id, menu_item_id=item_id, day=day)
+                for kitchen_id, item_id, day in daily
+            ],
+            ignore_conflicts=True
+        )
+        for (kitchen_id, item_id), deltas in totals.items():
+            MenuItemRatingStats.objects.filter(kitchen_id=kitchen_id, menu_item_id=item_id).update(
+                **{field: F(field) + sign * delta for field, delta in deltas.items()}
+            )
+        for (kitchen_id, item_id, day), (count, rating_sum) in daily.items():
+            MenuItemDailyRating.objects.filter(kitchen_id=kitchen_id, menu_item_id=item_id, day=day).update(
+                count=F('count') + sign * count,
+                rating_sum=F('rating_sum') + sign * rating_sum
+            )
+
+
+def rebuild_rating_stats(feedback_model, stats_model, daily_model, batch_size=1000):
+    """Recompute every aggregate from the raw Feedback rows with two GROUP BY queries."""
+    histogram = {field: Count('id', filter=Q(rating=rating)) for rating, field in HISTOGRAM_FIELDS.items()}
+    per_item = feedback_model.objects.values('kitchen', 'menu_item').annotate(
+        count=Count('id'),
+        rating_sum=Sum('rating'),
+        rating_sum_sq=Sum(F('rating') * F('rating')),
+        **histogram
+    ).order_by()
+    per_day = (
+        feedback_model.objects.annotate(day=TruncDate('created_at'))
+        .values('kitchen', 'menu_item', 'day')
+        .annotate(count=Count('id'), rating_sum=Sum('rating'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        daily_model.objects.all().delete()
+        stats_model.objects.bulk_create(
+            [stats_model(kitchen_id=row.pop('kitchen'), menu_item_id=row.pop('menu_item'), **row) for row in per_item],
+            batch_size=batch_size
+        )
+        daily_model.objects.bulk_create(
+            [daily_model(kitchen_id=row.pop('kitchen'), menu_item_id=row.pop('menu_item'), **row) for row in per_day],
+            batch_size=batch_size
+        )
@@ -0,0 +1,131 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from ml_model.features import feature_value
+from ml_model.prediction import get_model, heuristic_predictions, model_features
+from .features import attach_meal_features, uses_meal_features
+from .inference import inference_pool
+
+def _generation_key(kitchen_id):
+    return f'forecast:generation:{kitchen_id}'
+
+
+def _get_generation(kitchen_id):
+    key = _generation_key(kitchen_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, 1, timeout=None)
+        generation = cache.get(key, 1)
+    return generation
+
+
+def invalidate_forecasts(kitchen_id):
+    """Bump a kitchen's forecast generation so its cached predictions become unreachable."""
+    key = _generation_key(kitchen_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+        cache.incr(key)
+
+
+def _cache_key(kitchen_id, version, generation, features, row):
+    return 'forecast:{}:{}:{}:{}'.format(
+        kitchen_id,
+        version,
+        generation,
+        ':'.join(str(feature_value(row, name)) for name in features),
+    )
+
+
+def _lookup(kitchen_id, rows):
+    """
+    Return (keys, cached entries) for rows, or (None, None) when no model is loaded.
+
+    Rows get the meal's stored features attached first when the model reads them.
+    """
+    loaded = get_model(kitchen_id)
+    if loaded is None:
+        return None, None
+    features = model_features(loaded)
+    if uses_meal_features(features):
+        attach_meal_features(kitchen_id, rows)
+    generation = _get_generation(kitchen_id)
+    keys = [_cache_key(kitchen_id, loaded.version, generation, features, row) for row in rows]
+    return keys, cache.get_many(set(keys))
+
+
+def _fresh_entries(keys, missing, fresh):
+    # Heuristic fallbacks from a busy or timed-out pool must not outlive the overload
+    return {
+        keys[index]: prediction
+        for index, prediction in zip(missing, fresh)
+        if prediction['model_version'] is not None
+    }
+
+
+def _merge(keys, cached, missing, fresh):
+    results = [cached.get(key) for key in keys]
+    for index, prediction in zip(missing, fresh):
+        results[index] = prediction
+    return results
+
+
+def get_cached_predictions(kitchen_id, rows):
+    """
+    Return AI predictions for one kitchen's rows, reusing cached results where possible.
+
+    Predictions are keyed on the kitchen, the raw inputs the model reads
+    (meal_type, weekday, total_students and any daily feature store
+    columns), the version of the model serving the kitchen and the
+    kitchen's current forecast generation. Misses are scored
+    together in one batched call on the inference pool.
+
+    Args:
+        kitchen_id: Kitchen the rows belong to
+        rows: List of dicts accepted by ml_model.prediction.get_ai_predictions
+
+    Returns:
+        List of prediction dictionaries, in the same order as rows
+    """
+    keys, cached = _lookup(kitchen_id, rows)
+    if keys is None:
+        # Heuristic fallback is cheap and depends on live skips; don't cache it
+        return heuristic_predictions(rows)
+
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+    if not missing:
+        return [cached[key] for key in keys]
+
+    fresh = inference_pool.predict([rows[index] for index in missing], kitchen_id)
+    new_entries = _fresh_entries(keys, missing, fresh)
+    if new_entries:
+        cache.set_many(new_entries, timeout=settings.FORECAST_CACHE_TIMEOUT)
+    return _merge(keys, cached, missing, fresh)
+
+
+async def aget_cached_predictions(kitchen_id, rows):
+    """Async counterpart of get_cached_predictions, awaiting the inference pool off the event loop."""
+    keys, cached = await sync_to_async(_lookup)(kitchen_id, rows)
+    if keys is None:
+        return heuristic_predictions(rows)
+
+    missing = [index for index, key in enumerate(keys) if key not in cached]
+    if not missing:
+        return [cached[key] for key in keys]
+
+    fresh = await inference_pool.apredict([rows[index] for index in missing], kitchen_id)
+    new_entries = _fresh_entries(keys, missing, fresh)
+    if new_entries:
+        await cache.aset_many(new_entries, timeout=settings.FORECAST_CACHE_TIMEOUT)
+    return _merge(keys, cached, missing, fresh)
+
+
+async def aget_cached_prediction(kitchen_id, meal_date, meal_type, total_students, live_skips):
+    """Cached async counterpart of get_ai_prediction for a single meal."""
+    return (await aget_cached_predictions(kitchen_id, [{
+        'meal_date': meal_date,
+        'meal_type': meal_type,
+        'total_students': total_students,
+        'live_skips': live_skips
+    }]))[0]
@@ -0,0 +1,145 @@
+import datetime
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from ml_model.prediction import (
+    build_prediction, get_ai_forecasts, get_model_features, get_model_version, heuristic_predictions
+)
+from .features import STORE_FEATURES, stored_meal_features, uses_meal_features
+from .models import Counter, Forecast, Menu
+
+
+def latest_forecasts(menus):
+    """
+    Return {menu_id: latest Forecast} for a Menu queryset, in one query.
+
+    Args:
+        menus: Menu queryset to look up
+    """
+    latest = Forecast.objects.filter(menu=OuterRef('pk')).order_by('-computed_at', '-id').values('id')[:1]
+    latest_ids = menus.annotate(latest_forecast_id=Subquery(latest)).values('latest_forecast_id')
+    return {forecast.menu_id: forecast for forecast in Forecast.objects.filter(pk__in=latest_ids)}
+
+
+def forecast_to_prediction(forecast):
+    """Render a stored Forecast as the prediction dictionary served by the API."""
+    if forecast.model_version is None:
+        prediction = heuristic_predictions([{
+            'total_students': forecast.total_students,
+            'live_skips': forecast.live_skips
+        }])[0]
+    else:
+        prediction = build_prediction(forecast.predicted_headcount, forecast.model_version)
+    prediction.update({
+        "lower_bound": forecast.lower_bound,
+        "upper_bound": forecast.upper_bound,
+        "computed_at": forecast.computed_at.isoformat()
+    })
+    return prediction
+
+
+def _features_updated_at(stored, menu):
+    """When a menu's feature store row was aggregated, given stored_meal_features() rows; None if it has none."""
+    meal_features = stored.get((menu.meal_date, menu.meal_type))
+    return meal_features['updated_at'] if meal_features else None
+
+
+def _model_meal_features(kitchen_id, start, end):
+    """stored_meal_features() of a kitchen's meals from start to end, or {} when its model doesn't read them."""
+    features = get_model_features(kitchen_id) or ()
+    return stored_meal_features(kitchen_id, start, end) if uses_meal_features(features) else {}
+
+
+def precomputed_predictions(kitchen_id, menus, total_students):
+    """
+    Return predictions for the menus that have a precomputed forecast still matching its inputs.
+
+    A forecast made before its meal's features were re-aggregated no longer
+    matches when the model reads the feature store.
+
+    Args:
+        kitchen_id: Kitchen the menus belong to
+        menus: List of the kitchen's Menu instances
+        total_students: Current number of students in the kitchen
+
+    Returns:
+        Dictionary of menu id to prediction; menus without a current
+        forecast are left out so callers can compute them on demand
+    """
+    if not menus:
+        return {}
+    version = get_model_version(kitchen_id)
+    latest = latest_forecasts(Menu.objects.filter(pk__in=[menu.id for menu in menus]))
+    dates = [menu.meal_date for menu in menus]
+    stored = _model_meal_features(kitchen_id, min(dates), max(dates)) if latest else {}
+    return {
+        menu.id: forecast_to_prediction(latest[menu.id])
+        for menu in menus
+        if menu.id in latest and latest[menu.id].is_current(
+            total_students, menu.skip_count, version, _features_updated_at(stored, menu)
+        )
+    }
+
+
+def refresh_forecasts(kitchen_id, horizon_days, batch_size=500, coverage=0.8, force=False):
+    """
+    Append fresh forecasts for a kitchen's upcoming menus whose inputs changed.
+
+    When the model reads the daily feature store, a menu whose features
+    were re-aggregated after its latest forecast counts as changed too.
+
+    Args:
+        kitchen_id: Kitchen whose menus to forecast
+        horizon_days: Number of days, starting today, to keep forecast
+        batch_size: Menus scored per model call and insert
+        coverage: Fraction of tree predictions the interval spans
+        force: Recompute every upcoming menu, even if its forecast is current
+
+    Returns:
+        (menus checked, forecasts written)
+    """
+    today = datetime.date.today()
+    end = today + datetime.timedelta(days=horizon_days - 1)
+    menus = Menu.objects.filter(kitchen_id=kitchen_id, meal_date__range=(today, end))
+    total_students = Counter.get_value(Counter.student_total(kitchen_id))
+    version = get_model_version(kitchen_id)
+    stored = _model_meal_features(kitchen_id, today, end)
+    latest = {} if force else latest_forecasts(menus)
+
+    menus = list(menus.order_by('meal_date', 'meal_type'))
+    stale = [
+        menu for menu in menus
+        if menu.id not in latest or not latest[menu.id].is_current(
+            total_students, menu.skip_count, version, _features_updated_at(stored, menu)
+        )
+    ]
+
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        rows = []
+        for menu in batch:
+            meal_features = stored.get((menu.meal_date, menu.meal_type), {})
+            rows.append({
+                **{name: meal_features[name] for name in STORE_FEATURES if name in meal_features},
+                'meal_date': menu.meal_date,
+                'meal_type': menu.meal_type,
+                'total_students': total_students,
+                'live_skips': menu.skip_count
+            })
+        predictions = get_ai_forecasts(rows, coverage=coverage, kitchen_id=kitchen_id)
+        computed_at = timezone.now()
+        Forecast.objects.bulk_create([
+            Forecast(
+                menu=menu,
+                predicted_headcount=prediction['predicted_headcount'],
+                lower_bound=prediction['lower_bound'],
+                upper_bound=prediction['upper_bound'],
+                coverage=coverage if prediction['lower_bound'] is not None else None,
+                model_version=prediction['model_version'],
+                total_students=total_students,
+                live_skips=menu.skip_count,
+                computed_at=computed_at
+            )
+            for menu, prediction in zip(batch, predictions)
+        ])
+
+    return len(menus), len(stale)
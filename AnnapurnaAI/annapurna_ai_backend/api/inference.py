@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from ml_model.prediction import get_ai_predictions, heuristic_predictions
+from .metrics import INFERENCE_FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBusy(Exception):
+    pass
+
+
+class InferencePool:
+    """
+    Runs model inference on a small dedicated thread pool.
+
+    Request threads and the event loop only wait on a future, so slow
+    inference never occupies the thread that serves the ORM for async
+    views. At most max_pending batches may be queued or running; beyond
+    that, and when a batch misses its timeout, callers get the heuristic
+    estimate instead of waiting. Threads rather than processes keep one
+    shared copy of the loaded model; the compiled forest spends most of its
+    time in NumPy.
+    """
+
+    def __init__(self, max_workers, max_pending, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _submit(self, rows, kitchen_id):
+        if not self._slots.acquire(blocking=False):
+            raise InferenceBusy()
+        try:
+            future = self._executor.submit(get_ai_predictions, rows, kitchen_id)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Runs on completion and on cancellation alike
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _fallback(self, rows, reason):
+        INFERENCE_FALLBACKS.labels(reason).inc()
+        logger.warning("Model inference %s; serving heuristic estimates for %d rows.", reason, len(rows))
+        return heuristic_predictions(rows, model_status=f"Heuristic fallback (inference {reason})")
+
+    def predict(self, rows, kitchen_id=None):
+        """Score one kitchen's rows on the pool, blocking the caller for at most timeout seconds."""
+        rows = list(rows)
+        if not rows:
+            return []
+        try:
+            future = self._submit(rows, kitchen_id)
+        except InferenceBusy:
+            return self._fallback(rows, 'busy')
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            return self._fallback(rows, 'timed out')
+
+    async def apredict(self, rows, kitchen_id=None):
+        """Async counterpart of predict; the event loop stays free while the pool works."""
+        rows = list(rows)
+        if not rows:
+            return []
+        try:
+            future = self._submit(rows, kitchen_id)
+        except InferenceBusy:
+            return self._fallback(rows, 'busy')
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return self._fallback(rows, 'timed out')
+
+
+inference_pool = InferencePool(
+    max_workers=settings.INFERENCE_WORKERS,
+    max_pending=settings.INFERENCE_MAX_PENDING,
+    timeout=settings.INFERENCE_TIMEOUT,
+)
@@ -0,0 +1,409 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from api.models import User, Menu, MenuItem, Kitchen
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class QueryCounter:
+    """execute_wrapper hook counting the queries a request issues on this thread's connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class InProcessTransport:
+    """Drives the URL routes through Django's test client, so DB queries can be counted."""
+
+    counts_queries = True
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, token=None, payload=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            # Server errors are recorded as 500s rather than aborting the run
+            client = self._local.client = Client(raise_request_exception=False)
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            if method == 'GET':
+                response = client.get(path, **headers)
+            else:
+                response = client.post(path, payload or {}, content_type='application/json', **headers)
+        elapsed = time.perf_counter() - started
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, elapsed, counter.count
+
+
+class HttpTransport:
+    """Drives a running server over HTTP; query counts are not observable from outside."""
+
+    counts_queries = False
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, token=None, payload=None):
+        data = json.dumps(payload or {}).encode() if method == 'POST' else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header('Content-Type', 'application/json')
+        if token:
+            req.add_header('Authorization', f'Bearer {token}')
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                status_code, raw = response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            status_code, raw = exc.code, exc.read()
+        elapsed = time.perf_counter() - started
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        return status_code, body, elapsed, None
+
+
+class Recorder:
+    """Thread-safe collection of per-endpoint latency samples and query counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def add(self, name, status_code, elapsed, queries):
+        with self._lock:
+            entry = self.samples.setdefault(name, {'latencies': [], 'queries': [], 'errors': 0, 'statuses': {}})
+            entry['latencies'].append(elapsed)
+            if queries is not None:
+                entry['queries'].append(queries)
+            if status_code >= 400:
+                entry['errors'] += 1
+            entry['statuses'][str(status_code)] = entry['statuses'].get(str(status_code), 0) + 1
+
+    def summary(self, wall_time):
+        results = {}
+        for name, entry in sorted(self.samples.items()):
+            latencies = sorted(entry['latencies'])
+            queries = entry['queries']
+            results[name] = {
+                'requests': len(latencies),
+                'errors': entry['errors'],
+                'statuses': entry['statuses'],
+                'throughput_rps': round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+                'mean_ms': round(1000 * sum(latencies) / len(latencies), 2),
+                'p50_ms': round(1000 * percentile(latencies, 0.50), 2),
+                'p95_ms': round(1000 * percentile(latencies, 0.95), 2),
+                'p99_ms': round(1000 * percentile(latencies, 0.99), 2),
+                'max_ms': round(1000 * latencies[-1], 2),
+                'queries_mean': round(sum(queries) / len(queries), 2) if queries else None,
+                'queries_max': max(queries) if queries else None,
+            }
+        return results
+
+
+class Command(BaseCommand):
+    help = 'Run a meal-rush load test against the API routes and report throughput, latency percentiles and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=50, help='Simulated students in the rush (default: 50)')
+        parser.add_argument('--managers', type=int, default=2, help='Simulated managers polling the dashboard (default: 2)')
+        parser.add_argument('--rounds', type=int, default=3, help='Sessions each student runs after logging in (default: 3)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent student workers (default: 16)')
+        parser.add_argument('--ramp-up', type=float, default=2.0, help='Seconds over which students arrive (default: 2.0)')
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between manager dashboard polls (default: 0.5)')
+        parser.add_argument('--skip-probability', type=float, default=0.3, help='Chance a session skips a meal (default: 0.3)')
+        parser.add_argument('--feedback-probability', type=float, default=0.3, help='Chance a session leaves feedback (default: 0.3)')
+        parser.add_argument('--password', default='password123', help='Password of the seeded student accounts')
+        parser.add_argument('--seed-students', type=int, default=0, help='Run populate_data with this many students first')
+        parser.add_argument('--seed-days', type=int, default=7, help='Days of menus to seed with --seed-students (default: 7)')
+        parser.add_argument('--base-url', default=None, help='Drive a running server (e.g. http://localhost:8000) instead of running in-process')
+        parser.add_argument('--timeout', type=float, default=30.0, help='HTTP timeout in seconds with --base-url (default: 30)')
+        parser.add_argument('--inference-rows', type=int, default=93, help='Rows per batched inference measurement (default: 93, a 31-day horizon)')
+        parser.add_argument('--random-seed', type=int, default=42, help='Seed for the simulated behaviour (default: 42)')
+        parser.add_argument('--output', default=None, help='Write machine-readable results to this JSON file')
+        parser.add_argument('--compare', default=None, help='Previous results JSON to print a latency/throughput diff against')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline results {options['compare']}: {exc}")
+
+        # In-process runs log in, skip and leave feedback in the default database; keep them off the
+        # sample database checked into the repository
+        sample_database = os.path.abspath(settings.BASE_DIR / 'db.sqlite3')
+        database = connection.settings_dict['NAME']
+        if not options['base_url'] and connection.vendor == 'sqlite' and os.path.abspath(database) == sample_database:
+            raise CommandError('Refusing to benchmark against the bundled db.sqlite3; '
+                               'point SQLITE_PATH (or DB_ENGINE=postgres) at a scratch database.')
+
+        if options['seed_students']:
+            call_command('populate_data', students=options['seed_students'], days=options['seed_days'],
+                         seed=options['random_seed'], stdout=self.stdout)
+
+        # The rush runs against the default kitchen, which populate_data seeds
+        kitchen = Kitchen.get_default()
+        students = list(
+            User.objects.filter(kitchen=kitchen, role='student')
+            .order_by('id').values_list('email', flat=True)[:options['students']]
+        )
+        if not students:
+            raise CommandError('No student users found; seed some with --seed-students or populate_data.')
+        manager_email, manager_password = self._ensure_manager(kitchen)
+
+        today = datetime.date.today()
+        meal_types = list(Menu.objects.filter(kitchen=kitchen, meal_date=today).values_list('meal_type', flat=True))
+        if not meal_types:
+            raise CommandError(f'No menus for {today}; seed some with --seed-students or populate_data.')
+        item_ids = list(MenuItem.objects.values_list('id', flat=True))
+
+        transport = (
+            HttpTransport(options['base_url'], options['timeout']) if options['base_url'] else InProcessTransport()
+        )
+        recorder = Recorder()
+        rng = random.Random(options['random_seed'])
+        api = '/api'
+
+        def call(name, method, path, token=None, payload=None):
+            status_code, body, elapsed, queries = transport.request(method, api + path, token, payload)
+            recorder.add(name, status_code, elapsed, queries)
+            return status_code, body
+
+        def login(email, password):
+            status_code, body = call('POST login/', 'POST', '/login/', payload={'email': email, 'password': password})
+            return body.get('access') if status_code == 200 and body else None
+
+        def student_session(email, start_delay, session_rng):
+            time.sleep(start_delay)
+            try:
+                token = login(email, options['password'])
+                if not token:
+                    return
+                for _ in range(options['rounds']):
+                    day = today.strftime('%Y-%m-%d')
+                    call('GET student/day/', 'GET', f'/student/day/?date={day}', token)
+                    call('GET menus/', 'GET', f'/menus/?meal_date={day}', token)
+                    call('GET attendance/', 'GET', f'/attendance/?menu__meal_date={day}', token)
+                    if session_rng.random() < options['skip_probability']:
+                        call('POST skip-meal/', 'POST', '/skip-meal/', token,
+                             {'meal_date': day, 'meal_type': session_rng.choice(meal_types)})
+                    if item_ids and session_rng.random() < options['feedback_probability']:
+                        call('POST feedback/', 'POST', '/feedback/', token,
+                             {'item_id': session_rng.choice(item_ids), 'rating': session_rng.randint(1, 5)})
+            finally:
+                connections.close_all()
+
+        def manager_loop(stop):
+            try:
+                token = login(manager_email, manager_password)
+                if not token:
+                    return
+                while not stop.is_set():
+                    call('GET dashboard/', 'GET', '/dashboard/', token)
+                    call('GET dashboard/forecast/', 'GET', '/dashboard/forecast/', token)
+                    stop.wait(options['poll_interval'])
+            finally:
+                connections.close_all()
+
+        self.stdout.write(
+            f"Rush: {len(students)} students x {options['rounds']} rounds, {options['managers']} managers, "
+            f"concurrency {options['concurrency']}, {'HTTP ' + options['base_url'] if options['base_url'] else 'in-process'}"
+        )
+        # Worker threads open their own connections; release this one so SQLite writers are not blocked by it
+        connections.close_all()
+        stop = threading.Event()
+        managers = [threading.Thread(target=manager_loop, args=(stop,), daemon=True) for _ in range(options['managers'])]
+        started = time.perf_counter()
+        for thread in managers:
+            thread.start()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            futures = [
+                pool.submit(student_session, email, rng.uniform(0, options['ramp_up']), random.Random(rng.random()))
+                for email in students
+            ]
+            for future in futures:
+                future.result()
+        stop.set()
+        for thread in managers:
+            thread.join()
+        wall_time = time.perf_counter() - started
+
+        endpoints = recorder.summary(wall_time)
+        total_requests = sum(entry['requests'] for entry in endpoints.values())
+        results = {
+            'meta': self._metadata(options, transport),
+            'totals': {
+                'wall_time_s': round(wall_time, 3),
+                'requests': total_requests,
+                'errors': sum(entry['errors'] for entry in endpoints.values()),
+                'throughput_rps': round(total_requests / wall_time, 2) if wall_time else 0.0,
+            },
+            'endpoints': endpoints,
+            'inference': self._measure_inference(options['inference_rows']),
+        }
+
+        self._print_results(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        if baseline:
+            self._print_comparison(baseline, results)
+
+    def _ensure_manager(self, kitchen):
+        email, password = 'benchmark-manager@annapurna.local', 'benchmark-manager'
+        # Looked up by email (the login field), so an account already using the address is reused, not duplicated
+        manager, created = User.objects.get_or_create(
+            email=email, defaults={'username': 'benchmark-manager', 'role': 'manager', 'kitchen': kitchen}
+        )
+        if (created or not manager.check_password(password) or manager.kitchen_id != kitchen.id
+                or manager.role != 'manager'):
+            manager.kitchen = kitchen
+            manager.role = 'manager'
+            manager.set_password(password)
+            manager.save()
+        return manager.email, password
+
+    def _measure_inference(self, rows):
+        from ml_model.prediction import get_ai_predictions, registry
+
+        started = time.perf_counter()
+        loaded = registry.get()
+        load_ms = (time.perf_counter() - started) * 1000
+        if loaded is None:
+            return {'model_loaded': False}
+
+        today = datetime.date.today()
+        batch = [
+            {
+                'meal_date': today + datetime.timedelta(days=i // 3),
+                'meal_type': ('Breakfast', 'Lunch', 'Dinner')[i % 3],
+                'total_students': 5000,
+                'live_skips': 0,
+            }
+            for i in range(rows)
+        ]
+        single, batched = [], []
+        for _ in range(50):
+            started = time.perf_counter()
+            get_ai_predictions(batch[:1])
+            single.append(time.perf_counter() - started)
+        for _ in range(20):
+            started = time.perf_counter()
+            get_ai_predictions(batch)
+            batched.append(time.perf_counter() - started)
+        single.sort()
+        batched.sort()
+        return {
+            'model_loaded': True,
+            'model_version': loaded.version,
+            'load_ms': round(load_ms, 3),
+            'single_p50_ms': round(1000 * percentile(single, 0.5), 3),
+            'single_p95_ms': round(1000 * percentile(single, 0.95), 3),
+            'batch_rows': rows,
+            'batch_p50_ms': round(1000 * percentile(batched, 0.5), 3),
+            'batch_p95_ms': round(1000 * percentile(batched, 0.95), 3),
+        }
+
+    def _metadata(self, options, transport):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        config = {
+            key: options[key] for key in (
+                'students', 'managers', 'rounds', 'concurrency', 'ramp_up', 'poll_interval',
+                'skip_probability', 'feedback_probability', 'base_url', 'random_seed',
+            )
+        }
+        return {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': commit,
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'transport': 'http' if options['base_url'] else 'in-process',
+            'counts_queries': transport.counts_queries,
+            'dataset': {
+                'students': User.objects.filter(role='student').count(),
+                'menus': Menu.objects.count(),
+            },
+            'config': config,
+        }
+
+    def _print_results(self, results):
+        self.stdout.write('')
+        self.stdout.write(f"{'endpoint':<26}{'reqs':>7}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, entry in results['endpoints'].items():
+            queries = '-' if entry['queries_mean'] is None else f"{entry['queries_mean']:g}"
+            self.stdout.write(
+                f"{name:<26}{entry['requests']:>7}{entry['errors']:>6}{entry['throughput_rps']:>9}"
+                f"{entry['p50_ms']:>10}{entry['p95_ms']:>10}{entry['p99_ms']:>10}{queries:>9}"
+            )
+        totals = results['totals']
+        self.stdout.write(
+            f"\nTotal: {totals['requests']} requests, {totals['errors']} errors in {totals['wall_time_s']}s "
+            f"({totals['throughput_rps']} req/s)"
+        )
+        inference = results['inference']
+        if inference.get('model_loaded'):
+            self.stdout.write(
+                f"Inference: single row p50 {inference['single_p50_ms']} ms, "
+                f"{inference['batch_rows']} rows p50 {inference['batch_p50_ms']} ms (model {inference['model_version']})"
+            )
+        else:
+            self.stdout.write(self.style.WARNING('Inference: no model loaded'))
+
+    def _print_comparison(self, baseline, results):
+        self.stdout.write(f"\nComparison with {baseline['meta'].get('git_commit') or 'baseline'} (negative latency change is better):")
+        self.stdout.write(f"{'endpoint':<26}{'p50 ms':>18}{'p95 ms':>18}{'rps':>18}")
+
+        def change(old, new):
+            if not old:
+                return f"{new:>18}"
+            return f"{new:>9} ({100 * (new - old) / old:+.0f}%)".rjust(18)
+
+        for name, entry in results['endpoints'].items():
+            previous = baseline['endpoints'].get(name)
+            if previous is None:
+                self.stdout.write(f"{name:<26}{'(new endpoint)':>18}")
+                continue
+            self.stdout.write(
+                f"{name:<26}{change(previous['p50_ms'], entry['p50_ms'])}"
+                f"{change(previous['p95_ms'], entry['p95_ms'])}"
+                f"{change(previous['throughput_rps'], entry['throughput_rps'])}"
+            )
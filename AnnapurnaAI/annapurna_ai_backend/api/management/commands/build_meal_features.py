@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.features import next_refresh_date, refresh_meal_features
+from api.models import Kitchen
+import datetime
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Incrementally update the daily meal feature store (one row per kitchen, date and meal) '
+        'from menus, skip counts, enrollment and the holiday/exam calendar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kitchen', default=None, help='Slug of the only kitchen to update (default: all)')
+        parser.add_argument('--since', type=datetime.date.fromisoformat, default=None,
+                            help='Re-aggregate from this date (YYYY-MM-DD), e.g. after editing the calendar')
+        parser.add_argument('--rebuild', action='store_true', help='Re-aggregate every menu from scratch')
+        parser.add_argument('--lookback-days', type=int, default=1,
+                            help='Already aggregated served days to redo for late skip changes (default: 1)')
+        parser.add_argument('--horizon-days', type=int, default=14,
+                            help='Days ahead, including today, to aggregate upcoming menus for (default: 14)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per insert (default: 500)')
+
+    def handle(self, *args, **options):
+        kitchens = Kitchen.objects.order_by('slug')
+        if options['kitchen']:
+            kitchens = kitchens.filter(slug=options['kitchen'])
+            if not kitchens.exists():
+                raise CommandError(f"Kitchen '{options['kitchen']}' does not exist.")
+
+        today = datetime.date.today()
+        until = today + datetime.timedelta(days=options['horizon_days'] - 1)
+        for kitchen in kitchens:
+            started = time.perf_counter()
+            if options['rebuild']:
+                since = None
+            else:
+                since = options['since'] or next_refresh_date(kitchen.id, options['lookback_days'])
+            written = refresh_meal_features(
+                kitchen.id, since=since, until=until, today=today, batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                f'  {kitchen.slug}: {written} meals from {since or "the first menu"} to {until} '
+                f'in {time.perf_counter() - started:.2f}s'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Meal features updated.'))
@@ -1,14 +1,56 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from api.models import User, MenuItem, Menu, Attendance
+from django.db import transaction
+from django.utils import timezone
+from api.menu_versions import bump_items_version, bump_menu_versions
+from api.prep import bump_recipe_version
+from api.models import User, MenuItem, Menu, Attendance, Ingredient, RecipeLine, Kitchen
 import datetime
 import random
+import time
 
 
 class Command(BaseCommand):
-    help = 'Populate database with 1000 users and attendance data'
+    help = 'Populate database with students, menus and attendance data (sizes are configurable)'
 
-    def handle(self, *args, **kwargs):
-        self.stdout.write(self.style.SUCCESS('Starting data population...'))
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Number of student users (default: 1000)')
+        parser.add_argument('--days', type=int, default=1, help='Number of days of menus, ending today (default: 1)')
+        parser.add_argument('--skip-rate', type=float, default=0.2, help='Average fraction of students skipping a meal (default: 0.2)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert and transaction (default: 5000)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible datasets')
+        parser.add_argument('--kitchen', default=None,
+                            help='Slug of the kitchen to populate, created if missing (default: the default kitchen)')
+
+    def _report(self, label, rows, started):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(f'  {label}: {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)')
+
+    def _bulk_insert(self, model, objects, batch_size):
+        # One transaction per chunk keeps lock hold times and memory bounded
+        for start in range(0, len(objects), batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objects[start:start + batch_size], ignore_conflicts=True)
+
+    def handle(self, *args, **options):
+        num_students = options['students']
+        num_days = options['days']
+        skip_rate = options['skip_rate']
+        batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+
+        if options['kitchen']:
+            kitchen, _ = Kitchen.objects.get_or_create(
+                slug=options['kitchen'], defaults={'name': options['kitchen'].replace('-', ' ').title()}
+            )
+        else:
+            kitchen = Kitchen.get_default()
+        # Accounts are global, so other kitchens' students get prefixed usernames and emails
+        prefix = '' if kitchen.slug == settings.DEFAULT_KITCHEN else f'{kitchen.slug}-'
+
+        self.stdout.write(self.style.SUCCESS(f'Starting data population for kitchen {kitchen.slug}...'))
         
         # Create menu items
         self.stdout.write('Creating menu items...')
@@ -30,95 +72,145 @@ class Command(BaseCommand):
             ("Pickle", "Side"),
         ]
         
-        menu_items = []
-        for name, category in items_data:
-            item, created = MenuItem.objects.get_or_create(
-                name=name,
-                defaults={'category': category}
-            )
-            menu_items.append(item)
-            if created:
-                self.stdout.write(f'  Created: {name}')
-        
-        # Create today's menus
-        self.stdout.write('\nCreating today menus...')
-        today = datetime.date.today()
-        
-        breakfast_menu, _ = Menu.objects.get_or_create(
-            meal_date=today,
-            meal_type='Breakfast'
+        MenuItem.objects.bulk_create(
+            [MenuItem(name=name, category=category) for name, category in items_data],
+            ignore_conflicts=True
         )
-        breakfast_menu.items.set([menu_items[0], menu_items[1]])
+        items = {item.name: item for item in MenuItem.objects.filter(name__in=[name for name, _ in items_data])}
+        breakfast_items = [items[name] for name, category in items_data if category == 'Breakfast']
+        main_items = [items[name] for name, category in items_data if category == 'Main']
+        side_items = [items[name] for name, category in items_data if category == 'Side']
+
+        # Sample recipes (kg per portion) so prep sheets are ingredient-accurate out of the box
+        recipes_data = {
+            "Poha with Tea": [("Poha", 0.06), ("Milk", 0.1), ("Tea Leaves", 0.003)],
+            "Idli Sambar": [("Rice", 0.05), ("Urad Dal", 0.02), ("Toor Dal", 0.025)],
+            "Aloo Paratha": [("Wheat Flour", 0.1), ("Potato", 0.08), ("Oil", 0.01)],
+            "Paneer Butter Masala": [("Paneer", 0.08), ("Tomato", 0.05), ("Butter", 0.01)],
+            "Dal Tadka": [("Toor Dal", 0.06), ("Oil", 0.005)],
+            "Rajma Chawal": [("Rajma", 0.06), ("Rice", 0.08)],
+            "Chole Bhature": [("Chickpeas", 0.07), ("Maida", 0.1), ("Oil", 0.02)],
+            "Basmati Rice": [("Rice", 0.1)],
+            "Roti": [("Wheat Flour", 0.08)],
+            "Dal Makhani": [("Urad Dal", 0.05), ("Rajma", 0.01), ("Butter", 0.01)],
+            "Mixed Veg Curry": [("Mixed Vegetables", 0.1), ("Oil", 0.01)],
+            "Garden Salad": [("Mixed Vegetables", 0.05)],
+            "Raita": [("Curd", 0.08)],
+            "Pickle": [("Pickle", 0.01)],
+        }
+        ingredient_names = {name for lines in recipes_data.values() for name, _ in lines}
+        Ingredient.objects.bulk_create([Ingredient(name=name) for name in ingredient_names], ignore_conflicts=True)
+        ingredients = {ingredient.name: ingredient for ingredient in Ingredient.objects.filter(name__in=ingredient_names)}
+        RecipeLine.objects.bulk_create([
+            RecipeLine(menu_item=items[item_name], ingredient=ingredients[name], quantity_per_portion=quantity)
+            for item_name, lines in recipes_data.items()
+            for name, quantity in lines
+        ], ignore_conflicts=True)
+        bump_recipe_version()
         
-        lunch_menu, _ = Menu.objects.get_or_create(
-            meal_date=today,
-            meal_type='Lunch'
+        # Create menus for every day in the range
+        today = datetime.date.today()
+        start_date = today - datetime.timedelta(days=num_days - 1)
+        self.stdout.write(f'\nCreating menus from {start_date} to {today}...')
+        started = time.perf_counter()
+
+        self._bulk_insert(Menu, [
+            Menu(kitchen=kitchen, meal_date=start_date + datetime.timedelta(days=offset), meal_type=meal_type)
+            for offset in range(num_days)
+            for meal_type, _ in Menu.MEAL_TYPE_CHOICES
+        ], batch_size)
+        menus = list(
+            Menu.objects.filter(kitchen=kitchen, meal_date__range=(start_date, today))
+            .order_by('meal_date', 'meal_type')
         )
-        lunch_menu.items.set([menu_items[3], menu_items[7], menu_items[11]])
-        
-        dinner_menu, _ = Menu.objects.get_or_create(
-            meal_date=today,
-            meal_type='Dinner'
+
+        # Rotate dishes through the menus; existing menu items are left untouched
+        MenuItems = Menu.items.through
+        menus_with_items = set(
+            MenuItems.objects.filter(menu__in=menus).values_list('menu_id', flat=True).distinct()
         )
-        dinner_menu.items.set([menu_items[9], menu_items[7], menu_items[12]])
-        
-        self.stdout.write(self.style.SUCCESS('  Menus created'))
+        links = []
+        for menu in menus:
+            if menu.id in menus_with_items:
+                continue
+            day = menu.meal_date.toordinal()
+            if menu.meal_type == 'Breakfast':
+                chosen = [breakfast_items[day % len(breakfast_items)], breakfast_items[(day + 1) % len(breakfast_items)]]
+            else:
+                offset = 0 if menu.meal_type == 'Lunch' else 3
+                chosen = [
+                    main_items[(day + offset) % len(main_items)],
+                    items['Basmati Rice'],
+                    side_items[(day + offset) % len(side_items)],
+                ]
+            links.extend(MenuItems(menu_id=menu.id, menuitem_id=item.id) for item in set(chosen))
+        self._bulk_insert(MenuItems, links, batch_size)
+        # bulk_create bypasses signals, so invalidate cached menu listings here
+        bump_menu_versions(kitchen.id, {menu.meal_date for menu in menus})
+        bump_items_version()
+        self._report('Menus', len(menus), started)
         
-        # Create 1000 students
-        self.stdout.write('\nCreating 1000 student users...')
-        students_created = 0
-        
-        for i in range(1, 1001):
-            username = f'student{i:04d}'
-            email = f'student{i:04d}@university.edu'
-            
-            if not User.objects.filter(email=email).exists():
-                User.objects.create_user(
-                    username=username,
-                    email=email,
-                    password='password123',
-                    role='student'
-                )
-                students_created += 1
-                
-                if i % 100 == 0:
-                    self.stdout.write(f'  Created {i} users...')
-        
-        self.stdout.write(self.style.SUCCESS(f'  Total: {students_created} new students'))
+        # Create students, hashing the shared password once instead of per user
+        self.stdout.write(f'\nCreating {num_students} student users...')
+        started = time.perf_counter()
+        password = make_password('password123')
+        # ignore_conflicts silently drops accounts left by an earlier run, so report what was really inserted
+        students = User.objects.filter(kitchen=kitchen, role='student')
+        existing_students = students.count()
+        # Joined before the first generated meal, so the feature store counts them as enrolled for it
+        date_joined = timezone.make_aware(datetime.datetime.combine(start_date, datetime.time.min))
+        self._bulk_insert(User, [
+            User(
+                username=f'{prefix}student{i:04d}',
+                email=f'{prefix}student{i:04d}@university.edu',
+                password=password,
+                role='student',
+                kitchen=kitchen,
+                date_joined=date_joined
+            )
+            for i in range(1, num_students + 1)
+        ], batch_size)
+        student_ids = list(students.values_list('id', flat=True))
+        self._report('Students', len(student_ids) - existing_students, started)
         
         # Create attendance records
-        all_students = list(User.objects.filter(role='student'))
-        self.stdout.write(f'\nTotal students in database: {len(all_students)}')
+        self.stdout.write(f'\nTotal students in kitchen {kitchen.slug}: {len(student_ids)}')
         
         self.stdout.write('\nCreating attendance records...')
-        meals = [
-            ('Breakfast', breakfast_menu),
-            ('Lunch', lunch_menu),
-            ('Dinner', dinner_menu)
-        ]
-        
-        total_skips = 0
-        for meal_name, menu in meals:
-            num_to_skip = min(200, len(all_students))
-            skipping_students = random.sample(all_students, num_to_skip)
-            
-            for student in skipping_students:
-                Attendance.objects.get_or_create(
-                    student=student,
-                    menu=menu,
-                    defaults={'status': 'Skipped'}
-                )
-                total_skips += 1
-            
-            attending = len(all_students) - num_to_skip
-            self.stdout.write(f'  {meal_name}: {num_to_skip} skipped, {attending} attending')
+        started = time.perf_counter()
+        skips = Attendance.objects.filter(kitchen=kitchen)
+        existing_skips = skips.count()
+        pending = []
+        for menu in menus:
+            # Weekends see more students eating out; jitter the rate per meal
+            rate = skip_rate * (1.5 if menu.meal_date.weekday() >= 5 else 1.0) * rng.uniform(0.8, 1.2)
+            num_to_skip = min(int(len(student_ids) * min(rate, 0.95)), len(student_ids))
+            pending.extend(
+                Attendance(kitchen=kitchen, student_id=student_id, menu_id=menu.id, status='Skipped')
+                for student_id in rng.sample(student_ids, num_to_skip)
+            )
+
+            if len(pending) >= batch_size:
+                self._bulk_insert(Attendance, pending, batch_size)
+                pending = []
+        self._bulk_insert(Attendance, pending, batch_size)
+        # Students who already skipped a meal in an earlier run are not inserted twice
+        total_skips = skips.count() - existing_skips
+        self._report('Attendance', total_skips, started)
+
+        # bulk_create bypasses signals, so rebuild the denormalized counters
+        self.stdout.write('')
+        call_command('rebuild_counters', stdout=self.stdout)
         
         # Summary
         self.stdout.write(self.style.SUCCESS('\n' + '='*60))
         self.stdout.write(self.style.SUCCESS('DATA POPULATION COMPLETE'))
         self.stdout.write(self.style.SUCCESS('='*60))
-        self.stdout.write(f'Total students: {len(all_students)}')
-        self.stdout.write(f'Total skip records: {total_skips}')
+        self.stdout.write(f'Total students: {len(student_ids)}')
+        self.stdout.write(f'Total menus: {len(menus)}')
+        self.stdout.write(f'Skip records inserted: {total_skips}')
         self.stdout.write('\nLogin credentials:')
-        self.stdout.write('  Email: student0001@university.edu to student1000@university.edu')
+        self.stdout.write(
+            f'  Email: {prefix}student0001@university.edu to {prefix}student{num_students:04d}@university.edu'
+        )
         self.stdout.write('  Password: password123')
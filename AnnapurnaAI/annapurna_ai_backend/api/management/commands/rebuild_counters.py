@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from api.events import bump_dashboard_revision
+from api.forecast_cache import invalidate_forecasts
+from api.models import User, Menu, Attendance, Counter, Kitchen
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized menu skip counters and per-kitchen student totals from raw rows'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding headcount counters...')
+
+        skip_count = Subquery(
+            Attendance.objects.filter(menu=OuterRef('pk'))
+            .values('menu')
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        )
+
+        with transaction.atomic():
+            menus_updated = Menu.objects.update(skip_count=Coalesce(skip_count, 0))
+            # One GROUP BY for every kitchen's total
+            totals = dict(
+                User.objects.filter(role='student', kitchen__isnull=False)
+                .values_list('kitchen')
+                .annotate(total=Count('pk'))
+                .order_by()
+            )
+            Counter.objects.filter(name__startswith=f'{Counter.STUDENT_TOTAL}:').delete()
+            Counter.objects.bulk_create([
+                Counter(name=Counter.student_total(kitchen_id), value=total)
+                for kitchen_id, total in totals.items()
+            ])
+
+            # The bulk update fires no signals, so drop cached forecasts and wake live dashboards here
+            for kitchen_id in Kitchen.objects.values_list('pk', flat=True):
+                invalidate_forecasts(kitchen_id)
+                bump_dashboard_revision(kitchen_id)
+
+        self.stdout.write(f'  Menus updated: {menus_updated}')
+        self.stdout.write(f'  Total students: {sum(totals.values())} in {len(totals)} kitchen(s)')
+        self.stdout.write(self.style.SUCCESS('Counters rebuilt.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from api.feedback_stats import rebuild_rating_stats
+from api.models import Feedback, MenuItemRatingStats, MenuItemDailyRating
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-kitchen item rating statistics and daily rating buckets from raw feedback'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write('Rebuilding rating statistics...')
+        rebuild_rating_stats(Feedback, MenuItemRatingStats, MenuItemDailyRating)
+        self.stdout.write(f'  Kitchen items: {MenuItemRatingStats.objects.count()}')
+        self.stdout.write(f'  Daily buckets: {MenuItemDailyRating.objects.count()}')
+        self.stdout.write(self.style.SUCCESS('Rating statistics rebuilt.'))
@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.features import training_frame
+from api.models import Kitchen
+import datetime
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Incrementally retrain the shared attendance model, or one kitchen\'s own model, '
+        'on the daily meal features of the meals served since the last run'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trees', type=int, default=20,
+                            help='Trees to grow on the new data (default: 20; 100 with --full)')
+        parser.add_argument('--max-trees', type=int, default=300, help='Forest size cap; oldest trees are dropped (default: 300)')
+        parser.add_argument('--min-rows', type=int, default=21, help='Skip retraining below this many new meals (default: 21)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip (default: 2000)')
+        parser.add_argument('--kitchen', default=None,
+                            help='Slug of a kitchen to train its own model for, starting from the shared one '
+                                 '(default: train the shared model on every kitchen)')
+        parser.add_argument('--full', action='store_true',
+                            help='Train a new forest on every stored meal with all model features, instead of '
+                                 'growing trees on the current model (needed once to move a model onto the '
+                                 'feature store inputs)')
+
+    def handle(self, *args, **options):
+        # Imported here so other management commands don't pay for pandas and sklearn
+        import joblib
+        from ml_model.features import FEATURES
+        from ml_model.prediction import get_kitchen_registry, kitchen_model_dir, model_dir, model_path, registry
+        from ml_model.train_model import (
+            fit_model, is_forest, load_checkpoint, save_checkpoint, save_model, update_model
+        )
+
+        if options['kitchen']:
+            try:
+                kitchen = Kitchen.objects.get(slug=options['kitchen'])
+            except Kitchen.DoesNotExist:
+                raise CommandError(f"Kitchen '{options['kitchen']}' does not exist.")
+            kitchen_ids = [kitchen.id]
+            output_dir = kitchen_model_dir(kitchen.id)
+            os.makedirs(output_dir, exist_ok=True)
+            target_registry = get_kitchen_registry(kitchen.id)
+        else:
+            kitchen_ids = list(Kitchen.objects.values_list('id', flat=True))
+            output_dir = model_dir
+            target_registry = registry
+
+        checkpoint = load_checkpoint(output_dir)
+        since = checkpoint.get('last_trained_date')
+        since = datetime.date.fromisoformat(since) if since and not options['full'] else None
+        # Only fully served days are final
+        until = datetime.date.today() - datetime.timedelta(days=1)
+        self.stdout.write(f'Collecting meal features after {since or "the beginning"} up to {until}...')
+
+        started = time.perf_counter()
+        df = training_frame(kitchen_ids, since, until, chunk_size=options['chunk_size'])
+        if len(df) < options['min_rows']:
+            self.stdout.write(self.style.WARNING(
+                f'Only {len(df)} new meals (need {options["min_rows"]}); nothing to do. '
+                f'Has build_meal_features run?'
+            ))
+            return
+        y = df['actual_attendance']
+        self.stdout.write(f'  {len(df)} meals in {time.perf_counter() - started:.2f}s')
+
+        started = time.perf_counter()
+        if options['full']:
+            X = df[list(FEATURES)]
+            model = fit_model(X, y, n_estimators=max(options['trees'], 100))
+            trained = 'a new forest'
+        else:
+            # A kitchen's first model grows its trees on top of the shared forest
+            base_path = os.path.join(output_dir, 'annapurna_model.joblib')
+            if not os.path.exists(base_path):
+                base_path = model_path
+            try:
+                model = joblib.load(base_path)
+            except FileNotFoundError:
+                raise CommandError("Model file 'annapurna_model.joblib' not found. Please run train_model.py first.")
+            if not is_forest(model):
+                raise CommandError('The deployed model is not a random forest and cannot grow new trees; '
+                                   'use --full or select_model to replace it.')
+            # New trees must read the same inputs as the ones already in the forest
+            X = df[list(model.feature_names_in_)]
+            update_model(model, X, y, new_trees=options['trees'], max_trees=options['max_trees'])
+            trained = f'{options["trees"]} new trees'
+        self.stdout.write(f'  Trained {trained} in {time.perf_counter() - started:.2f}s')
+
+        version = checkpoint.get('version', 0) + 1
+        save_model(model, X, model_dir=output_dir, version=version)
+        checkpoint = save_checkpoint(model, version, df['meal_date'].max(), len(df), model_dir=output_dir)
+
+        # Pick up the new artifact now rather than after the reload interval
+        target_registry.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["kitchen"] or "Shared"} model v{version} trained through '
+            f'{checkpoint["last_trained_date"]} ({checkpoint["trees"]} trees).'
+        ))
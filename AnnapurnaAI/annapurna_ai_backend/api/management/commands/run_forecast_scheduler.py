@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+from api.events import bump_dashboard_revision
+from api.forecasts import refresh_forecasts
+from api.models import Kitchen
+import time
+
+
+class Command(BaseCommand):
+    help = 'Keep precomputed forecasts for upcoming menus up to date (long-running worker, or --once for cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Refresh once and exit')
+        parser.add_argument('--interval', type=float, default=15.0, help='Seconds between checks for changed inputs (default: 15)')
+        parser.add_argument('--horizon-days', type=int, default=14, help='Days ahead, including today, to forecast (default: 14)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Menus scored per model call (default: 500)')
+        parser.add_argument('--force', action='store_true', help='Recompute every upcoming menu on the first pass')
+
+    def handle(self, *args, **options):
+        coverage = settings.FORECAST_INTERVAL_COVERAGE
+        force = options['force']
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast scheduler started (horizon {options['horizon_days']} days, "
+            f"{'single pass' if options['once'] else 'every %gs' % options['interval']})."
+        ))
+
+        try:
+            while True:
+                # A long-lived worker must not hold on to broken or expired connections
+                close_old_connections()
+                try:
+                    kitchens = list(Kitchen.objects.order_by('slug'))
+                    for kitchen in kitchens:
+                        started = time.perf_counter()
+                        checked, refreshed = refresh_forecasts(
+                            kitchen.id, options['horizon_days'], batch_size=options['batch_size'],
+                            coverage=coverage, force=force
+                        )
+                        if refreshed:
+                            # The kitchen's live dashboards pick up the new forecasts
+                            bump_dashboard_revision(kitchen.id)
+                        if refreshed or options['once']:
+                            self.stdout.write(
+                                f'  {kitchen.slug}: {refreshed} of {checked} upcoming menus re-forecast '
+                                f'in {time.perf_counter() - started:.2f}s'
+                            )
+                except DatabaseError as exc:
+                    if options['once']:
+                        raise CommandError(f'Forecast refresh failed: {exc}')
+                    self.stderr.write(f'Forecast refresh failed: {exc}')
+                else:
+                    force = False
+
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Forecast scheduler stopped.')
@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.features import training_frame
+from api.models import Kitchen
+import datetime
+import json
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Pick the attendance model engine with rolling-origin time-series cross-validation, run in parallel, '
+        'and deploy the winner for the shared model or one kitchen'
+    )
+
+    def add_arguments(self, parser):
+        from ml_model.model_selection import CANDIDATES
+
+        parser.add_argument('--candidates', nargs='+', choices=sorted(CANDIDATES), default=None,
+                            help='Engines to compare (default: all)')
+        parser.add_argument('--folds', type=int, default=4, help='Rolling-origin test windows (default: 4)')
+        parser.add_argument('--jobs', type=int, default=-1, help='Parallel workers; -1 uses every core (default: -1)')
+        parser.add_argument('--kitchen', default=None,
+                            help='Slug of a kitchen to select its own model for (default: the shared model)')
+        parser.add_argument('--history', default=None,
+                            help='Select on a synthetic .npz history (see ml_model/synthetic.py) '
+                                 'instead of the meal feature store')
+        parser.add_argument('--max-latency-ms', type=float, default=None,
+                            help='Only deploy engines scoring a single meal within this many milliseconds')
+        parser.add_argument('--max-size-mb', type=float, default=None,
+                            help='Only deploy engines whose artifact is at most this large')
+        parser.add_argument('--batch-rows', type=int, default=1000,
+                            help='Rows in the batch latency measurement (default: 1000)')
+        parser.add_argument('--min-rows', type=int, default=200, help='Refuse to select on fewer meals (default: 200)')
+        parser.add_argument('--output', default=None, help='Write the full report as JSON to this file')
+        parser.add_argument('--dry-run', action='store_true', help='Report only; keep the deployed model')
+
+    def handle(self, *args, **options):
+        # Imported here so other management commands don't pay for pandas and sklearn
+        import pandas as pd
+        from ml_model.features import FEATURES
+        from ml_model.model_selection import evaluate_candidates, pick_winner
+        from ml_model.prediction import get_kitchen_registry, kitchen_model_dir, model_dir, registry
+        from ml_model.synthetic import load_history
+        from ml_model.train_model import history_to_frame, load_checkpoint, save_checkpoint, save_model
+
+        if options['kitchen']:
+            try:
+                kitchen = Kitchen.objects.get(slug=options['kitchen'])
+            except Kitchen.DoesNotExist:
+                raise CommandError(f"Kitchen '{options['kitchen']}' does not exist.")
+            kitchen_ids = [kitchen.id]
+            output_dir = kitchen_model_dir(kitchen.id)
+            target_registry = get_kitchen_registry(kitchen.id)
+        else:
+            kitchen_ids = list(Kitchen.objects.values_list('id', flat=True))
+            output_dir = model_dir
+            target_registry = registry
+
+        started = time.perf_counter()
+        if options['history']:
+            try:
+                df = history_to_frame(load_history(options['history'])).rename(columns={'date': 'meal_date'})
+            except FileNotFoundError:
+                raise CommandError(f"History file '{options['history']}' not found.")
+        else:
+            # Only fully served days are final
+            until = datetime.date.today() - datetime.timedelta(days=1)
+            df = training_frame(kitchen_ids, until=until)
+        if len(df) < options['min_rows']:
+            raise CommandError(f'Only {len(df)} meals (need {options["min_rows"]}). Has build_meal_features run?')
+        self.stdout.write(f'Loaded {len(df)} meals in {time.perf_counter() - started:.2f}s')
+
+        X = df[list(FEATURES)]
+        y = df['actual_attendance']
+        started = time.perf_counter()
+        try:
+            report, models = evaluate_candidates(
+                X, y, df['meal_date'], names=options['candidates'], folds=options['folds'],
+                n_jobs=options['jobs'], batch_rows=options['batch_rows']
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(f'Cross-validated {len(report)} engines over {options["folds"]} folds '
+                          f'in {time.perf_counter() - started:.2f}s')
+
+        max_bytes = options['max_size_mb'] * 1024 * 1024 if options['max_size_mb'] is not None else None
+        winner = pick_winner(report, max_single_row_ms=options['max_latency_ms'], max_artifact_bytes=max_bytes)
+
+        self.stdout.write(
+            f'  {"engine":<10} {"MAE":>8} {"RMSE":>8} {"WAPE":>7} {"train s":>8} '
+            f'{"1 row ms":>9} {"batch ms":>9} {"size KB":>9}  serving'
+        )
+        for name, metrics in sorted(report.items(), key=lambda item: item[1]['mae']):
+            self.stdout.write(
+                f'{"*" if name == winner else " "} {name:<10} {metrics["mae"]:>8.2f} {metrics["rmse"]:>8.2f} '
+                f'{metrics["wape"]:>7.2%} {metrics["full_train_seconds"]:>8.2f} {metrics["single_row_ms"]:>9.3f} '
+                f'{metrics["batch_ms"]:>9.3f} {metrics["artifact_bytes"] / 1024:>9.1f}  {metrics["serving_kind"]}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'meals': len(df), 'folds': options['folds'], 'winner': winner, 'candidates': report},
+                          f, indent=2)
+            self.stdout.write(f'Report written to {options["output"]}')
+
+        if winner is None:
+            raise CommandError('No engine fits the latency and size budgets.')
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Best engine: {winner} (dry run, nothing deployed).'))
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        version = load_checkpoint(output_dir).get('version', 0) + 1
+        save_model(models[winner], X, model_dir=output_dir, version=version)
+        # Incremental retraining continues after the data the winner was fitted on
+        save_checkpoint(
+            models[winner], version, pd.Timestamp(df['meal_date'].max()).date(), len(df),
+            model_dir=output_dir, engine=winner, cv_mae=report[winner]['mae']
+        )
+
+        # Pick up the new artifact now rather than after the reload interval
+        target_registry.reset()
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["kitchen"] or "Shared"} model v{version} deployed: {winner} '
+            f'(cross-validated MAE {report[winner]["mae"]:.2f}).'
+        ))
@@ -0,0 +1,59 @@
+import datetime
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+ALL_DATES = 'all'
+# Menu items are shared by every kitchen, so their version is not per kitchen
+ITEMS_SCOPE = 'items'
+
+
+def _key(scope):
+    return f'menu:version:{scope}'
+
+
+def _kitchen_scope(kitchen_id, scope):
+    return f'{kitchen_id}:{scope}'
+
+
+def _get_version(scope):
+    version = cache.get(_key(scope))
+    if version is None:
+        # Unknown (cold or evicted cache): treat as changed now, which is always safe
+        cache.add(_key(scope), time.time(), timeout=None)
+        version = cache.get(_key(scope), time.time())
+    return version
+
+
+def bump_menu_versions(kitchen_id, meal_dates):
+    """Mark a kitchen's menus for the given dates (and its range listings) as changed, once the transaction commits."""
+    scopes = [
+        _kitchen_scope(kitchen_id, scope)
+        for scope in [ALL_DATES] + [meal_date.isoformat() for meal_date in set(meal_dates)]
+    ]
+
+    def _bump():
+        now = time.time()
+        cache.set_many({_key(scope): now for scope in scopes}, timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+def bump_items_version():
+    """Mark every menu as changed because a MenuItem it may include changed."""
+    transaction.on_commit(lambda: cache.set(_key(ITEMS_SCOPE), time.time(), timeout=None))
+
+
+def get_menu_version(kitchen_id, meal_date=None):
+    """
+    Return (etag, last_modified) for a kitchen's menus of one date, or of all dates.
+
+    Both come from version stamps in the cache, so answering a conditional
+    request needs no database query, and changes in one kitchen leave the
+    others' listings cached.
+    """
+    date_version = _get_version(_kitchen_scope(kitchen_id, meal_date.isoformat() if meal_date else ALL_DATES))
+    items_version = _get_version(ITEMS_SCOPE)
+    etag = f"{kitchen_id}-{date_version:.6f}-{items_version:.6f}"
+    last_modified = datetime.datetime.fromtimestamp(max(date_version, items_version), tz=datetime.timezone.utc)
+    return etag, last_modified
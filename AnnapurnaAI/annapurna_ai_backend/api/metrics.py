@@ -0,0 +1,67 @@
+import os
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+
+# Byte-size buckets shared by request and response payload histograms
+SIZE_BUCKETS = (100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+REQUEST_SECONDS = Histogram(
+    'annapurna_http_request_duration_seconds',
+    'Request latency by route',
+    ['view', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+REQUEST_QUERIES = Histogram(
+    'annapurna_http_db_queries',
+    'Database queries issued per request',
+    ['view', 'method'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+REQUEST_DB_SECONDS = Histogram(
+    'annapurna_http_db_duration_seconds',
+    'Time spent in database queries per request',
+    ['view', 'method'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+REQUEST_BYTES = Histogram(
+    'annapurna_http_request_size_bytes',
+    'Request body size by route',
+    ['view', 'method'],
+    buckets=SIZE_BUCKETS,
+)
+
+RESPONSE_BYTES = Histogram(
+    'annapurna_http_response_size_bytes',
+    'Response body size by route (streaming responses are not counted)',
+    ['view', 'method'],
+    buckets=SIZE_BUCKETS,
+)
+
+INFERENCE_FALLBACKS = Counter(
+    'annapurna_inference_fallbacks_total',
+    'Predictions answered by the heuristic because the inference pool was busy or timed out',
+    ['reason'],
+)
+
+
+def _registry():
+    # With several worker processes each one writes samples to PROMETHEUS_MULTIPROC_DIR
+    # and the scrape aggregates them; otherwise serve this process's registry directly
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """Expose all collected metrics in the Prometheus text format."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,102 @@
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .metrics import REQUEST_BYTES, REQUEST_DB_SECONDS, REQUEST_QUERIES, REQUEST_SECONDS, RESPONSE_BYTES
+
+
+class QueryTimer:
+    """execute_wrapper hook totalling the number and duration of a request's queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+# Timer of the request being handled. Context variables follow the request into the
+# threads sync_to_async runs its sync views and ORM calls on, so queries are attributed
+# to the right request under both WSGI and ASGI.
+_current_timer = ContextVar('annapurna_query_timer', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper hook installed on every connection; times queries run for a request."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection, **kwargs):
+    """connection_created handler adding record_query to each thread's connection, once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _view_label(request):
+    # The URL pattern, not the path, so ids do not multiply the label values
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match else '<unresolved>'
+
+
+class MetricsMiddleware:
+    """
+    Records per-route latency, DB query count and time, and payload sizes.
+
+    Queries are counted for sync and async views alike, including those run
+    on sync_to_async threads, by the record_query hook on every connection.
+    Queries a streaming response makes while it is being sent are not.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._observe(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._observe(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def _observe(self, request, response, elapsed, timer):
+        view, method = _view_label(request), request.method
+        REQUEST_SECONDS.labels(view, method, str(response.status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(view, method).observe(timer.count)
+        REQUEST_DB_SECONDS.labels(view, method).observe(timer.seconds)
+        try:
+            request_bytes = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            request_bytes = 0
+        REQUEST_BYTES.labels(view, method).observe(request_bytes)
+        if not response.streaming:
+            RESPONSE_BYTES.labels(view, method).observe(len(response.content))
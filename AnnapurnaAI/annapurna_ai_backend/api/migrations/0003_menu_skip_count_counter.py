@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Menu = apps.get_model('api', 'Menu')
+    Attendance = apps.get_model('api', 'Attendance')
+    Counter = apps.get_model('api', 'Counter')
+    User = apps.get_model('api', 'User')
+
+    skip_count = models.Subquery(
+        Attendance.objects.filter(menu=models.OuterRef('pk'))
+        .values('menu').annotate(total=models.Count('pk')).values('total')[:1]
+    )
+    Menu.objects.update(skip_count=Coalesce(skip_count, 0))
+    Counter.objects.update_or_create(
+        name='student_total',
+        defaults={'value': User.objects.filter(role='student').count()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_rename_timestamp_feedback_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='menu',
+            name='skip_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
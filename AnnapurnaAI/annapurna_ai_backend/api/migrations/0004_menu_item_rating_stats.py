@@ -0,0 +1,78 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:08
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_rating_stats(apps, schema_editor):
+    # A frozen copy of api.feedback_stats.rebuild_rating_stats as of this migration, so later
+    # changes to the application code cannot change what it does
+    Feedback = apps.get_model('api', 'Feedback')
+    MenuItemRatingStats = apps.get_model('api', 'MenuItemRatingStats')
+    MenuItemDailyRating = apps.get_model('api', 'MenuItemDailyRating')
+
+    histogram = {f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)}
+    per_item = Feedback.objects.values('menu_item').annotate(
+        count=Count('id'),
+        rating_sum=Sum('rating'),
+        rating_sum_sq=Sum(F('rating') * F('rating')),
+        **histogram
+    ).order_by()
+    per_day = Feedback.objects.annotate(day=TruncDate('created_at')).values('menu_item', 'day').annotate(
+        count=Count('id'),
+        rating_sum=Sum('rating')
+    ).order_by()
+
+    MenuItemRatingStats.objects.all().delete()
+    MenuItemDailyRating.objects.all().delete()
+    MenuItemRatingStats.objects.bulk_create(
+        [MenuItemRatingStats(menu_item_id=row.pop('menu_item'), **row) for row in per_item], batch_size=1000
+    )
+    MenuItemDailyRating.objects.bulk_create(
+        [MenuItemDailyRating(menu_item_id=row.pop('menu_item'), **row) for row in per_day], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_menu_skip_count_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemRatingStats',
+            fields=[
+                ('menu_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_stats', serialize=False, to='api.menuitem')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_sum_sq', models.BigIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='MenuItemDailyRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_ratings', to='api.menuitem')),
+            ],
+            options={
+                'unique_together': {('menu_item', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_menu_item_rating_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ingredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('unit', models.CharField(default='kg', max_length=20)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='uptake_rate',
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.CreateModel(
+            name='RecipeLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity_per_portion', models.FloatField()),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_lines', to='api.ingredient')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipe_lines', to='api.menuitem')),
+            ],
+            options={
+                'unique_together': {('menu_item', 'ingredient')},
+            },
+        ),
+    ]
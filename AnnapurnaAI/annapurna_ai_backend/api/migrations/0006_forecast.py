@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_recipes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Forecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('predicted_headcount', models.IntegerField()),
+                ('lower_bound', models.IntegerField(blank=True, null=True)),
+                ('upper_bound', models.IntegerField(blank=True, null=True)),
+                ('coverage', models.FloatField(blank=True, null=True)),
+                ('model_version', models.CharField(blank=True, max_length=64, null=True)),
+                ('total_students', models.PositiveIntegerField()),
+                ('live_skips', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('menu', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='api.menu')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['menu', '-computed_at'], name='api_forecas_menu_id_ac20f8_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def assign_default_kitchen(apps, schema_editor):
+    Kitchen = apps.get_model('api', 'Kitchen')
+    Counter = apps.get_model('api', 'Counter')
+    User = apps.get_model('api', 'User')
+
+    # Everything recorded so far belongs to the single kitchen that existed
+    kitchen, _ = Kitchen.objects.get_or_create(
+        slug=settings.DEFAULT_KITCHEN, defaults={'name': settings.DEFAULT_KITCHEN.replace('-', ' ').title()}
+    )
+    for model_name in ('User', 'Menu', 'Attendance', 'Feedback'):
+        apps.get_model('api', model_name).objects.filter(kitchen__isnull=True).update(kitchen=kitchen)
+
+    # The student total is now kept per kitchen
+    Counter.objects.filter(name='student_total').delete()
+    Counter.objects.update_or_create(
+        name=f'student_total:{kitchen.pk}',
+        defaults={'value': User.objects.filter(kitchen=kitchen, role='student').count()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_forecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Kitchen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='api.kitchen'),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='api.kitchen'),
+        ),
+        migrations.AddField(
+            model_name='menu',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='menus', to='api.kitchen'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='kitchen',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='api.kitchen'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['kitchen', 'role'], name='api_user_kitchen_2a972c_idx'),
+        ),
+        migrations.RunPython(assign_default_kitchen, migrations.RunPython.noop),
+    ]
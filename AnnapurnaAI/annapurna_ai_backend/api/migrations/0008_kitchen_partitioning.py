@@ -0,0 +1,118 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:31
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_rating_stats(apps, schema_editor):
+    # A frozen copy of api.feedback_stats.rebuild_rating_stats as of this migration, so later
+    # changes to the application code cannot change what it does
+    Feedback = apps.get_model('api', 'Feedback')
+    MenuItemRatingStats = apps.get_model('api', 'MenuItemRatingStats')
+    MenuItemDailyRating = apps.get_model('api', 'MenuItemDailyRating')
+
+    histogram = {f'rating_{rating}': Count('id', filter=Q(rating=rating)) for rating in range(1, 6)}
+    per_item = Feedback.objects.values('kitchen', 'menu_item').annotate(
+        count=Count('id'),
+        rating_sum=Sum('rating'),
+        rating_sum_sq=Sum(F('rating') * F('rating')),
+        **histogram
+    ).order_by()
+    per_day = (
+        Feedback.objects.annotate(day=TruncDate('created_at'))
+        .values('kitchen', 'menu_item', 'day')
+        .annotate(count=Count('id'), rating_sum=Sum('rating'))
+        .order_by()
+    )
+
+    MenuItemRatingStats.objects.bulk_create(
+        [MenuItemRatingStats(kitchen_id=row.pop('kitchen'), menu_item_id=row.pop('menu_item'), **row)
+         for row in per_item],
+        batch_size=1000
+    )
+    MenuItemDailyRating.objects.bulk_create(
+        [MenuItemDailyRating(kitchen_id=row.pop('kitchen'), menu_item_id=row.pop('menu_item'), **row)
+         for row in per_day],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_kitchens'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='menu',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='menus', to='api.kitchen'),
+        ),
+        migrations.AlterField(
+            model_name='attendance',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='api.kitchen'),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='kitchen',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='api.kitchen'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='menu',
+            unique_together={('kitchen', 'meal_date', 'meal_type')},
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['kitchen', 'timestamp'], name='api_attenda_kitchen_a4d230_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['kitchen', 'created_at'], name='api_feedbac_kitchen_a24b23_idx'),
+        ),
+        # Rating aggregates are derived data: recreate them per kitchen and rebuild from Feedback
+        migrations.DeleteModel(
+            name='MenuItemRatingStats',
+        ),
+        migrations.DeleteModel(
+            name='MenuItemDailyRating',
+        ),
+        migrations.CreateModel(
+            name='MenuItemRatingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_sum_sq', models.BigIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('kitchen', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.kitchen')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_stats', to='api.menuitem')),
+            ],
+            options={
+                'unique_together': {('kitchen', 'menu_item')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MenuItemDailyRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('kitchen', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.kitchen')),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_ratings', to='api.menuitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kitchen', 'day'], name='api_menuite_kitchen_dcad78_idx')],
+                'unique_together': {('kitchen', 'menu_item', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_kitchen_partitioning'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealFeatures',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meal_date', models.DateField()),
+                ('meal_type', models.CharField(choices=[('Breakfast', 'Breakfast'), ('Lunch', 'Lunch'), ('Dinner', 'Dinner')], max_length=20)),
+                ('day_of_week', models.PositiveSmallIntegerField()),
+                ('enrolled_students', models.PositiveIntegerField()),
+                ('skips', models.PositiveIntegerField()),
+                ('actual_headcount', models.PositiveIntegerField(blank=True, null=True)),
+                ('attendance_rate', models.FloatField(blank=True, null=True)),
+                ('is_holiday', models.BooleanField(default=False)),
+                ('is_exam', models.BooleanField(default=False)),
+                ('rate_lag_7', models.FloatField(blank=True, null=True)),
+                ('rate_rolling_7', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kitchen', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.kitchen')),
+            ],
+            options={
+                'unique_together': {('kitchen', 'meal_date', 'meal_type')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CalendarDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('is_holiday', models.BooleanField(default=False)),
+                ('is_exam', models.BooleanField(default=False)),
+                ('note', models.CharField(blank=True, max_length=100)),
+                ('kitchen', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.kitchen')),
+            ],
+            options={
+                'unique_together': {('kitchen', 'date')},
+            },
+        ),
+    ]
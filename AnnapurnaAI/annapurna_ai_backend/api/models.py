@@ -1,37 +1,180 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, F, IntegerField, Value, When
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+
+
+class Kitchen(models.Model):
+    """A canteen or hostel mess; menus, diners, skips and feedback are partitioned by kitchen."""
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def get_default(cls):
+        """Kitchen that new accounts and seeded data belong to when none is given."""
+        kitchen, _ = cls.objects.get_or_create(
+            slug=settings.DEFAULT_KITCHEN, defaults={'name': settings.DEFAULT_KITCHEN.replace('-', ' ').title()}
+        )
+        return kitchen
 
 
 class User(AbstractUser):
     ROLE_CHOICES = (('student', 'Student'), ('manager', 'Manager'))
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
     email = models.EmailField(unique=True)
+    # Staff accounts without a kitchen can use the admin but none of the kitchen APIs
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.PROTECT, null=True, blank=True,
+                                related_name='users', db_index=False)
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(fields=['kitchen', 'role'])]
+
 
 class MenuItem(models.Model):
     name = models.CharField(max_length=100, unique=True)
     category = models.CharField(max_length=50)
+    # Fraction of diners expected to take this dish
+    uptake_rate = models.FloatField(default=1.0)
 
     def __str__(self):
         return self.name
 
 
+class Ingredient(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    unit = models.CharField(max_length=20, default='kg')
+
+    def __str__(self):
+        return f"{self.name} ({self.unit})"
+
+
+class RecipeLine(models.Model):
+    """Quantity of one ingredient needed per portion of a menu item."""
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='recipe_lines')
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='recipe_lines')
+    quantity_per_portion = models.FloatField()
+
+    class Meta:
+        unique_together = ('menu_item', 'ingredient')
+
+    def __str__(self):
+        return f"{self.menu_item.name}: {self.quantity_per_portion} {self.ingredient.unit} {self.ingredient.name}"
+
+
 class Menu(models.Model):
     MEAL_TYPE_CHOICES = (('Breakfast', 'Breakfast'), ('Lunch', 'Lunch'), ('Dinner', 'Dinner'))
+    # Indexed through the unique constraint, which leads on kitchen
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.PROTECT, related_name='menus', db_index=False)
     meal_date = models.DateField()
     meal_type = models.CharField(max_length=20, choices=MEAL_TYPE_CHOICES)
     items = models.ManyToManyField(MenuItem, related_name='menus')
+    # Denormalized number of Attendance (skip) rows, kept in sync by api.signals
+    skip_count = models.PositiveIntegerField(default=0)
 
     class Meta:
-        unique_together = ('meal_date', 'meal_type')
+        unique_together = ('kitchen', 'meal_date', 'meal_type')
 
     def __str__(self):
         return f"{self.meal_date} - {self.meal_type}"
 
+    @classmethod
+    def meal_rank(cls):
+        """Expression numbering meal types in serving order (Breakfast 0, Lunch 1, Dinner 2), for ordering by."""
+        return Case(
+            *[When(meal_type=meal_type, then=Value(rank)) for rank, (meal_type, _) in enumerate(cls.MEAL_TYPE_CHOICES)],
+            default=Value(len(cls.MEAL_TYPE_CHOICES)),
+            output_field=IntegerField()
+        )
+
+
+
+class Forecast(models.Model):
+    """
+    A headcount forecast for one menu as computed at one point in time.
+
+    Rows are only ever appended, so older rows record what was predicted
+    before the inputs changed.
+    """
+    menu = models.ForeignKey(Menu, on_delete=models.CASCADE, related_name='forecasts')
+    predicted_headcount = models.IntegerField()
+    lower_bound = models.IntegerField(null=True, blank=True)
+    upper_bound = models.IntegerField(null=True, blank=True)
+    # Fraction of tree predictions the bounds span
+    coverage = models.FloatField(null=True, blank=True)
+    # None for heuristic estimates made without a model
+    model_version = models.CharField(max_length=64, null=True, blank=True)
+    # Inputs the forecast was computed from
+    total_students = models.PositiveIntegerField()
+    live_skips = models.PositiveIntegerField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['menu', '-computed_at'])]
+
+    def __str__(self):
+        return f"{self.menu}: {self.predicted_headcount} ({self.computed_at:%Y-%m-%d %H:%M})"
+
+    def is_current(self, total_students, live_skips, model_version, features_updated_at=None):
+        """
+        Whether the forecast still holds for these inputs.
+
+        features_updated_at is when the meal's feature store row was last
+        aggregated, for models that read it; forecasts made before are stale.
+        """
+        if self.model_version != model_version or self.total_students != total_students:
+            return False
+        if features_updated_at is not None and features_updated_at > self.computed_at:
+            return False
+        # The model ignores live skips; only heuristic estimates depend on them
+        return model_version is not None or self.live_skips == live_skips
+
+
+class Counter(models.Model):
+    """Named counter maintained with atomic F() updates, e.g. a kitchen's cached student total."""
+    STUDENT_TOTAL = 'student_total'
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
+
+    @classmethod
+    def student_total(cls, kitchen_id):
+        """Name of the counter holding a kitchen's number of students."""
+        return f"{cls.STUDENT_TOTAL}:{kitchen_id}"
+
+    @classmethod
+    def _initial_value(cls, name):
+        scope, _, kitchen_id = name.partition(':')
+        if scope == cls.STUDENT_TOTAL and kitchen_id:
+            return User.objects.filter(kitchen_id=kitchen_id, role='student').count()
+        return 0
+
+    @classmethod
+    def get_value(cls, name):
+        value = cls.objects.filter(name=name).values_list('value', flat=True).first()
+        if value is None:
+            counter, _ = cls.objects.get_or_create(name=name, defaults={'value': cls._initial_value(name)})
+            value = counter.value
+        return value
+
+    @classmethod
+    def increment(cls, name, delta=1):
+        if not cls.objects.filter(name=name).update(value=F('value') + delta):
+            # First use: seed from the raw rows, which already include this change
+            cls.objects.get_or_create(name=name, defaults={'value': cls._initial_value(name)})
+
 
 class Attendance(models.Model):
+    # Copied from the menu so per-kitchen scans need no join
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.PROTECT, db_index=False)
     student = models.ForeignKey(User, on_delete=models.CASCADE)
     menu = models.ForeignKey(Menu, on_delete=models.CASCADE)
     status = models.CharField(max_length=20, default='Skipped')
@@ -39,17 +182,109 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ('student', 'menu')
+        indexes = [models.Index(fields=['kitchen', 'timestamp'])]
 
 
-from django.conf import settings
-
 class Feedback(models.Model):
+    # The kitchen that served the dish, i.e. the student's kitchen at the time
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.PROTECT, db_index=False)
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     menu_item = models.ForeignKey('MenuItem', on_delete=models.CASCADE)
     rating = models.IntegerField()
     comments = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['kitchen', 'created_at'])]
 
     def __str__(self):
         return f"{self.student.email} on {self.menu_item.name}: {self.rating}"
 
+
+
+class MenuItemRatingStats(models.Model):
+    """All-time rating aggregates per kitchen and menu item, updated incrementally by api.feedback_stats."""
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.CASCADE, db_index=False)
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='rating_stats')
+    count = models.PositiveIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_sum_sq = models.BigIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kitchen', 'menu_item')
+
+    @property
+    def average(self):
+        return self.rating_sum / self.count if self.count else None
+
+    @property
+    def variance(self):
+        if not self.count:
+            return None
+        return max(self.rating_sum_sq / self.count - self.average ** 2, 0.0)
+
+    def __str__(self):
+        return f"{self.menu_item.name}: {self.count} ratings"
+
+
+class MenuItemDailyRating(models.Model):
+    """Per-day rating buckets per kitchen and menu item; rolling windows sum the last N buckets."""
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.CASCADE, db_index=False)
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='daily_ratings')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kitchen', 'menu_item', 'day')
+        indexes = [models.Index(fields=['kitchen', 'day'])]
+
+
+class CalendarDay(models.Model):
+    """A holiday or exam day of a kitchen; read into the daily meal features."""
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.CASCADE, db_index=False)
+    date = models.DateField()
+    is_holiday = models.BooleanField(default=False)
+    is_exam = models.BooleanField(default=False)
+    note = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        unique_together = ('kitchen', 'date')
+
+    def __str__(self):
+        return f"{self.kitchen}: {self.date}"
+
+
+class MealFeatures(models.Model):
+    """
+    Daily aggregate of one meal of a kitchen, the feature store the attendance model trains and predicts from.
+
+    Rows are derived from menus, skip counts, enrollment and the calendar,
+    and maintained incrementally by api.features via build_meal_features.
+    Headcount and rate are None until the meal has been served.
+    """
+    kitchen = models.ForeignKey(Kitchen, on_delete=models.CASCADE, db_index=False)
+    meal_date = models.DateField()
+    meal_type = models.CharField(max_length=20, choices=Menu.MEAL_TYPE_CHOICES)
+    day_of_week = models.PositiveSmallIntegerField()
+    enrolled_students = models.PositiveIntegerField()
+    skips = models.PositiveIntegerField()
+    actual_headcount = models.PositiveIntegerField(null=True, blank=True)
+    attendance_rate = models.FloatField(null=True, blank=True)
+    is_holiday = models.BooleanField(default=False)
+    is_exam = models.BooleanField(default=False)
+    # Same meal's attendance rate a week earlier, and its mean over the previous week
+    rate_lag_7 = models.FloatField(null=True, blank=True)
+    rate_rolling_7 = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kitchen', 'meal_date', 'meal_type')
+
+    def __str__(self):
+        return f"{self.kitchen}: {self.meal_date} - {self.meal_type}"
@@ -0,0 +1,72 @@
+import base64
+import datetime
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .models import Menu
+
+
+class MenuKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over (meal_date, meal rank).
+
+    Meals of a day come in serving order (Breakfast, Lunch, Dinner). Each
+    page is a single indexed range scan on meal_date starting after the last
+    row of the previous page, so deep pages cost the same as the first one.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+
+    def _encode_cursor(self, menu):
+        raw = f"{menu.meal_date.isoformat()}|{menu.meal_type}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        """Return the (meal_date, meal rank) of the row a cursor points at."""
+        ranks = {meal_type: rank for rank, (meal_type, _) in enumerate(Menu.MEAL_TYPE_CHOICES)}
+        try:
+            meal_date, meal_type = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+            return datetime.date.fromisoformat(meal_date), ranks[meal_type]
+        except (KeyError, ValueError):
+            raise ValidationError({"error": "Invalid cursor."})
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        queryset = queryset.annotate(meal_rank=Menu.meal_rank()).order_by('meal_date', 'meal_rank')
+        if cursor:
+            meal_date, meal_rank = self._decode_cursor(cursor)
+            queryset = queryset.filter(Q(meal_date__gt=meal_date) | Q(meal_date=meal_date, meal_rank__gt=meal_rank))
+
+        # Fetch one extra row to know whether there is a next page
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.next_cursor = self._encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data
+        })
@@ -4,3 +4,10 @@ from rest_framework.permissions import BasePermission
 class IsManager(BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_authenticated and request.user.role == 'manager')
+
+
+class HasKitchen(BasePermission):
+    message = "Your account is not assigned to a kitchen."
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.kitchen_id is not None)
@@ -0,0 +1,119 @@
+import threading
+import time
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from .models import Ingredient, Menu, MenuItem, RecipeLine
+
+VERSION_KEY = 'recipes:version'
+
+
+def bump_recipe_version():
+    """Invalidate every process's recipe matrix once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time(), timeout=None))
+
+
+class RecipeMatrix:
+    """
+    Dense item x ingredient matrix of quantity per diner.
+
+    Each row is a menu item's recipe scaled by its uptake rate, so the
+    ingredients for a menu are its item indicator row times the matrix,
+    times the headcount.
+    """
+
+    def __init__(self, item_index, ingredient_labels, matrix):
+        self.item_index = item_index
+        self.ingredient_labels = ingredient_labels
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls):
+        item_index = {}
+        uptake = []
+        for item_id, uptake_rate in MenuItem.objects.values_list('id', 'uptake_rate').order_by('id'):
+            item_index[item_id] = len(uptake)
+            uptake.append(uptake_rate)
+
+        ingredient_index = {}
+        ingredient_labels = []
+        for ingredient_id, name, unit in Ingredient.objects.values_list('id', 'name', 'unit').order_by('name'):
+            ingredient_index[ingredient_id] = len(ingredient_labels)
+            ingredient_labels.append(f"{name} ({unit})")
+
+        matrix = np.zeros((len(item_index), len(ingredient_labels)))
+        lines = list(RecipeLine.objects.values_list('menu_item_id', 'ingredient_id', 'quantity_per_portion'))
+        if lines:
+            item_ids, ingredient_ids, quantities = zip(*lines)
+            rows = [item_index[item_id] for item_id in item_ids]
+            columns = [ingredient_index[ingredient_id] for ingredient_id in ingredient_ids]
+            matrix[rows, columns] = quantities
+        matrix *= np.asarray(uptake, dtype=float)[:, None]
+        return cls(item_index, ingredient_labels, matrix)
+
+
+_matrix_lock = threading.Lock()
+_matrix_cache = {'version': None, 'matrix': None}
+
+
+def get_recipe_matrix():
+    """Return the process-local RecipeMatrix, rebuilding it when the shared recipe version changes."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time(), timeout=None)
+        version = cache.get(VERSION_KEY)
+
+    with _matrix_lock:
+        if _matrix_cache['version'] != version or _matrix_cache['matrix'] is None:
+            _matrix_cache['matrix'] = RecipeMatrix.build()
+            _matrix_cache['version'] = version
+        return _matrix_cache['matrix']
+
+
+def build_prep_sheets(menu_headcounts):
+    """
+    Compute prep sheets for many menus with one matrix product.
+
+    Args:
+        menu_headcounts: List of (menu_id, headcount) pairs
+
+    Returns:
+        (prep_sheets, procurement): a list with one {ingredient label: quantity}
+        dict per input pair (None when none of the menu's items has a recipe),
+        and the quantities summed over all menus
+    """
+    recipes = get_recipe_matrix()
+    if not menu_headcounts or not recipes.ingredient_labels:
+        return [None] * len(menu_headcounts), {}
+
+    menu_index = {}
+    for menu_id, _ in menu_headcounts:
+        menu_index.setdefault(menu_id, len(menu_index))
+
+    # Menu x item indicator matrix from a single query on the M2M table
+    incidence = np.zeros((len(menu_index), len(recipes.item_index)))
+    links = Menu.items.through.objects.filter(menu_id__in=menu_index).values_list('menu_id', 'menuitem_id')
+    for menu_id, item_id in links:
+        if item_id in recipes.item_index:
+            incidence[menu_index[menu_id], recipes.item_index[item_id]] = 1
+
+    per_diner = incidence @ recipes.matrix
+    rows = [menu_index[menu_id] for menu_id, _ in menu_headcounts]
+    headcounts = np.array([max(headcount, 0) for _, headcount in menu_headcounts], dtype=float)
+    quantities = per_diner[rows] * headcounts[:, None]
+    totals = quantities.sum(axis=0)
+
+    prep_sheets = []
+    for row, menu_quantities in zip(rows, quantities):
+        if not per_diner[row].any():
+            prep_sheets.append(None)
+            continue
+        prep_sheets.append({
+            label: round(float(quantity), 1)
+            for label, quantity in zip(recipes.ingredient_labels, menu_quantities) if quantity
+        })
+    procurement = {
+        label: round(float(quantity), 1)
+        for label, quantity in zip(recipes.ingredient_labels, totals) if quantity
+    }
+    return prep_sheets, procurement
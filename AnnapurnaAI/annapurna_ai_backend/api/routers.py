@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+_prefer_replica = ContextVar('prefer_replica', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Route reads inside the block (or decorated view method) to the replica.
+
+    Only for views that tolerate replication lag; a view that reads back
+    what the same user just wrote should keep reading from the primary.
+    """
+    token = _prefer_replica.set(True)
+    try:
+        yield
+    finally:
+        _prefer_replica.reset(token)
+
+
+class ReadReplicaRouter:
+    """Sends reads marked with replica_reads() to the replica alias when one is configured."""
+
+    def db_for_read(self, model, **hints):
+        if _prefer_replica.get() and REPLICA_ALIAS in settings.DATABASES:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is populated by replication, never migrated directly
+        return db != REPLICA_ALIAS
@@ -1,6 +1,7 @@
+import time
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from .models import User, Menu, MenuItem, Attendance, Feedback
+from .models import User, Menu, MenuItem, Attendance, Feedback, Kitchen
 
 # ✅ Custom JWT Serializer to include role
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -10,8 +11,11 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         
         # Add custom claims
         token['role'] = user.role
+        token['kitchen'] = user.kitchen_id
         token['email'] = user.email
         token['name'] = user.username
+        # Sub-second login time, checked against the revocation cutoff
+        token['auth_time'] = time.time()
         
         return token
     
@@ -21,17 +25,22 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Add extra responses
         data['email'] = self.user.email
         data['role'] = self.user.role
+        data['kitchen'] = self.user.kitchen_id
         data['name'] = self.user.username
         
         return data
 
 class UserSerializer(serializers.ModelSerializer):
+    # Kitchens are chosen by slug; accounts registered without one join the default kitchen
+    kitchen = serializers.SlugRelatedField(slug_field='slug', queryset=Kitchen.objects.all(), required=False)
+
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'password', 'role']
+        fields = ['id', 'username', 'email', 'password', 'role', 'kitchen']
         extra_kwargs = {'password': {'write_only': True}}
     
     def create(self, validated_data):
+        validated_data.setdefault('kitchen', Kitchen.get_default())
         user = User.objects.create_user(**validated_data)
         return user
 
@@ -47,6 +56,14 @@ class MenuSerializer(serializers.ModelSerializer):
         model = Menu
         fields = ['id', 'meal_date', 'meal_type', 'items']
 
+class StudentMenuSerializer(MenuSerializer):
+    """Menu with the requesting student's skip state, annotated by StudentDayView."""
+    skipped = serializers.BooleanField(read_only=True)
+    attendance_id = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta(MenuSerializer.Meta):
+        fields = MenuSerializer.Meta.fields + ['skipped', 'attendance_id']
+
 class AttendanceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Attendance
@@ -58,5 +75,20 @@ class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Feedback
         fields = '__all__'
-        read_only_fields = ['student', 'created_at']
+        read_only_fields = ['kitchen', 'student', 'created_at']
+
 
+
+class FeedbackEntrySerializer(serializers.Serializer):
+    """One rating in a feedback submission; menu_item is accepted as an alias of item_id."""
+    item_id = serializers.IntegerField(required=False)
+    menu_item = serializers.IntegerField(required=False, write_only=True)
+    rating = serializers.IntegerField(min_value=1, max_value=5)
+    comments = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        item_id = attrs.pop('menu_item', None)
+        attrs['item_id'] = attrs.get('item_id', item_id)
+        if attrs['item_id'] is None:
+            raise serializers.ValidationError({"item_id": ["This field is required."]})
+        return attrs
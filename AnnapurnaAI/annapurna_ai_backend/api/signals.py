@@ -0,0 +1,145 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .authentication import revoke_user_tokens
+from .events import bump_dashboard_revision
+from .feedback_stats import apply_feedback
+from .forecast_cache import invalidate_forecasts
+from .menu_versions import bump_items_version, bump_menu_versions
+from .middleware import install_query_timer
+from .models import Attendance, Counter, Feedback, Ingredient, Menu, MenuItem, RecipeLine, User
+from .prep import bump_recipe_version
+
+# Per-request query metrics (see MetricsMiddleware)
+connection_created.connect(install_query_timer)
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def attendance_changed(sender, instance, **kwargs):
+    invalidate_forecasts(instance.kitchen_id)
+    bump_dashboard_revision(instance.kitchen_id)
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_created(sender, instance, created, **kwargs):
+    if created:
+        Menu.objects.filter(pk=instance.menu_id).update(skip_count=F('skip_count') + 1)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    Menu.objects.filter(pk=instance.menu_id, skip_count__gt=0).update(skip_count=F('skip_count') - 1)
+
+
+def _count_student(kitchen_id, delta):
+    if kitchen_id is not None:
+        Counter.increment(Counter.student_total(kitchen_id), delta)
+        bump_dashboard_revision(kitchen_id)
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_role(sender, instance, update_fields=None, **kwargs):
+    instance._previous_auth_state = None
+    if instance.pk and (update_fields is None or {'role', 'is_active', 'password', 'kitchen'} & set(update_fields)):
+        instance._previous_auth_state = (
+            User.objects.filter(pk=instance.pk).values_list('role', 'is_active', 'password', 'kitchen_id').first()
+        )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    previous_state = None if created else getattr(instance, '_previous_auth_state', None)
+    if not created and previous_state is None:
+        # Neither role, status, password nor kitchen was part of this save
+        return
+
+    if previous_state is not None and previous_state != (
+        instance.role, instance.is_active, instance.password, instance.kitchen_id
+    ):
+        # Claims in outstanding tokens are stale now
+        transaction.on_commit(lambda: revoke_user_tokens(instance.pk))
+
+    # Move the student between kitchen totals when their role or kitchen changed
+    was_counted = previous_state[3] if previous_state and previous_state[0] == 'student' else None
+    is_counted = instance.kitchen_id if instance.role == 'student' else None
+    if is_counted != was_counted:
+        _count_student(was_counted, -1)
+        _count_student(is_counted, 1)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_user_tokens(user_id))
+    if instance.role == 'student':
+        _count_student(instance.kitchen_id, -1)
+
+
+@receiver(pre_save, sender=Menu)
+def remember_previous_meal_date(sender, instance, **kwargs):
+    instance._previous_listing = None
+    if instance.pk:
+        instance._previous_listing = (
+            Menu.objects.filter(pk=instance.pk).values_list('kitchen_id', 'meal_date').first()
+        )
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+def menu_changed(sender, instance, **kwargs):
+    # A moved menu changes both its old and its new listing
+    bump_menu_versions(instance.kitchen_id, [instance.meal_date])
+    previous_listing = getattr(instance, '_previous_listing', None)
+    if previous_listing and previous_listing != (instance.kitchen_id, instance.meal_date):
+        bump_menu_versions(previous_listing[0], [previous_listing[1]])
+
+
+@receiver(m2m_changed, sender=Menu.items.through)
+def menu_items_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # instance is a MenuItem; every menu that may list it is affected
+        bump_items_version()
+    else:
+        bump_menu_versions(instance.kitchen_id, [instance.meal_date])
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def menu_item_changed(sender, **kwargs):
+    bump_items_version()
+    # Uptake rates are folded into the recipe matrix
+    bump_recipe_version()
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=RecipeLine)
+@receiver(post_delete, sender=RecipeLine)
+def recipe_changed(sender, **kwargs):
+    bump_recipe_version()
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_previous_feedback(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk:
+        instance._previous = Feedback.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Feedback)
+def feedback_saved(sender, instance, created, **kwargs):
+    # Bulk inserts from SubmitFeedbackView call apply_feedback themselves
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        apply_feedback([previous], sign=-1)
+    apply_feedback([instance])
+
+
+@receiver(post_delete, sender=Feedback)
+def feedback_deleted(sender, instance, **kwargs):
+    apply_feedback([instance], sign=-1)
@@ -0,0 +1,54 @@
+import datetime
+from django.core.cache import cache
+from django.test import TestCase
+from api.models import Kitchen, Menu, User
+
+
+class ApiTestCase(TestCase):
+    """
+    Base for endpoint tests: a kitchen with a student and a manager, logged in through the real login route.
+
+    The cache holds version stamps, counters and the token deny-list, so it
+    is cleared before every test.
+    """
+
+    password = 'correct-horse-42'
+
+    def setUp(self):
+        cache.clear()
+        self.kitchen = Kitchen.get_default()
+        self.today = datetime.date.today()
+        self.student = self.create_user('student')
+        self.manager = self.create_user('manager', role='manager')
+
+    def create_user(self, name, role='student', kitchen=None):
+        return User.objects.create_user(
+            username=name, email=f'{name}@example.com', password=self.password, role=role,
+            kitchen=kitchen or self.kitchen
+        )
+
+    def create_menus(self, days=1, start=None, kitchen=None):
+        """Every meal of `days` days from start (default: today); returns them by (meal_date, meal_type)."""
+        start = start or self.today
+        menus = [
+            Menu.objects.create(kitchen=kitchen or self.kitchen, meal_date=start + datetime.timedelta(days=offset),
+                                meal_type=meal_type)
+            for offset in range(days)
+            for meal_type, _ in Menu.MEAL_TYPE_CHOICES
+        ]
+        return {(menu.meal_date, menu.meal_type): menu for menu in menus}
+
+    def login(self, user):
+        """Access token for a user, obtained from the login route."""
+        response = self.client.post(
+            '/api/login/', {'email': user.email, 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['access']
+
+    def auth(self, user):
+        """Request headers authenticating as a user."""
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.login(user)}'}
+
+    def post_json(self, path, data, headers):
+        return self.client.post(path, data, content_type='application/json', **headers)
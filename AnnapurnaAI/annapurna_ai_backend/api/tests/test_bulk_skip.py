@@ -0,0 +1,94 @@
+import datetime
+from api.models import Attendance, Menu
+from .helpers import ApiTestCase
+
+
+class BulkSkipTests(ApiTestCase):
+    url = '/api/skip-meal/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.menus = self.create_menus(days=3)
+        self.headers = self.auth(self.student)
+
+    def bulk_skip(self, data):
+        return self.post_json(self.url, data, self.headers)
+
+    def skip_counts(self):
+        return {(menu.meal_date, menu.meal_type): menu.skip_count for menu in Menu.objects.all()}
+
+    def test_date_range_with_meal_types(self):
+        response = self.bulk_skip({
+            'start_date': self.today.isoformat(),
+            'end_date': (self.today + datetime.timedelta(days=3)).isoformat(),
+            'meal_types': ['lunch', 'Dinner'],
+        })
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual(len(results), 8)
+        # The fourth day has no menus
+        self.assertEqual([result['status'] for result in results], ['skipped'] * 6 + ['not_found'] * 2)
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 6)
+        counts = self.skip_counts()
+        self.assertEqual(counts[(self.today, 'Lunch')], 1)
+        self.assertEqual(counts[(self.today, 'Breakfast')], 0)
+
+    def test_duplicates_and_already_skipped_meals(self):
+        lunch = {'meal_date': self.today.isoformat(), 'meal_type': 'Lunch'}
+        self.assertEqual(self.bulk_skip({'meals': [lunch]}).status_code, 201)
+
+        dinner = {'meal_date': self.today.isoformat(), 'meal_type': 'dinner'}
+        response = self.bulk_skip({'meals': [lunch, dinner, dinner]})
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([(result['meal_type'], result['status']) for result in results],
+                         [('Lunch', 'already_skipped'), ('Dinner', 'skipped')])
+        self.assertTrue(all(result['attendance_id'] for result in results))
+
+        # Nothing new to skip is not an error
+        response = self.bulk_skip({'meals': [lunch, dinner]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['message'], '0 meal(s) marked as skipped.')
+        counts = self.skip_counts()
+        self.assertEqual((counts[(self.today, 'Lunch')], counts[(self.today, 'Dinner')]), (1, 1))
+
+    def test_counters_include_other_students(self):
+        other = self.create_user('other')
+        self.post_json('/api/skip-meal/', {'meal_date': self.today.isoformat(), 'meal_type': 'Lunch'},
+                       self.auth(other))
+        self.bulk_skip({'start_date': self.today.isoformat(), 'end_date': self.today.isoformat()})
+        self.assertEqual(self.skip_counts()[(self.today, 'Lunch')], 2)
+        self.assertEqual(self.skip_counts()[(self.today, 'Breakfast')], 1)
+
+    def test_meal_limit(self):
+        end = self.today + datetime.timedelta(days=30)
+        self.assertEqual(
+            self.bulk_skip({'start_date': self.today.isoformat(), 'end_date': end.isoformat()}).status_code, 201
+        )
+        too_long = self.bulk_skip({
+            'start_date': self.today.isoformat(), 'end_date': (end + datetime.timedelta(days=1)).isoformat()
+        })
+        self.assertEqual(too_long.status_code, 400)
+
+        meals = [
+            {'meal_date': (self.today + datetime.timedelta(days=offset)).isoformat(), 'meal_type': meal_type}
+            for offset in range(32) for meal_type in ('Breakfast', 'Lunch', 'Dinner')
+        ]
+        self.assertEqual(self.bulk_skip({'meals': meals[:93]}).status_code, 200)
+        self.assertEqual(self.bulk_skip({'meals': meals[:94]}).status_code, 400)
+
+    def test_invalid_requests(self):
+        invalid = [
+            {},
+            {'meals': 'Lunch'},
+            {'meals': [{'meal_date': self.today.isoformat()}]},
+            {'meals': [{'meal_date': 'tomorrow', 'meal_type': 'Lunch'}]},
+            {'start_date': self.today.isoformat(), 'end_date': (self.today - datetime.timedelta(days=1)).isoformat()},
+            {'meals': []},
+            [{'meal_date': self.today.isoformat(), 'meal_type': 'Lunch'}],
+            'Lunch',
+        ]
+        for data in invalid:
+            with self.subTest(data=data):
+                self.assertEqual(self.bulk_skip(data).status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+from api import events
+from api.dashboard import next_meal_type
+from api.models import Attendance
+from .helpers import ApiTestCase
+
+
+def parse_event(chunk):
+    """{field: value} of one Server-Sent Event, with data decoded from JSON."""
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().splitlines())
+    if 'data' in fields:
+        fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+class DashboardStreamTests(ApiTestCase):
+    url = '/api/dashboard/stream/'
+
+    def setUp(self):
+        super().setUp()
+        # Brokers outlive a test's event loop; start each test with fresh ones
+        events._brokers.clear()
+
+    def skip(self, menu):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(kitchen=self.kitchen, student=self.student, menu=menu)
+
+    async def open_stream(self, user, **extra):
+        token = await sync_to_async(self.login)(user)
+        return await AsyncClient().get(self.url, {'token': token}, **extra)
+
+    async def test_starts_with_a_full_snapshot(self):
+        menus = await sync_to_async(self.create_menus)()
+        response = await self.open_stream(self.manager)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = response.streaming_content
+        try:
+            self.assertEqual(await anext(chunks), b'retry: 3000\n\n')
+            event = parse_event(await anext(chunks))
+        finally:
+            await chunks.aclose()
+        self.assertEqual(event['event'], 'snapshot')
+        self.assertEqual(event['data']['total_students'], 1)
+        self.assertEqual({meal['menu_id'] for meal in event['data']['meals']}, {menu.id for menu in menus.values()})
+
+    async def test_pushes_only_changed_meals(self):
+        menus = await sync_to_async(self.create_menus)()
+        menu = menus[(self.today, next_meal_type())]
+        with mock.patch.object(events.DashboardBroker, 'poll_interval', 0.05):
+            response = await self.open_stream(self.manager)
+            chunks = response.streaming_content
+            try:
+                await anext(chunks)
+                await anext(chunks)
+                # Give the watcher time to start; nothing changed, so nothing may be pushed yet
+                await asyncio.sleep(0.2)
+                await sync_to_async(self.skip)(menu)
+                event = parse_event(await asyncio.wait_for(anext(chunks), timeout=5))
+            finally:
+                await chunks.aclose()
+        self.assertEqual(event['event'], 'delta')
+        self.assertEqual([(meal['menu_id'], meal['skipped_students']) for meal in event['data']['meals']],
+                         [(menu.id, 1)])
+
+    async def test_managers_only(self):
+        self.assertEqual((await self.open_stream(self.student)).status_code, 403)
+        self.assertEqual((await AsyncClient().get(self.url)).status_code, 401)
+
+    async def test_get_only(self):
+        token = await sync_to_async(self.login)(self.manager)
+        response = await AsyncClient().post(f'{self.url}?token={token}')
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET')
@@ -0,0 +1,61 @@
+from api.models import Feedback, MenuItem, MenuItemRatingStats
+from .helpers import ApiTestCase
+
+
+class FeedbackBatchTests(ApiTestCase):
+    url = '/api/feedback/'
+
+    def setUp(self):
+        super().setUp()
+        self.rice = MenuItem.objects.create(name='Rice', category='Main')
+        self.dal = MenuItem.objects.create(name='Dal', category='Main')
+        self.headers = self.auth(self.student)
+
+    def submit(self, data):
+        return self.post_json(self.url, data, self.headers)
+
+    def test_single_entry(self):
+        response = self.submit({'item_id': self.rice.id, 'rating': 4, 'comments': 'Good'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['message'], '1 feedback entry submitted successfully.')
+        feedback = Feedback.objects.get()
+        self.assertEqual((feedback.student_id, feedback.kitchen_id, feedback.rating, feedback.comments),
+                         (self.student.id, self.kitchen.id, 4, 'Good'))
+
+    def test_batch_with_partial_errors(self):
+        response = self.submit({'items': [
+            {'item_id': self.rice.id, 'rating': 5},
+            {'menu_item': self.dal.id, 'rating': 2},
+            {'item_id': self.rice.id, 'rating': 9},
+            {'item_id': 999999, 'rating': 3},
+            'not an object',
+        ]})
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['created', 'created', 'error', 'error', 'error'])
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3, 4])
+        self.assertIn('rating', results[2]['errors'])
+        self.assertEqual(results[3]['errors'], {'item_id': ['Menu item not found.']})
+        self.assertEqual(sorted(Feedback.objects.values_list('rating', flat=True)), [2, 5])
+
+        # The batch is folded into the per-item aggregates despite skipping signals
+        stats = {stats.menu_item_id: stats for stats in MenuItemRatingStats.objects.filter(kitchen=self.kitchen)}
+        self.assertEqual((stats[self.rice.id].count, stats[self.rice.id].rating_sum), (1, 5))
+        self.assertEqual((stats[self.dal.id].count, stats[self.dal.id].rating_5, stats[self.dal.id].rating_2),
+                         (1, 0, 1))
+
+    def test_plain_list(self):
+        response = self.submit([{'item_id': self.rice.id, 'rating': 3}, {'item_id': self.dal.id, 'rating': 4}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Feedback.objects.count(), 2)
+
+    def test_rejected_batches(self):
+        entries = [{'item_id': self.rice.id, 'rating': 3}] * 51
+        invalid = [{'items': []}, {'items': entries}, {'items': [{'item_id': self.rice.id, 'rating': 0}]}]
+        for data in invalid:
+            with self.subTest(entries=len(data['items'])):
+                self.assertEqual(self.submit(data).status_code, 400)
+        for data in (5, 'Great food', None):
+            with self.subTest(data=data):
+                self.assertEqual(self.submit(data).status_code, 400)
+        self.assertFalse(Feedback.objects.exists())
@@ -0,0 +1,43 @@
+import datetime
+from .helpers import ApiTestCase
+
+
+class DashboardForecastTests(ApiTestCase):
+    url = '/api/dashboard/forecast/'
+
+    def test_default_horizon_covers_every_meal_of_a_week(self):
+        menus = self.create_menus(days=2)
+        response = self.client.get(self.url, **self.auth(self.manager))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['start'], self.today.isoformat())
+        self.assertEqual(data['end'], (self.today + datetime.timedelta(days=6)).isoformat())
+        self.assertEqual(len(data['forecasts']), 7 * 3)
+        first = data['forecasts'][0]
+        self.assertEqual(first['meal_details']['type'], 'Breakfast')
+        self.assertEqual(first['meal_details']['menu_id'], menus[(self.today, 'Breakfast')].id)
+        self.assertEqual(first['live_data']['total_students'], 1)
+        self.assertIn('predicted_headcount', first['ai_predictions'])
+        # Days without menus are still forecast
+        self.assertIsNone(data['forecasts'][-1]['meal_details']['menu_id'])
+
+    def test_explicit_range(self):
+        start = self.today + datetime.timedelta(days=3)
+        response = self.client.get(self.url, {'start': start.isoformat(), 'end': start.isoformat()},
+                                   **self.auth(self.manager))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['meal_details']['type'] for row in response.json()['forecasts']],
+                         ['Breakfast', 'Lunch', 'Dinner'])
+
+    def test_rejects_invalid_ranges(self):
+        headers = self.auth(self.manager)
+        too_long = {'start': self.today.isoformat(), 'end': (self.today + datetime.timedelta(days=31)).isoformat()}
+        backwards = {'start': self.today.isoformat(), 'end': (self.today - datetime.timedelta(days=1)).isoformat()}
+        for params in (too_long, backwards, {'start': 'not-a-date'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params, **headers).status_code, 400)
+
+    def test_managers_only(self):
+        self.assertEqual(self.client.get(self.url, **self.auth(self.student)).status_code, 403)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
@@ -0,0 +1,78 @@
+import datetime
+from django.utils import timezone
+from api.feedback_stats import apply_feedback
+from api.models import Feedback, Kitchen, MenuItem
+from .helpers import ApiTestCase
+
+
+class ItemAnalyticsTests(ApiTestCase):
+    url = '/api/analytics/items/'
+
+    def setUp(self):
+        super().setUp()
+        self.rice = MenuItem.objects.create(name='Rice', category='Main')
+        self.dal = MenuItem.objects.create(name='Dal', category='Main')
+        self.kheer = MenuItem.objects.create(name='Kheer', category='Dessert')
+        for item, ratings in ((self.rice, [5, 5]), (self.dal, [2, 3]), (self.kheer, [4])):
+            for rating in ratings:
+                self.rate(item, rating)
+        self.headers = self.auth(self.manager)
+
+    def rate(self, item, rating, student=None, kitchen=None):
+        return Feedback.objects.create(
+            kitchen=kitchen or self.kitchen, student=student or self.student, menu_item=item, rating=rating
+        )
+
+    def names(self, entries):
+        return [entry['name'] for entry in entries]
+
+    def test_ranked_items(self):
+        response = self.client.get(self.url, {'limit': 2}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(self.names(data['top_items']), ['Rice', 'Kheer'])
+        self.assertEqual(self.names(data['bottom_items']), ['Dal', 'Kheer'])
+
+        dal = data['bottom_items'][0]
+        self.assertEqual((dal['count'], dal['average'], dal['stddev']), (2, 2.5, 0.5))
+        self.assertEqual(dal['histogram'], {'1': 0, '2': 1, '3': 1, '4': 0, '5': 0})
+        self.assertEqual(dal['last_7_days'], {'count': 2, 'average': 2.5})
+
+    def test_min_ratings(self):
+        data = self.client.get(self.url, {'min_ratings': 2}, **self.headers).json()
+        self.assertEqual(self.names(data['top_items']), ['Rice', 'Dal'])
+
+    def test_updates_and_deletes_keep_aggregates(self):
+        feedback = Feedback.objects.get(menu_item=self.kheer)
+        feedback.rating = 1
+        feedback.save()
+        data = self.client.get(self.url, **self.headers).json()
+        self.assertEqual(self.names(data['bottom_items'])[0], 'Kheer')
+
+        feedback.delete()
+        data = self.client.get(self.url, **self.headers).json()
+        self.assertNotIn('Kheer', self.names(data['top_items']))
+
+    def test_trends_compare_the_last_week_with_the_month(self):
+        # Two poor ratings of rice three weeks ago drag its 30-day average below this week's
+        old = timezone.now() - datetime.timedelta(days=21)
+        apply_feedback([
+            Feedback(kitchen=self.kitchen, student=self.student, menu_item=self.rice, rating=1, created_at=old)
+            for _ in range(2)
+        ])
+        data = self.client.get(self.url, **self.headers).json()
+        rice = data['trending_up'][0]
+        self.assertEqual((rice['name'], rice['change']), ('Rice', 2.0))
+        self.assertEqual(rice['last_30_days'], {'count': 4, 'average': 3.0})
+        self.assertEqual(data['trending_down'], [])
+
+    def test_other_kitchens_ratings_are_excluded(self):
+        other = Kitchen.objects.create(name='North Mess', slug='north-mess')
+        outsider = self.create_user('outsider', kitchen=other)
+        self.rate(self.dal, 5, student=outsider, kitchen=other)
+        data = self.client.get(self.url, **self.headers).json()
+        self.assertEqual(data['bottom_items'][0]['count'], 2)
+
+    def test_rejects_bad_parameters_and_students(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 'many'}, **self.headers).status_code, 400)
+        self.assertEqual(self.client.get(self.url, **self.auth(self.student)).status_code, 403)
@@ -0,0 +1,72 @@
+from api.models import Attendance, Counter, Kitchen, User
+from .helpers import ApiTestCase
+
+
+class KitchenIsolationTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.north = Kitchen.objects.create(name='North Mess', slug='north-mess')
+        self.north_student = self.create_user('north-student', kitchen=self.north)
+        self.north_manager = self.create_user('north-manager', role='manager', kitchen=self.north)
+        self.menus = self.create_menus()
+        self.north_menus = self.create_menus(kitchen=self.north)
+
+    def test_skips_land_on_the_students_kitchen(self):
+        payload = {'meal_date': self.today.isoformat(), 'meal_type': 'lunch'}
+        self.assertEqual(self.post_json('/api/skip-meal/', payload, self.auth(self.north_student)).status_code, 201)
+
+        attendance = Attendance.objects.get()
+        self.assertEqual(attendance.menu, self.north_menus[(self.today, 'Lunch')])
+        self.assertEqual(attendance.kitchen, self.north)
+        self.menus[(self.today, 'Lunch')].refresh_from_db()
+        self.assertEqual(self.menus[(self.today, 'Lunch')].skip_count, 0)
+
+    def test_listings_only_show_the_kitchens_menus(self):
+        own_ids = {menu.id for menu in self.menus.values()}
+        for url in ('/api/menus/', '/api/student/day/'):
+            with self.subTest(url=url):
+                data = self.client.get(url, **self.auth(self.student)).json()
+                menus = data['results'] if 'results' in data else data['menus']
+                self.assertEqual({menu['id'] for menu in menus}, own_ids)
+
+    def test_dashboards_count_their_own_students(self):
+        for number in range(3):
+            self.create_user(f'north{number}', kitchen=self.north)
+        self.assertEqual(Counter.get_value(Counter.student_total(self.kitchen.id)), 1)
+        self.assertEqual(Counter.get_value(Counter.student_total(self.north.id)), 4)
+
+        response = self.client.get(
+            '/api/dashboard/forecast/', {'start': self.today.isoformat(), 'end': self.today.isoformat()},
+            **self.auth(self.north_manager)
+        )
+        forecasts = response.json()['forecasts']
+        self.assertEqual({row['meal_details']['menu_id'] for row in forecasts},
+                         {menu.id for menu in self.north_menus.values()})
+        self.assertEqual(forecasts[0]['live_data']['total_students'], 4)
+
+    def test_moving_kitchens_moves_the_student_total(self):
+        self.student.kitchen = self.north
+        self.student.save()
+        self.assertEqual(Counter.get_value(Counter.student_total(self.kitchen.id)), 0)
+        self.assertEqual(Counter.get_value(Counter.student_total(self.north.id)), 2)
+
+    def test_registration_picks_a_kitchen_by_slug(self):
+        response = self.post_json('/api/register/', {
+            'username': 'newcomer', 'email': 'newcomer@example.com', 'password': self.password, 'kitchen': 'north-mess'
+        }, {})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(User.objects.get(email='newcomer@example.com').kitchen, self.north)
+
+        response = self.post_json('/api/register/', {
+            'username': 'default', 'email': 'default@example.com', 'password': self.password
+        }, {})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(User.objects.get(email='default@example.com').kitchen, self.kitchen)
+
+    def test_accounts_without_a_kitchen_are_refused(self):
+        staff = User.objects.create_user(username='staff', email='staff@example.com', password=self.password,
+                                         role='manager')
+        payload = {'meal_date': self.today.isoformat(), 'meal_type': 'Lunch'}
+        self.assertEqual(self.post_json('/api/skip-meal/', payload, self.auth(staff)).status_code, 403)
+        self.assertEqual(self.client.get('/api/dashboard/forecast/', **self.auth(staff)).status_code, 403)
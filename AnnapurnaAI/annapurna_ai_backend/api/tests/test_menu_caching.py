@@ -0,0 +1,76 @@
+import datetime
+from api.models import Kitchen, Menu, MenuItem
+from .helpers import ApiTestCase
+
+
+class MenuConditionalGetTests(ApiTestCase):
+    url = '/api/menus/'
+
+    def setUp(self):
+        super().setUp()
+        self.tomorrow = self.today + datetime.timedelta(days=1)
+        self.menus = self.create_menus(days=2)
+        self.headers = self.auth(self.student)
+
+    def get(self, params, **headers):
+        return self.client.get(self.url, params, **self.headers, **headers)
+
+    def change(self, change):
+        # Version stamps are bumped when the transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+    def test_revalidation_without_queries(self):
+        response = self.get({'meal_date': self.today.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            not_modified = self.get({'meal_date': self.today.isoformat()}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        since = self.get({'meal_date': self.today.isoformat()}, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+    def test_cached_render_is_reused(self):
+        first = self.get({'start': self.today.isoformat()})
+        with self.assertNumQueries(0):
+            second = self.get({'start': self.today.isoformat()})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+
+    def test_menu_changes_invalidate_only_their_listings(self):
+        today_etag = self.get({'meal_date': self.today.isoformat()})['ETag']
+        tomorrow_etag = self.get({'meal_date': self.tomorrow.isoformat()})['ETag']
+        range_etag = self.get({'start': self.today.isoformat()})['ETag']
+
+        rice = MenuItem.objects.create(name='Rice', category='Main')
+        self.change(lambda: self.menus[(self.tomorrow, 'Lunch')].items.add(rice))
+
+        self.assertEqual(self.get({'meal_date': self.today.isoformat()}, HTTP_IF_NONE_MATCH=today_etag).status_code, 304)
+        changed = self.get({'meal_date': self.tomorrow.isoformat()}, HTTP_IF_NONE_MATCH=tomorrow_etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], tomorrow_etag)
+        self.assertEqual(changed.json()[1]['items'][0]['name'], 'Rice')
+        self.assertEqual(self.get({'start': self.today.isoformat()}, HTTP_IF_NONE_MATCH=range_etag).status_code, 200)
+
+    def test_other_kitchens_changes_keep_listings_cached(self):
+        etag = self.get({'meal_date': self.today.isoformat()})['ETag']
+        north = Kitchen.objects.create(name='North Hostel', slug='north-hostel')
+        self.change(lambda: Menu.objects.create(kitchen=north, meal_date=self.today, meal_type='Lunch'))
+        self.assertEqual(self.get({'meal_date': self.today.isoformat()}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_menu_item_changes_invalidate_every_listing(self):
+        rice = MenuItem.objects.create(name='Rice', category='Main')
+        self.menus[(self.today, 'Lunch')].items.add(rice)
+        etag = self.get({'meal_date': self.today.isoformat()})['ETag']
+
+        def rename():
+            rice.name = 'Jeera Rice'
+            rice.save()
+        self.change(rename)
+        response = self.get({'meal_date': self.today.isoformat()}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[1]['items'][0]['name'], 'Jeera Rice')
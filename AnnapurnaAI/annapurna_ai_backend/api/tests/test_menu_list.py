@@ -0,0 +1,65 @@
+import base64
+import datetime
+from api.models import MenuItem
+from .helpers import ApiTestCase
+
+
+class MenuListTests(ApiTestCase):
+    url = '/api/menus/'
+
+    def setUp(self):
+        super().setUp()
+        self.start = datetime.date(2026, 1, 1)
+        self.menus = self.create_menus(days=4, start=self.start)
+        self.rice = MenuItem.objects.create(name='Rice', category='Main')
+        self.menus[(self.start, 'Lunch')].items.add(self.rice)
+        self.headers = self.auth(self.student)
+
+    def get(self, params):
+        response = self.client.get(self.url, params, **self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_pages_follow_the_cursor_in_serving_order(self):
+        seen, page = [], self.get({'start': self.start.isoformat(), 'page_size': 2})
+        while True:
+            self.assertLessEqual(len(page['results']), 2)
+            seen += [(menu['meal_date'], menu['meal_type']) for menu in page['results']]
+            if not page['next']:
+                break
+            page = self.client.get(page['next'], **self.headers).json()
+
+        expected = [
+            ((self.start + datetime.timedelta(days=offset)).isoformat(), meal_type)
+            for offset in range(4) for meal_type in ('Breakfast', 'Lunch', 'Dinner')
+        ]
+        self.assertEqual(seen, expected)
+
+    def test_date_range_and_meal_type_filters(self):
+        page = self.get({
+            'start': (self.start + datetime.timedelta(days=1)).isoformat(),
+            'end': (self.start + datetime.timedelta(days=2)).isoformat(),
+            'meal_type': 'lunch,dinner',
+        })
+        self.assertIsNone(page['next'])
+        self.assertEqual([(menu['meal_date'][-2:], menu['meal_type']) for menu in page['results']],
+                         [('02', 'Lunch'), ('02', 'Dinner'), ('03', 'Lunch'), ('03', 'Dinner')])
+
+    def test_single_day_is_unpaginated_with_items(self):
+        menus = self.get({'meal_date': self.start.isoformat()})
+        self.assertEqual([menu['meal_type'] for menu in menus], ['Breakfast', 'Lunch', 'Dinner'])
+        self.assertEqual(menus[1]['items'], [{'id': self.rice.id, 'name': 'Rice', 'category': 'Main'}])
+
+    def test_items_are_prefetched(self):
+        for menu in self.menus.values():
+            menu.items.add(self.rice)
+        # Menus and their items, however many menus there are; the user comes from the token's claims
+        with self.assertNumQueries(2):
+            page = self.get({'start': self.start.isoformat()})
+        self.assertEqual(len(page['results']), 12)
+
+    def test_rejects_bad_cursors_and_dates(self):
+        bad_cursor = base64.urlsafe_b64encode(b'2026-01-01|Brunch').decode()
+        for params in ({'cursor': 'not-base64!'}, {'cursor': bad_cursor}, {'start': '01/01/2026'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params, **self.headers).status_code, 400)
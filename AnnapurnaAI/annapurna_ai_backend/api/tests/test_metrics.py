@@ -0,0 +1,67 @@
+from asgiref.sync import sync_to_async
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from .helpers import ApiTestCase
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(ApiTestCase):
+    day_route = 'api/student/day/'
+
+    def observed_queries(self, route, method='GET'):
+        labels = {'view': route, 'method': method}
+        return sample('annapurna_http_db_queries_count', **labels), sample('annapurna_http_db_queries_sum', **labels)
+
+    def test_requests_are_recorded_by_route(self):
+        self.create_menus()
+        headers = self.auth(self.student)
+        before_count, before_queries = self.observed_queries(self.day_route)
+        before_ok = sample('annapurna_http_request_duration_seconds_count', view=self.day_route, method='GET',
+                           status='200')
+
+        self.assertEqual(self.client.get('/api/student/day/', **headers).status_code, 200)
+
+        count, queries = self.observed_queries(self.day_route)
+        self.assertEqual(count - before_count, 1)
+        # Menus with their items and the student's own skips
+        self.assertEqual(queries - before_queries, 2)
+        self.assertEqual(
+            sample('annapurna_http_request_duration_seconds_count', view=self.day_route, method='GET',
+                   status='200') - before_ok, 1
+        )
+        self.assertGreater(sample('annapurna_http_response_size_bytes_sum', view=self.day_route, method='GET'), 0)
+
+    async def test_async_views_count_queries_run_on_worker_threads(self):
+        await sync_to_async(self.create_menus)()
+        token = await sync_to_async(self.login)(self.manager)
+        before_count, before_queries = self.observed_queries('api/dashboard/')
+
+        response = await self.async_client.get('/api/dashboard/', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertIn(response.status_code, (200, 404))
+        count, queries = self.observed_queries('api/dashboard/')
+        self.assertEqual(count - before_count, 1)
+        self.assertGreater(queries - before_queries, 0)
+
+    def test_unresolved_paths_share_one_label(self):
+        before = sample('annapurna_http_request_duration_seconds_count', view='<unresolved>', method='GET',
+                        status='404')
+        self.client.get('/no/such/page/')
+        self.assertEqual(
+            sample('annapurna_http_request_duration_seconds_count', view='<unresolved>', method='GET',
+                   status='404') - before, 1
+        )
+
+    def test_exposition(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'annapurna_http_request_duration_seconds', response.content)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,30 @@
+import re
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from api.models import Attendance, User
+
+
+class PopulateDataTests(TestCase):
+
+    def populate(self, seed):
+        output = StringIO()
+        call_command('populate_data', '--students', '20', '--days', '3', '--seed', str(seed), stdout=output)
+        output = output.getvalue()
+        return {
+            label: int(rows)
+            for label, rows in re.findall(r'^  (Students|Attendance): (\d+) rows', output, re.MULTILINE)
+        }, int(re.search(r'Skip records inserted: (\d+)', output).group(1))
+
+    def test_reports_the_rows_actually_inserted(self):
+        reported, summary = self.populate(seed=1)
+        self.assertEqual(reported['Students'], User.objects.filter(role='student').count())
+        self.assertEqual(reported['Attendance'], Attendance.objects.count())
+        self.assertEqual(summary, reported['Attendance'])
+
+        # A second run with other samples only adds the (student, menu) pairs not skipped yet
+        before = Attendance.objects.count()
+        reported, summary = self.populate(seed=2)
+        self.assertEqual(reported['Students'], 0)
+        self.assertEqual(reported['Attendance'], Attendance.objects.count() - before)
+        self.assertEqual(summary, reported['Attendance'])
@@ -0,0 +1,68 @@
+from api.models import Ingredient, MenuItem, RecipeLine
+from .helpers import ApiTestCase
+
+
+class PrepSheetTests(ApiTestCase):
+    url = '/api/dashboard/forecast/'
+
+    def setUp(self):
+        super().setUp()
+        menus = self.create_menus(days=2)
+        self.lunch = menus[(self.today, 'Lunch')]
+        self.dinner = menus[(self.today, 'Dinner')]
+        self.plain = menus[(self.today, 'Breakfast')]
+
+        rice = Ingredient.objects.create(name='Rice')
+        lentils = Ingredient.objects.create(name='Lentils')
+        self.rice = MenuItem.objects.create(name='Jeera Rice', category='Main')
+        # Only half the diners take dal
+        self.dal = MenuItem.objects.create(name='Dal', category='Main', uptake_rate=0.5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rice_line = RecipeLine.objects.create(menu_item=self.rice, ingredient=rice, quantity_per_portion=0.1)
+            RecipeLine.objects.create(menu_item=self.dal, ingredient=lentils, quantity_per_portion=0.08)
+        self.lunch.items.add(self.rice, self.dal)
+        self.dinner.items.add(self.rice)
+        self.plain.items.add(MenuItem.objects.create(name='Poha', category='Main'))
+
+        # Enough diners that every quantity rounds to a non-zero amount
+        for number in range(20):
+            self.create_user(f'diner{number}')
+        self.headers = self.auth(self.manager)
+
+    def forecasts(self):
+        response = self.client.get(
+            self.url, {'start': self.today.isoformat(), 'end': self.today.isoformat()}, **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return {row['meal_details']['menu_id']: row['ai_predictions'] for row in data['forecasts']}, data
+
+    def test_sheets_scale_recipes_by_the_forecast(self):
+        forecasts, data = self.forecasts()
+        lunch, dinner = forecasts[self.lunch.id], forecasts[self.dinner.id]
+        self.assertEqual(lunch['prep_sheet'], {
+            'Lentils (kg)': round(0.04 * lunch['predicted_headcount'], 1),
+            'Rice (kg)': round(0.1 * lunch['predicted_headcount'], 1),
+        })
+        self.assertEqual(dinner['prep_sheet'], {'Rice (kg)': round(0.1 * dinner['predicted_headcount'], 1)})
+        self.assertEqual(data['procurement'], {
+            'Lentils (kg)': round(0.04 * lunch['predicted_headcount'], 1),
+            'Rice (kg)': round(0.1 * (lunch['predicted_headcount'] + dinner['predicted_headcount']), 1),
+        })
+
+    def test_menus_without_recipes_keep_the_generic_sheet(self):
+        forecasts, _ = self.forecasts()
+        breakfast = forecasts[self.plain.id]
+        self.assertEqual(breakfast['prep_sheet'], {
+            'Rice (kg)': round(0.1 * breakfast['predicted_headcount'], 1),
+            'Dal (kg)': round(0.06 * breakfast['predicted_headcount'], 1),
+        })
+
+    def test_recipe_changes_rebuild_the_matrix(self):
+        self.forecasts()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rice_line.quantity_per_portion = 0.2
+            self.rice_line.save()
+        forecasts, _ = self.forecasts()
+        dinner = forecasts[self.dinner.id]
+        self.assertEqual(dinner['prep_sheet'], {'Rice (kg)': round(0.2 * dinner['predicted_headcount'], 1)})
@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from api import events, forecast_cache
+from api.dashboard import next_meal_type
+from api.models import Attendance, Counter, Menu, User
+from .helpers import ApiTestCase
+
+
+class SkipCounterTests(ApiTestCase):
+    """Menu.skip_count and the kitchen's student total follow skips, unskips and accounts."""
+
+    def setUp(self):
+        super().setUp()
+        self.menus = self.create_menus()
+        self.menu = self.menus[(self.today, next_meal_type())]
+
+    def skip(self, user, menu):
+        return self.post_json('/api/skip-meal/', {'meal_date': menu.meal_date.isoformat(), 'meal_type': menu.meal_type},
+                              self.auth(user))
+
+    def live_data(self):
+        response = self.client.get('/api/dashboard/', **self.auth(self.manager))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['live_data']
+
+    def test_skip_and_unskip(self):
+        other = self.create_user('other')
+        response = self.skip(self.student, self.menu)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.skip(other, self.menu).status_code, 201)
+        # Skipping twice is not counted twice
+        self.assertEqual(self.skip(self.student, self.menu).status_code, 200)
+        self.menu.refresh_from_db()
+        self.assertEqual(self.menu.skip_count, 2)
+        self.assertEqual(self.live_data(), {'total_students': 2, 'skipped_students': 2, 'live_headcount': 0})
+
+        attendance_id = response.json()['attendance_id']
+        response = self.client.delete(f'/api/attendance/{attendance_id}/', **self.auth(self.student))
+        self.assertEqual(response.status_code, 204)
+        self.menu.refresh_from_db()
+        self.assertEqual(self.menu.skip_count, 1)
+        self.assertEqual(self.live_data()['live_headcount'], 1)
+
+    def test_malformed_skip_requests(self):
+        headers = self.auth(self.student)
+        meal = {'meal_date': self.menu.meal_date.isoformat(), 'meal_type': self.menu.meal_type}
+        for body in (json.dumps([meal]), '"Lunch"', '42', '{"meal_date": ', json.dumps({'meal_type': 'Lunch'})):
+            with self.subTest(body=body):
+                response = self.client.post('/api/skip-meal/', body, content_type='application/json', **headers)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/skip-meal/', **headers).status_code, 405)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_unskip_of_another_students_skip_is_refused(self):
+        attendance_id = self.skip(self.student, self.menu).json()['attendance_id']
+        other = self.create_user('other')
+        response = self.client.delete(f'/api/attendance/{attendance_id}/', **self.auth(other))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Menu.objects.get(pk=self.menu.pk).skip_count, 1)
+
+    def test_student_total_follows_accounts(self):
+        response = self.post_json('/api/register/', {
+            'username': 'new', 'email': 'new@example.com', 'password': self.password, 'role': 'student'
+        }, {})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Counter.get_value(Counter.student_total(self.kitchen.id)), 2)
+
+        User.objects.get(email='new@example.com').delete()
+        self.student.role = 'manager'
+        self.student.save()
+        self.assertEqual(Counter.get_value(Counter.student_total(self.kitchen.id)), 0)
+        self.assertEqual(self.live_data()['total_students'], 0)
+
+    def test_rebuild_repairs_counters_and_invalidates_caches(self):
+        Attendance.objects.create(kitchen=self.kitchen, student=self.student, menu=self.menu)
+        Menu.objects.update(skip_count=7)
+        Counter.objects.all().delete()
+        generation = forecast_cache._get_generation(self.kitchen.id)
+        revision = cache.get(events._revision_key(self.kitchen.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_counters', stdout=StringIO())
+
+        self.assertEqual({menu.pk: menu.skip_count for menu in Menu.objects.all()},
+                         {menu.pk: int(menu == self.menu) for menu in self.menus.values()})
+        self.assertEqual(Counter.get_value(Counter.student_total(self.kitchen.id)), 1)
+        # Cached forecasts and live dashboards must not keep serving the old counts
+        self.assertGreater(forecast_cache._get_generation(self.kitchen.id), generation)
+        self.assertGreater(cache.get(events._revision_key(self.kitchen.id)), revision)
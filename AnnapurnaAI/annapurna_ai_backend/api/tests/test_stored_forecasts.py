@@ -0,0 +1,55 @@
+from io import StringIO
+from django.core.management import call_command
+from api.models import Attendance, Forecast
+from .helpers import ApiTestCase
+
+
+class StoredForecastTests(ApiTestCase):
+    url = '/api/dashboard/forecast/'
+
+    def setUp(self):
+        super().setUp()
+        self.menus = self.create_menus(days=2)
+        self.lunch = self.menus[(self.today, 'Lunch')]
+        self.headers = self.auth(self.manager)
+
+    def schedule(self):
+        output = StringIO()
+        call_command('run_forecast_scheduler', '--once', '--horizon-days', '2', stdout=output)
+        return output.getvalue()
+
+    def predictions(self):
+        response = self.client.get(self.url, {'start': self.today.isoformat(), 'end': self.today.isoformat()},
+                                   **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return {row['meal_details']['menu_id']: row['ai_predictions'] for row in response.json()['forecasts']}
+
+    def test_dashboard_serves_current_forecasts(self):
+        self.assertIn('6 of 6 upcoming menus re-forecast', self.schedule())
+        stored = {forecast.menu_id: forecast for forecast in Forecast.objects.all()}
+
+        for menu_id, prediction in self.predictions().items():
+            self.assertEqual(prediction['predicted_headcount'], stored[menu_id].predicted_headcount)
+            self.assertEqual(prediction['computed_at'], stored[menu_id].computed_at.isoformat())
+
+    def test_changed_inputs_are_recomputed(self):
+        self.schedule()
+        self.create_user('latecomer')
+        # Every stored forecast counted one student fewer; they are computed on demand until the next pass
+        self.assertTrue(all('computed_at' not in prediction for prediction in self.predictions().values()))
+
+        self.assertIn('6 of 6 upcoming menus re-forecast', self.schedule())
+        self.assertEqual(Forecast.objects.count(), 12)
+        latest = Forecast.objects.filter(menu=self.lunch).latest('computed_at', 'id')
+        self.assertEqual(latest.total_students, 2)
+        self.assertEqual(self.predictions()[self.lunch.id]['computed_at'], latest.computed_at.isoformat())
+
+    def test_skips_only_matter_to_heuristic_forecasts(self):
+        self.schedule()
+        model_version = Forecast.objects.get(menu=self.lunch).model_version
+        Attendance.objects.create(kitchen=self.kitchen, student=self.student, menu=self.lunch)
+
+        served_stored = 'computed_at' in self.predictions()[self.lunch.id]
+        self.assertEqual(served_stored, model_version is not None)
+        refreshed = 0 if model_version is not None else 1
+        self.assertIn(f'{refreshed} of 6 upcoming menus re-forecast', self.schedule())
@@ -0,0 +1,45 @@
+import datetime
+from api.models import Attendance, MenuItem
+from .helpers import ApiTestCase
+
+
+class StudentDayTests(ApiTestCase):
+    url = '/api/student/day/'
+
+    def setUp(self):
+        super().setUp()
+        self.tomorrow = self.today + datetime.timedelta(days=1)
+        self.menus = self.create_menus(days=2)
+        self.lunch = self.menus[(self.today, 'Lunch')]
+        self.lunch.items.add(MenuItem.objects.create(name='Dal Tadka', category='Main'))
+        self.headers = self.auth(self.student)
+
+    def test_todays_menus_with_own_skips(self):
+        own = Attendance.objects.create(kitchen=self.kitchen, student=self.student, menu=self.lunch)
+        # Other students' skips are not the student's own
+        other = self.create_user('other')
+        Attendance.objects.create(kitchen=self.kitchen, student=other, menu=self.menus[(self.today, 'Dinner')])
+
+        response = self.client.get(self.url, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['start'], data['end']), (self.today.isoformat(), self.today.isoformat()))
+        self.assertEqual(
+            [(menu['meal_type'], menu['skipped'], menu['attendance_id']) for menu in data['menus']],
+            [('Breakfast', False, None), ('Lunch', True, own.id), ('Dinner', False, None)]
+        )
+        self.assertEqual(data['menus'][1]['items'][0]['name'], 'Dal Tadka')
+
+    def test_range_in_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                self.url, {'start': self.today.isoformat(), 'end': self.tomorrow.isoformat()}, **self.headers
+            )
+        self.assertEqual(len(response.json()['menus']), 6)
+
+    def test_rejects_invalid_ranges(self):
+        too_long = {'start': self.today.isoformat(), 'end': (self.today + datetime.timedelta(days=14)).isoformat()}
+        backwards = {'start': self.tomorrow.isoformat(), 'end': self.today.isoformat()}
+        for params in (too_long, backwards, {'date': 'today'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params, **self.headers).status_code, 400)
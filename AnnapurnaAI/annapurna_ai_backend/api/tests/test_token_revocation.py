@@ -0,0 +1,62 @@
+from .helpers import ApiTestCase
+
+
+class TokenRevocationTests(ApiTestCase):
+    url = '/api/student/day/'
+
+    def get(self, token):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def login_pair(self, user):
+        response = self.client.post(
+            '/api/login/', {'email': user.email, 'password': self.password}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refresh(self, refresh_token):
+        response = self.client.post('/api/token/refresh/', {'refresh': refresh_token}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['access']
+
+    def test_claims_auth_skips_the_user_lookup(self):
+        self.create_menus()
+        token = self.login(self.student)
+        # Only the menus and the student's skips, no auth_user query
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get(token).status_code, 200)
+
+    def test_password_change_revokes_earlier_tokens(self):
+        token = self.login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.set_password(self.password)
+            self.student.save()
+
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_revoked')
+        # Logging in again, within the same second, is enough
+        self.assertEqual(self.get(self.login(self.student)).status_code, 200)
+
+    def test_refreshed_tokens_inherit_the_revocation(self):
+        tokens = self.login_pair(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.role = 'manager'
+            self.student.save()
+
+        self.assertEqual(self.get(self.refresh(tokens['refresh'])).status_code, 401)
+        response = self.get(self.refresh(self.login_pair(self.student)['refresh']))
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletion_revokes_tokens(self):
+        token = self.login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+        self.assertEqual(self.get(token).status_code, 401)
+
+    def test_unrelated_changes_keep_tokens(self):
+        token = self.login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.first_name = 'Asha'
+            self.student.save()
+        self.assertEqual(self.get(token).status_code, 200)
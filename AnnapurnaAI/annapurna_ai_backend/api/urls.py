@@ -1,12 +1,16 @@
 from django.urls import path
 from .views import (
     RegisterView, 
-    SkipMealView, 
+    skip_meal,
+    BulkSkipMealView,
     SubmitFeedbackView, 
-    DashboardSummaryView,
-    MenuListView,
+    dashboard_summary,
+    DashboardForecastView,
+    dashboard_stream,
+    ItemAnalyticsView,
+    menu_list,
+    StudentDayView,
     AttendanceListView,
-    FeedbackView,
     AttendanceDeleteView
 )
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -24,13 +28,17 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
     # Student Features
-    path('skip-meal/', SkipMealView.as_view(), name='skip-meal'),
+    path('skip-meal/', skip_meal, name='skip-meal'),
+    path('skip-meal/bulk/', BulkSkipMealView.as_view(), name='skip-meal-bulk'),
     path('feedback/', SubmitFeedbackView.as_view(), name='feedback'),
-    path('menus/', MenuListView.as_view(), name='menu-list'),
+    path('menus/', menu_list, name='menu-list'),
+    path('student/day/', StudentDayView.as_view(), name='student-day'),
     path('attendance/', AttendanceListView.as_view(), name='attendance-list'),
     path('attendance/<int:pk>/', AttendanceDeleteView.as_view(), name='attendance-delete'),
-    path('feedback/', FeedbackView.as_view(), name='feedback'),
 
     # Manager Features
-    path('dashboard/', DashboardSummaryView.as_view(), name='dashboard'),
+    path('dashboard/', dashboard_summary, name='dashboard'),
+    path('dashboard/forecast/', DashboardForecastView.as_view(), name='dashboard-forecast'),
+    path('dashboard/stream/', dashboard_stream, name='dashboard-stream'),
+    path('analytics/items/', ItemAnalyticsView.as_view(), name='item-analytics'),
 ]
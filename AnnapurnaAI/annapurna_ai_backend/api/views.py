@@ -1,160 +1,774 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.request import Request
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
-from .models import User, Menu, Attendance, Feedback, MenuItem
-from .serializers import UserSerializer, MenuSerializer, AttendanceSerializer, FeedbackSerializer, MenuItemSerializer
-from .permissions import IsManager
-from django.shortcuts import get_object_or_404
+from .models import User, Menu, Attendance, Feedback, MenuItem, Counter, MenuItemRatingStats, MenuItemDailyRating
+from .serializers import (
+    UserSerializer, MenuSerializer, AttendanceSerializer, StudentMenuSerializer, FeedbackEntrySerializer
+)
+from .permissions import HasKitchen, IsManager
+from .authentication import ClaimsJWTAuthentication
+from .pagination import MenuKeysetPagination
+from .routers import replica_reads
+from .menu_versions import get_menu_version
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.db import transaction
 import datetime
-from ml_model.prediction import get_ai_prediction
+import json
+from calendar import timegm
+from .forecast_cache import aget_cached_prediction, get_cached_predictions
+from .dashboard import next_meal_type as get_next_meal_type
+from .events import get_broker, format_event, bump_dashboard_revision
+from .forecast_cache import invalidate_forecasts
+from .feedback_stats import HISTOGRAM_FIELDS, apply_feedback
+from .prep import build_prep_sheets
+from .forecasts import precomputed_predictions
+from django.db.models import Count, Exists, F, FloatField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce
+import asyncio
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+
+def _parse_date(value):
+    try:
+        return datetime.datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+
+# Hot endpoints are plain async views (DRF's APIView is sync-only), so they authenticate
+# and answer the way DRF would by hand
+
+def _authenticate_user(request, authenticator, allow_query_token=False):
+    # EventSource cannot set headers, so the stream's access token may also come as ?token=
+    raw_token = request.GET.get('token') if allow_query_token else None
+    if raw_token:
+        return authenticator.get_user(authenticator.get_validated_token(raw_token.encode()))
+    result = authenticator.authenticate(request)
+    return result[0] if result else None
+
+
+async def _aauthenticate(request, authenticator_class=ClaimsJWTAuthentication, allow_query_token=False):
+    """Return the authenticated user for an async view, or None."""
+    try:
+        return await sync_to_async(_authenticate_user)(request, authenticator_class(), allow_query_token)
+    except (AuthenticationFailed, TokenError):
+        return None
+
+
+def _unauthorized():
+    return JsonResponse({"error": "Authentication credentials were not provided or are invalid."}, status=401)
+
+
+def _forbidden(message="You do not have permission to perform this action."):
+    return JsonResponse({"error": message}, status=403)
+
+
+def _no_kitchen():
+    return _forbidden(HasKitchen.message)
+
+
+def _method_not_allowed(request, allowed):
+    response = JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    response['Allow'] = ', '.join(allowed)
+    return response
+
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
-class MenuListView(APIView):
-    permission_classes = [IsAuthenticated]
-    
+def _menu_version(request, kitchen_id):
+    # Single-day listings have their own version; anything else uses the all-dates version
+    try:
+        meal_date = _parse_date(request.GET['meal_date']) if request.GET.get('meal_date') else None
+    except ValueError:
+        return None, None
+    return get_menu_version(kitchen_id, meal_date)
+
+
+def _list_menus(request, kitchen_id):
+    """Render a kitchen's menu listing; returns (data, status)."""
+    meal_date = request.query_params.get('meal_date')
+    start = request.query_params.get('start')
+    end = request.query_params.get('end')
+    meal_types = [
+        meal_type.capitalize()
+        for value in request.query_params.getlist('meal_type')
+        for meal_type in value.split(',') if meal_type
+    ]
+
+    try:
+        meal_date = _parse_date(meal_date) if meal_date else None
+        start = _parse_date(start) if start else None
+        end = _parse_date(end) if end else None
+    except ValueError as e:
+        return {"error": str(e)}, status.HTTP_400_BAD_REQUEST
+
+    # Items are fetched in one extra query instead of one per menu
+    menus = Menu.objects.filter(kitchen_id=kitchen_id).prefetch_related('items')
+    if meal_types:
+        menus = menus.filter(meal_type__in=meal_types)
+
+    if meal_date:
+        # A single day is at most one menu per meal type: return it unpaginated
+        menus = menus.filter(meal_date=meal_date).order_by(Menu.meal_rank())
+        return MenuSerializer(menus, many=True).data, status.HTTP_200_OK
+
+    if start:
+        menus = menus.filter(meal_date__gte=start)
+    if end:
+        menus = menus.filter(meal_date__lte=end)
+
+    paginator = MenuKeysetPagination()
+    try:
+        page = paginator.paginate_queryset(menus, request)
+    except ValidationError as e:
+        return e.detail, status.HTTP_400_BAD_REQUEST
+    return paginator.get_paginated_response(MenuSerializer(page, many=True).data).data, status.HTTP_200_OK
+
+
+def _render_menu_list(request, kitchen_id):
+    # Read from the primary: renders are cached under the version the primary's commit bumped,
+    # and a lagging replica would pin the old menus to it until the cache entry expires
+    return _list_menus(Request(request), kitchen_id)
+
+
+async def menu_list(request):
+    """The kitchen's menus for a day or a keyset-paginated date range, with ETag/Last-Modified revalidation."""
+    if request.method != 'GET':
+        return _method_not_allowed(request, ['GET'])
+    user = await _aauthenticate(request)
+    if user is None:
+        return _unauthorized()
+    if user.kitchen_id is None:
+        return _no_kitchen()
+
+    etag, last_modified = _menu_version(request, user.kitchen_id)
+    cache_key = None
+    if etag:
+        # If-None-Match / If-Modified-Since are answered with 304 from cached version stamps,
+        # before any query runs
+        not_modified = get_conditional_response(
+            request, etag=quote_etag(etag), last_modified=timegm(last_modified.utctimetuple())
+        )
+        if not_modified is not None:
+            # A 304 carries the validators it would have sent with the full response
+            not_modified['ETag'] = quote_etag(etag)
+            not_modified['Last-Modified'] = http_date(timegm(last_modified.utctimetuple()))
+            not_modified['Cache-Control'] = 'private, no-cache'
+            return not_modified
+
+        # Rendered payloads are cached per version, so a menu change makes old entries unreachable
+        params = sorted((key, value) for key in request.GET for value in request.GET.getlist(key))
+        cache_key = f"menus:response:{etag}:{urlencode(params)}"
+        data, status_code = await cache.aget(cache_key), status.HTTP_200_OK
+
+    if not cache_key or data is None:
+        data, status_code = await sync_to_async(_render_menu_list)(request, user.kitchen_id)
+        if cache_key and status_code == status.HTTP_200_OK:
+            await cache.aset(cache_key, data, timeout=settings.MENU_CACHE_TIMEOUT)
+
+    response = JsonResponse(data, status=status_code, safe=False)
+    if etag:
+        response['ETag'] = quote_etag(etag)
+        response['Last-Modified'] = http_date(timegm(last_modified.utctimetuple()))
+    # Let browsers keep the response but revalidate it on every use
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class StudentDayView(APIView):
+    permission_classes = [IsAuthenticated, HasKitchen]
+    authentication_classes = [ClaimsJWTAuthentication]
+    max_days = 14
+
     def get(self, request, *args, **kwargs):
-        meal_date = request.query_params.get('meal_date')
-        
-        if meal_date:
-            try:
-                date_obj = datetime.datetime.strptime(meal_date, '%Y-%m-%d').date()
-                menus = Menu.objects.filter(meal_date=date_obj)
-            except ValueError:
-                return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            menus = Menu.objects.all()
-        
-        serializer = MenuSerializer(menus, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        try:
+            if request.query_params.get('date'):
+                start = end = _parse_date(request.query_params['date'])
+            else:
+                start = _parse_date(request.query_params['start']) if request.query_params.get('start') else datetime.date.today()
+                end = _parse_date(request.query_params['end']) if request.query_params.get('end') else start
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        if end < start:
+            return Response({"error": "end must not be before start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days + 1 > self.max_days:
+            return Response({"error": f"At most {self.max_days} days can be requested."},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-class SkipMealView(APIView):
-    permission_classes = [IsAuthenticated]
+        # Skip state is joined in SQL and items are prefetched: two queries for any range
+        own_attendance = Attendance.objects.filter(menu=OuterRef('pk'), student_id=request.user.id)
+        menus = (
+            Menu.objects.filter(kitchen_id=request.user.kitchen_id, meal_date__range=(start, end))
+            .annotate(
+                skipped=Exists(own_attendance),
+                attendance_id=Subquery(own_attendance.values('id')[:1])
+            )
+            .prefetch_related('items')
+            .order_by('meal_date', Menu.meal_rank())
+        )
+
+        serializer = StudentMenuSerializer(menus, many=True)
+        return Response({
+            "start": start.strftime('%Y-%m-%d'),
+            "end": end.strftime('%Y-%m-%d'),
+            "menus": serializer.data
+        }, status=status.HTTP_200_OK)
+
+
+async def skip_meal(request):
+    """Mark a meal as skipped; async so rush traffic is not queued behind slow requests."""
+    if request.method != 'POST':
+        return _method_not_allowed(request, ['POST'])
+    # A write: authenticate against the user row rather than token claims
+    student = await _aauthenticate(request, JWTAuthentication)
+    if student is None:
+        return _unauthorized()
+    if student.kitchen_id is None:
+        return _no_kitchen()
+
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON body."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "Expected a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        data = request.POST
+    meal_date_str = data.get('meal_date')
+    meal_type = data.get('meal_type')
     
+    if not meal_date_str or not meal_type:
+        return JsonResponse({"error": "meal_date and meal_type are required."}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        meal_date = datetime.datetime.strptime(meal_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        menu = await Menu.objects.aget(
+            kitchen_id=student.kitchen_id, meal_date=meal_date, meal_type=meal_type.capitalize()
+        )
+    except Menu.DoesNotExist:
+        return JsonResponse({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+    
+    # get_or_create runs atomically, and the menu's skip counter is bumped by a signal in
+    # the same transaction
+    attendance, created = await Attendance.objects.aget_or_create(
+        student_id=student.id,
+        menu=menu,
+        defaults={'kitchen_id': menu.kitchen_id, 'status': 'Skipped'}
+    )
+    
+    if not created:
+        return JsonResponse({
+            "message": "You have already marked this meal as skipped.",
+            "attendance_id": attendance.id
+        }, status=status.HTTP_200_OK)
+    
+    return JsonResponse({
+        "message": f"Meal {meal_type} on {meal_date_str} marked as skipped.",
+        "attendance_id": attendance.id  # ✅ Return the ID
+    }, status=status.HTTP_201_CREATED)
+
+
+# Token-authenticated API endpoint; Django's decorator is sync-only in 4.2, so mark it directly
+skip_meal.csrf_exempt = True
+
+
+class BulkSkipMealView(APIView):
+    permission_classes = [IsAuthenticated, HasKitchen]
+    max_meals = 93  # a month of meals
+
+    def _requested_meals(self, data):
+        """Return the requested (meal_date, meal_type) pairs, in order and without duplicates."""
+        meals = data.get('meals')
+        if meals is not None:
+            if not isinstance(meals, list):
+                raise ValueError("meals must be a list of {meal_date, meal_type} objects.")
+            pairs = []
+            for meal in meals:
+                if not isinstance(meal, dict) or not meal.get('meal_date') or not meal.get('meal_type'):
+                    raise ValueError("Each meal needs meal_date and meal_type.")
+                meal_date = _parse_date(meal['meal_date'])
+                pairs.append((meal_date, str(meal['meal_type']).capitalize()))
+        else:
+            start_str = data.get('start_date')
+            end_str = data.get('end_date')
+            meal_types = data.get('meal_types') or [choice for choice, _ in Menu.MEAL_TYPE_CHOICES]
+            if not start_str or not end_str or not isinstance(meal_types, list):
+                raise ValueError("Provide either meals, or start_date, end_date and optional meal_types.")
+            start = _parse_date(start_str)
+            end = _parse_date(end_str)
+            if end < start:
+                raise ValueError("end_date must not be before start_date.")
+            if (end - start).days >= self.max_meals:
+                raise ValueError(f"At most {self.max_meals} meals can be skipped at once.")
+            pairs = [
+                (start + datetime.timedelta(days=offset), str(meal_type).capitalize())
+                for offset in range((end - start).days + 1)
+                for meal_type in meal_types
+            ]
+
+        pairs = list(dict.fromkeys(pairs))
+        if not pairs:
+            raise ValueError("No meals requested.")
+        if len(pairs) > self.max_meals:
+            raise ValueError(f"At most {self.max_meals} meals can be skipped at once.")
+        return pairs
+
     def post(self, request, *args, **kwargs):
         student = request.user
-        meal_date_str = request.data.get('meal_date')
-        meal_type = request.data.get('meal_type')
-        
-        if not meal_date_str or not meal_type:
-            return Response({"error": "meal_date and meal_type are required."}, status=status.HTTP_400_BAD_REQUEST)
-        
+        if not isinstance(request.data, dict):
+            return Response({"error": "Expected a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            meal_date = datetime.datetime.strptime(meal_date_str, '%Y-%m-%d').date()
-        except ValueError:
-            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        menu = get_object_or_404(Menu, meal_date=meal_date, meal_type=meal_type.capitalize())
-        
-        attendance, created = Attendance.objects.get_or_create(
-            student=student, 
-            menu=menu, 
-            defaults={'status': 'Skipped'}
-        )
-        
-        if not created:
-            return Response({
-                "message": "You have already marked this meal as skipped.",
-                "attendance_id": attendance.id
-            }, status=status.HTTP_200_OK)
-        
+            pairs = self._requested_meals(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Resolve every requested menu in one query
+        dates = {meal_date for meal_date, _ in pairs}
+        meal_types = {meal_type for _, meal_type in pairs}
+        menus = {
+            (menu.meal_date, menu.meal_type): menu
+            for menu in Menu.objects.filter(
+                kitchen_id=student.kitchen_id, meal_date__in=dates, meal_type__in=meal_types
+            )
+        }
+        found = [menus[pair] for pair in pairs if pair in menus]
+
+        with transaction.atomic():
+            # Lock the menus so concurrent skips of them are serialized and the recount below is exact
+            list(Menu.objects.select_for_update().filter(pk__in=[menu.id for menu in found]).order_by('pk')
+                 .values_list('pk', flat=True))
+            already_skipped = set(
+                Attendance.objects.filter(student=student, menu__in=found).values_list('menu_id', flat=True)
+            )
+            new_menu_ids = [menu.id for menu in found if menu.id not in already_skipped]
+
+            Attendance.objects.bulk_create(
+                [
+                    Attendance(kitchen_id=student.kitchen_id, student=student, menu_id=menu_id, status='Skipped')
+                    for menu_id in new_menu_ids
+                ],
+                ignore_conflicts=True
+            )
+
+            # bulk_create skips signals, so maintain the skip counters here. They are recounted rather than
+            # incremented, since ignore_conflicts drops rows a concurrent request inserted first.
+            if new_menu_ids:
+                skip_count = Subquery(
+                    Attendance.objects.filter(menu=OuterRef('pk'))
+                    .values('menu')
+                    .annotate(total=Count('pk'))
+                    .values('total')[:1]
+                )
+                Menu.objects.filter(pk__in=new_menu_ids).update(skip_count=Coalesce(skip_count, 0))
+                invalidate_forecasts(student.kitchen_id)
+                bump_dashboard_revision(student.kitchen_id)
+
+            attendance_ids = dict(
+                Attendance.objects.filter(student=student, menu__in=found).values_list('menu_id', 'id')
+            )
+
+        results = []
+        for meal_date, meal_type in pairs:
+            menu = menus.get((meal_date, meal_type))
+            if menu is None:
+                result_status, attendance_id = 'not_found', None
+            elif menu.id in already_skipped:
+                result_status, attendance_id = 'already_skipped', attendance_ids.get(menu.id)
+            else:
+                result_status, attendance_id = 'skipped', attendance_ids.get(menu.id)
+            results.append({
+                "meal_date": meal_date.strftime('%Y-%m-%d'),
+                "meal_type": meal_type,
+                "status": result_status,
+                "attendance_id": attendance_id
+            })
+
+        skipped = sum(1 for result in results if result['status'] == 'skipped')
         return Response({
-            "message": f"Meal {meal_type} on {meal_date_str} marked as skipped.",
-            "attendance_id": attendance.id  # ✅ Return the ID
-        }, status=status.HTTP_201_CREATED)
+            "message": f"{skipped} meal(s) marked as skipped.",
+            "results": results
+        }, status=status.HTTP_201_CREATED if skipped else status.HTTP_200_OK)
 
 
 class SubmitFeedbackView(APIView):
-    permission_classes = [IsAuthenticated]
-    
+    permission_classes = [IsAuthenticated, HasKitchen]
+    max_entries = 50
+
     def post(self, request, *args, **kwargs):
         student = request.user
-        item_id = request.data.get('item_id')
-        rating = request.data.get('rating')
-        comments = request.data.get('comments', '')
-        
-        if not item_id or not rating:
-            return Response({"error": "item_id and rating are required."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        menu_item = get_object_or_404(MenuItem, pk=item_id)
-        
-        Feedback.objects.create(
-            student=student, 
-            menu_item=menu_item, 
-            rating=rating, 
-            comments=comments
+
+        # Accept a list, {"items": [...]}, or a single {item_id, rating, comments} object
+        data = request.data
+        if isinstance(data, dict) and 'items' in data:
+            entries = data['items']
+        elif isinstance(data, list):
+            entries = data
+        elif isinstance(data, dict):
+            entries = [data]
+        else:
+            return Response({"error": "Expected a feedback object or a list of them."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(entries, list) or not entries:
+            return Response({"error": "Provide at least one feedback entry."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(entries) > self.max_entries:
+            return Response({"error": f"At most {self.max_entries} feedback entries can be submitted at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(entries)
+        valid = []
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                results[index] = {"index": index, "status": "error", "errors": {"non_field_errors": ["Expected an object."]}}
+                continue
+            serializer = FeedbackEntrySerializer(data=entry)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {"index": index, "status": "error", "errors": serializer.errors}
+
+        # Check every referenced menu item with one query
+        known_items = set(
+            MenuItem.objects.filter(pk__in={entry['item_id'] for _, entry in valid}).values_list('pk', flat=True)
         )
-        
-        return Response({"message": "Feedback submitted successfully."}, status=status.HTTP_201_CREATED)
+        to_create = []
+        for index, entry in valid:
+            if entry['item_id'] not in known_items:
+                results[index] = {"index": index, "status": "error", "errors": {"item_id": ["Menu item not found."]}}
+                continue
+            to_create.append((index, Feedback(
+                kitchen_id=student.kitchen_id,
+                student=student,
+                menu_item_id=entry['item_id'],
+                rating=entry['rating'],
+                comments=entry['comments']
+            )))
 
-from datetime import datetime, time
+        with transaction.atomic():
+            created = Feedback.objects.bulk_create([feedback for _, feedback in to_create])
+            # bulk_create skips signals, so fold the batch into the rating aggregates here
+            apply_feedback(created)
 
-class DashboardSummaryView(APIView):
-    permission_classes = [IsAuthenticated, IsManager]
+        for (index, _), feedback in zip(to_create, created):
+            results[index] = {"index": index, "status": "created", "id": feedback.pk}
 
-    def get(self, request, *args, **kwargs):
-        now = datetime.now().time()
+        if not created:
+            return Response({"error": "No feedback was saved.", "results": results}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Define mealtime intervals
-        if time(5, 0) <= now < time(11, 0):
-            next_meal_type = 'Breakfast'
-        elif time(11, 0) <= now < time(16, 0):
-            next_meal_type = 'Lunch'
-        else:
-            next_meal_type = 'Dinner'
+        return Response({
+            "message": f"{len(created)} feedback entr{'y' if len(created) == 1 else 'ies'} submitted successfully.",
+            "results": results
+        }, status=status.HTTP_201_CREATED)
 
-        today = datetime.today().date()
-        
-        menu = Menu.objects.filter(meal_date=today, meal_type=next_meal_type).first()
+
+async def dashboard_summary(request):
+    """Summary of the next meal for managers; the forecast is awaited on the inference pool."""
+    if request.method != 'GET':
+        return _method_not_allowed(request, ['GET'])
+    user = await _aauthenticate(request)
+    if user is None:
+        return _unauthorized()
+    if user.role != 'manager':
+        return _forbidden()
+    if user.kitchen_id is None:
+        return _no_kitchen()
+    kitchen_id = user.kitchen_id
+
+    next_meal_type = get_next_meal_type()
+
+    today = datetime.datetime.today().date()
+
+    # Replication lag of a few seconds is acceptable for the dashboard
+    with replica_reads():
+        menu = await Menu.objects.filter(kitchen_id=kitchen_id, meal_date=today, meal_type=next_meal_type).afirst()
         if not menu:
-            return Response({"error": f"No upcoming {next_meal_type} meal found for today."},
-                            status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({"error": f"No upcoming {next_meal_type} meal found for today."},
+                                status=status.HTTP_404_NOT_FOUND)
 
-        total_students = User.objects.filter(role='student').count()
-        skipped_students = Attendance.objects.filter(menu=menu).count()
+        # Denormalized counters: O(1) regardless of table sizes
+        total_students = await sync_to_async(Counter.get_value)(Counter.student_total(kitchen_id))
+        skipped_students = menu.skip_count
         live_headcount = total_students - skipped_students
 
-        ai_forecast = get_ai_prediction(
+        # Served from the scheduler's precomputed forecast when it still matches the inputs
+        precomputed = await sync_to_async(precomputed_predictions)(kitchen_id, [menu], total_students)
+        ai_forecast = precomputed.get(menu.id) or await aget_cached_prediction(
+            kitchen_id,
             meal_date=today,
             meal_type=next_meal_type,
             total_students=total_students,
             live_skips=skipped_students
         )
-        
-        cost_per_meal = 50
-        projected_savings = max(
-        0, 
-        (total_students - ai_forecast['predicted_headcount']) * cost_per_meal
-        )
+
+        # Scale the menu's recipes by the forecast headcount; keep the generic sheet if it has none
+        prep_sheets, _ = await sync_to_async(build_prep_sheets)([(menu.id, ai_forecast['predicted_headcount'])])
+    if prep_sheets[0]:
+        ai_forecast = {**ai_forecast, 'prep_sheet': prep_sheets[0]}
+    
+    cost_per_meal = 50
+    projected_savings = max(
+    0, 
+    (total_students - ai_forecast['predicted_headcount']) * cost_per_meal
+    )
 
 
-        summary = {
-            "meal_details": {
-                "date": today.strftime('%Y-%m-%d'),
-                "type": next_meal_type
-            },
-            "live_data": {
-                "total_students": total_students,
-                "skipped_students": skipped_students,
-                "live_headcount": live_headcount
-            },
-            "ai_predictions": ai_forecast,
-            "financials": {
-                "projected_daily_savings": projected_savings,
-                "currency": "INR"
-            }
+    summary = {
+        "meal_details": {
+            "date": today.strftime('%Y-%m-%d'),
+            "type": next_meal_type
+        },
+        "live_data": {
+            "total_students": total_students,
+            "skipped_students": skipped_students,
+            "live_headcount": live_headcount
+        },
+        "ai_predictions": ai_forecast,
+        "financials": {
+            "projected_daily_savings": projected_savings,
+            "currency": "INR"
         }
+    }
+
+    return JsonResponse(summary, status=status.HTTP_200_OK)
+
+
+class DashboardForecastView(APIView):
+    permission_classes = [IsAuthenticated, IsManager, HasKitchen]
+    authentication_classes = [ClaimsJWTAuthentication]
+    max_horizon_days = 31
 
-        return Response(summary, status=status.HTTP_200_OK)
+    @replica_reads()
+    def get(self, request, *args, **kwargs):
+        start_str = request.query_params.get('start')
+        end_str = request.query_params.get('end')
+
+        try:
+            start = datetime.datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else datetime.datetime.today().date()
+            end = datetime.datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else start + datetime.timedelta(days=6)
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response({"error": "end must not be before start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days + 1 > self.max_horizon_days:
+            return Response({"error": f"Forecast horizon is limited to {self.max_horizon_days} days."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        kitchen_id = request.user.kitchen_id
+        total_students = Counter.get_value(Counter.student_total(kitchen_id))
+
+        # One query for every menu in the horizon, with its denormalized skip count
+        menus = {
+            (menu.meal_date, menu.meal_type): menu
+            for menu in Menu.objects.filter(kitchen_id=kitchen_id, meal_date__range=(start, end))
+        }
+
+        rows = []
+        for offset in range((end - start).days + 1):
+            meal_date = start + datetime.timedelta(days=offset)
+            for meal_type, _ in Menu.MEAL_TYPE_CHOICES:
+                menu = menus.get((meal_date, meal_type))
+                rows.append({
+                    'meal_date': meal_date,
+                    'meal_type': meal_type,
+                    'menu_id': menu.id if menu else None,
+                    'total_students': total_students,
+                    'live_skips': menu.skip_count if menu else 0
+                })
+
+        # Precomputed forecasts where current; the rest scored with a single model call
+        precomputed = precomputed_predictions(kitchen_id, list(menus.values()), total_students)
+        pending = [row for row in rows if row['menu_id'] not in precomputed]
+        computed = iter(get_cached_predictions(kitchen_id, pending))
+        predictions = [
+            precomputed[row['menu_id']] if row['menu_id'] in precomputed else next(computed)
+            for row in rows
+        ]
+
+        # Ingredient quantities for every planned menu in one matrix product
+        planned = [
+            (row['menu_id'], prediction['predicted_headcount'])
+            for row, prediction in zip(rows, predictions) if row['menu_id']
+        ]
+        prep_sheets, procurement = build_prep_sheets(planned)
+        menu_prep_sheets = {menu_id: sheet for (menu_id, _), sheet in zip(planned, prep_sheets) if sheet}
+
+        forecasts = []
+        for row, ai_forecast in zip(rows, predictions):
+            if row['menu_id'] in menu_prep_sheets:
+                ai_forecast = {**ai_forecast, 'prep_sheet': menu_prep_sheets[row['menu_id']]}
+            forecasts.append({
+                "meal_details": {
+                    "date": row['meal_date'].strftime('%Y-%m-%d'),
+                    "type": row['meal_type'],
+                    "menu_id": row['menu_id']
+                },
+                "live_data": {
+                    "total_students": total_students,
+                    "skipped_students": row['live_skips'],
+                    "live_headcount": total_students - row['live_skips']
+                },
+                "ai_predictions": ai_forecast
+            })
+
+        return Response({
+            "start": start.strftime('%Y-%m-%d'),
+            "end": end.strftime('%Y-%m-%d'),
+            "forecasts": forecasts,
+            "procurement": procurement
+        }, status=status.HTTP_200_OK)
+
+
+async def dashboard_stream(request):
+    """Server-Sent Events stream of live headcount and forecast deltas for a kitchen's managers."""
+    if request.method != 'GET':
+        return _method_not_allowed(request, ['GET'])
+    user = await _aauthenticate(request, allow_query_token=True)
+    if user is None:
+        return _unauthorized()
+    if user.role != 'manager':
+        return _forbidden()
+    if user.kitchen_id is None:
+        return _no_kitchen()
+    broker = get_broker(user.kitchen_id)
+
+    heartbeat_seconds = 15
+
+    async def event_stream():
+        queue = broker.subscribe()
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield "retry: 3000\n\n"
+
+            # Every (re)connect starts from a full snapshot, so no Last-Event-ID replay is needed
+            revision, snapshot = await broker.snapshot()
+            yield format_event('snapshot', snapshot, revision)
+
+            while True:
+                try:
+                    revision, delta = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_event('delta', delta, revision)
+        finally:
+            broker.unsubscribe(queue)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class ItemAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated, IsManager, HasKitchen]
+    authentication_classes = [ClaimsJWTAuthentication]
+    max_limit = 50
+
+    def _window(self, count, rating_sum):
+        return {"count": count or 0, "average": round(rating_sum / count, 2) if count else None}
+
+    def _item_entry(self, stats, windows):
+        window = windows.get(stats.menu_item_id, {})
+        return {
+            "item_id": stats.menu_item_id,
+            "name": stats.menu_item.name,
+            "category": stats.menu_item.category,
+            "count": stats.count,
+            "average": round(stats.average, 2) if stats.count else None,
+            "stddev": round(stats.variance ** 0.5, 2) if stats.count else None,
+            "histogram": {rating: getattr(stats, field) for rating, field in HISTOGRAM_FIELDS.items()},
+            "last_7_days": self._window(window.get('count_7'), window.get('sum_7')),
+            "last_30_days": self._window(window.get('count_30'), window.get('sum_30'))
+        }
+
+    @replica_reads()
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 5)), self.max_limit))
+            min_ratings = max(1, int(request.query_params.get('min_ratings', 1)))
+        except ValueError:
+            return Response({"error": "limit and min_ratings must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        today = datetime.date.today()
+        kitchen_id = request.user.kitchen_id
+
+        # Rolling windows from at most 30 of the kitchen's daily buckets per item
+        windows = {
+            row['menu_item']: row
+            for row in MenuItemDailyRating.objects.filter(
+                kitchen_id=kitchen_id, day__gt=today - datetime.timedelta(days=30)
+            )
+            .values('menu_item')
+            .annotate(
+                count_30=Sum('count'),
+                sum_30=Sum('rating_sum'),
+                count_7=Sum('count', filter=Q(day__gt=today - datetime.timedelta(days=7))),
+                sum_7=Sum('rating_sum', filter=Q(day__gt=today - datetime.timedelta(days=7)))
+            )
+            .order_by()
+        }
+
+        ranked = (
+            MenuItemRatingStats.objects.filter(kitchen_id=kitchen_id, count__gte=min_ratings)
+            .select_related('menu_item')
+            .annotate(avg=Cast('rating_sum', FloatField()) / F('count'))
+        )
+        top = list(ranked.order_by('-avg', '-count')[:limit])
+        bottom = list(ranked.order_by('avg', '-count')[:limit])
+
+        # Trend: last-7-day average against the last-30-day average
+        trends = []
+        for item_id, window in windows.items():
+            if window['count_7'] and window['count_30'] >= min_ratings:
+                change = window['sum_7'] / window['count_7'] - window['sum_30'] / window['count_30']
+                trends.append((change, item_id))
+        trends.sort()
+        trending_up = [trend for trend in reversed(trends) if trend[0] > 0][:limit]
+        trending_down = [trend for trend in trends if trend[0] < 0][:limit]
+        trend_stats = {
+            stats.menu_item_id: stats
+            for stats in MenuItemRatingStats.objects.filter(
+                kitchen_id=kitchen_id, menu_item_id__in=[item_id for _, item_id in trending_up + trending_down]
+            ).select_related('menu_item')
+        }
+
+        def trend_entries(selected):
+            return [
+                dict(self._item_entry(trend_stats[item_id], windows), change=round(change, 2))
+                for change, item_id in selected if item_id in trend_stats
+            ]
+
+        return Response({
+            "top_items": [self._item_entry(stats, windows) for stats in top],
+            "bottom_items": [self._item_entry(stats, windows) for stats in bottom],
+            "trending_up": trend_entries(trending_up),
+            "trending_down": trend_entries(trending_down)
+        }, status=status.HTTP_200_OK)
 
 
 # ✅ NEW: Attendance List View
 class AttendanceListView(APIView):
     permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]
     
     def get(self, request, *args, **kwargs):
         meal_date = request.query_params.get('menu__meal_date')
@@ -163,11 +777,11 @@ class AttendanceListView(APIView):
             try:
                 date_obj = datetime.datetime.strptime(meal_date, '%Y-%m-%d').date()
                 menus = Menu.objects.filter(meal_date=date_obj)
-                attendance = Attendance.objects.filter(menu__in=menus, student=request.user)
+                attendance = Attendance.objects.filter(menu__in=menus, student_id=request.user.id)
             except ValueError:
                 return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
         else:
-            attendance = Attendance.objects.filter(student=request.user)
+            attendance = Attendance.objects.filter(student_id=request.user.id)
         
         serializer = AttendanceSerializer(attendance, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -178,25 +792,12 @@ class AttendanceDeleteView(APIView):
     def delete(self, request, pk, *args, **kwargs):
         try:
             # Only allow user to delete their own attendance
-            attendance = Attendance.objects.get(pk=pk, student=request.user)
-            attendance.delete()
+            with transaction.atomic():
+                attendance = Attendance.objects.get(pk=pk, student=request.user)
+                attendance.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Attendance.DoesNotExist:
             return Response(
                 {"error": "Attendance record not found or you don't have permission to delete it."}, 
                 status=status.HTTP_404_NOT_FOUND
             )
-
-from rest_framework import permissions
-from .serializers import FeedbackSerializer
-
-class FeedbackView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
-    def post(self, request, *args, **kwargs):
-        data = request.data.copy()
-        data['student'] = request.user.id
-        serializer = FeedbackSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
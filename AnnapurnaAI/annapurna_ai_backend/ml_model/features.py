@@ -0,0 +1,79 @@
+import numpy as np
+
+# Raw model inputs in training order. Models trained before the daily feature store only read the first three.
+LEGACY_FEATURES = ('meal_type', 'day_of_week', 'total_students')
+FEATURES = LEGACY_FEATURES + ('is_holiday', 'is_exam', 'rate_lag_7', 'rate_rolling_7')
+
+# Sentinel for lag features with no history behind them; trees split it off like any other value
+MISSING = -1.0
+
+# Values used for meals that have no row in the feature store yet
+FEATURE_DEFAULTS = {
+    'is_holiday': 0,
+    'is_exam': 0,
+    'rate_lag_7': MISSING,
+    'rate_rolling_7': MISSING,
+}
+
+LAG_DAYS = 7
+
+
+def lag_features(groups, day_numbers, rates, window=LAG_DAYS, missing=MISSING):
+    """
+    Lag and rolling attendance-rate features for rows of daily series.
+
+    Each group (e.g. one kitchen's Lunch) is a series with at most one row
+    per day. A row's lag is the group's rate exactly `window` days earlier;
+    its rolling rate is the mean of the rates over the `window` days before
+    it, ignoring days without a rate. The computation is vectorized per
+    group over a dense calendar, so gaps in the series are handled without
+    looping over days, and a row's values depend only on the `window` days
+    before it.
+
+    Args:
+        groups: Integer series id of each row
+        day_numbers: Integer day of each row, e.g. a date's toordinal()
+        rates: Attendance rate of each row, NaN where unknown (not served yet)
+        window: Number of days the lag looks back and the rolling mean spans
+        missing: Value for rows without history
+
+    Returns:
+        (lag, rolling) float arrays aligned with the rows
+    """
+    groups = np.asarray(groups, dtype=np.int64)
+    day_numbers = np.asarray(day_numbers, dtype=np.int64)
+    rates = np.asarray(rates, dtype=np.float64)
+    lag = np.full(rates.shape, np.nan)
+    rolling = np.full(rates.shape, np.nan)
+    if not len(rates):
+        return lag, rolling
+
+    order = np.lexsort((day_numbers, groups))
+    boundaries = np.flatnonzero(np.diff(groups[order])) + 1
+    for rows in np.split(order, boundaries):
+        # Dense calendar of the group, padded with `window` empty days in front
+        positions = day_numbers[rows] - day_numbers[rows].min() + window
+        dense = np.full(positions.max() + 1, np.nan)
+        dense[positions] = rates[rows]
+        lag[rows] = dense[positions - window]
+
+        # Window ending the day before each row; summed per window so results don't depend on earlier days
+        windows = np.lib.stride_tricks.sliding_window_view(dense, window)[positions - window]
+        known = (~np.isnan(windows)).sum(axis=1)
+        sums = np.where(np.isnan(windows), 0.0, windows).sum(axis=1)
+        rolling[rows] = np.where(known > 0, sums / np.maximum(known, 1), np.nan)
+
+    return np.nan_to_num(lag, nan=missing), np.nan_to_num(rolling, nan=missing)
+
+
+def feature_value(row, name):
+    """Raw value of one model input for a meal row; store features fall back to FEATURE_DEFAULTS."""
+    if name == 'day_of_week':
+        return row['meal_date'].weekday()
+    value = row.get(name)
+    return FEATURE_DEFAULTS.get(name) if value is None else value
+
+
+def feature_columns(rows, features):
+    """Columns of raw model inputs for meal rows, as {feature name: list of values}."""
+    return {name: [feature_value(row, name) for row in rows] for name in features}
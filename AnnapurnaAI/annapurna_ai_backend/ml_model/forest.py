@@ -0,0 +1,105 @@
+import os
+import numpy as np
+
+try:
+    from .features import LEGACY_FEATURES
+except ImportError:
+    # Imported by train_model.py running as a script
+    from features import LEGACY_FEATURES
+
+
+class CompiledForest:
+    """
+    Array-backed random forest evaluated with NumPy only.
+
+    Nodes of every tree are flattened into shared arrays. Splits on the
+    one-hot encoded meal_type columns are folded back into equality tests
+    on the meal_type code, so rows are scored on the raw features without
+    pandas or scikit-learn. Leaves point to themselves, which lets a batch
+    walk all trees in lockstep for max_depth steps.
+
+    `features` names the raw inputs in column order; artifacts exported
+    before it was stored read the three legacy features.
+    """
+
+    def __init__(self, feature, threshold, is_category, left, right, value, roots, max_depth, categories,
+                 features=LEGACY_FEATURES):
+        self.feature = feature
+        self.threshold = threshold
+        self.is_category = is_category
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.categories = [str(category) for category in categories]
+        self._category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.features = tuple(str(name) for name in features)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def save(self, path):
+        # Write next to the target and rename, so readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                feature=self.feature,
+                threshold=self.threshold,
+                is_category=self.is_category,
+                left=self.left,
+                right=self.right,
+                value=self.value,
+                roots=self.roots,
+                max_depth=np.int64(self.max_depth),
+                categories=np.array(self.categories),
+                features=np.array(self.features),
+            )
+        os.replace(tmp_path, path)
+
+    def encode(self, columns):
+        """
+        Build the raw feature matrix from {feature name: sequence} columns (a dict or DataFrame).
+
+        Unknown meal types get code -1, like the ignored one-hot columns.
+        """
+        features = np.empty((len(columns[self.features[0]]), len(self.features)), dtype=np.float32)
+        for index, name in enumerate(self.features):
+            if name == 'meal_type':
+                features[:, index] = [self._category_codes.get(meal_type, -1) for meal_type in columns[name]]
+            else:
+                features[:, index] = columns[name]
+        return features
+
+    def predict_trees_encoded(self, features):
+        """Per-tree predictions, shaped (rows, trees)."""
+        # sklearn compares float32 inputs against float64 thresholds; do the same for parity
+        features = np.asarray(features, dtype=np.float32).astype(np.float64)
+        rows = np.arange(features.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (features.shape[0], self.roots.shape[0])).copy()
+
+        for _ in range(self.max_depth):
+            values = features[rows, self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+            go_left = np.where(self.is_category[nodes], values != thresholds, values <= thresholds)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes]
+
+    def predict_encoded(self, features):
+        return self.predict_trees_encoded(features).mean(axis=1)
+
+    def predict(self, columns):
+        """Score a batch of meals given as {feature name: sequence} columns."""
+        return self.predict_encoded(self.encode(columns))
+
+    def predict_trees(self, columns):
+        """Per-tree predictions for a batch of meals, shaped (rows, trees)."""
+        return self.predict_trees_encoded(self.encode(columns))
+
+    def predict_one(self, **values):
+        """Score a single meal given its raw features as keyword arguments."""
+        return float(self.predict({name: [value] for name, value in values.items()})[0])
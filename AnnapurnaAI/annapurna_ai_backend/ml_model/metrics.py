@@ -0,0 +1,24 @@
+from prometheus_client import Histogram
+
+# Under multiple worker processes, set PROMETHEUS_MULTIPROC_DIR so samples are shared through files
+
+MODEL_LOAD_SECONDS = Histogram(
+    'annapurna_model_load_seconds',
+    'Time spent loading a model artifact from disk',
+    ['kind'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+MODEL_PREDICT_SECONDS = Histogram(
+    'annapurna_model_predict_seconds',
+    'Time spent in a single batched model.predict call',
+    ['kind'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+MODEL_PREDICT_ROWS = Histogram(
+    'annapurna_model_predict_rows',
+    'Rows scored per model.predict call',
+    ['kind'],
+    buckets=(1, 3, 10, 30, 100, 300, 1000),
+)
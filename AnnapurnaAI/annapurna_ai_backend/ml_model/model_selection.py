@@ -0,0 +1,205 @@
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+
+from .train_model import build_pipeline, compile_model, is_forest
+
+
+class SeasonalBaseline(RegressorMixin, BaseEstimator):
+    """
+    Seasonal-mean baseline: the average attendance rate of the meal on that weekday, times total_students.
+
+    Holiday and exam days get their own averages when the training data
+    has them. Combinations never seen in training fall back to the meal's
+    average rate, then to the overall one.
+    """
+
+    def fit(self, X, y):
+        # Keys always start with meal_type and day_of_week, so grouped averages are keyed by tuples
+        rates = pd.Series(np.asarray(y, dtype=np.float64) / np.maximum(X['total_students'].to_numpy(), 1),
+                          index=X.index)
+        self.feature_names_in_ = np.array(X.columns, dtype=object)
+        self.keys_ = [name for name in ('meal_type', 'day_of_week', 'is_holiday', 'is_exam') if name in X]
+        self.rates_ = rates.groupby([X[name] for name in self.keys_]).mean().to_dict()
+        self.meal_rates_ = rates.groupby(X['meal_type']).mean().to_dict()
+        self.overall_rate_ = float(rates.mean())
+        return self
+
+    def predict(self, X):
+        keys = zip(*(X[name].tolist() for name in self.keys_))
+        rates = [self.rates_.get(key, self.meal_rates_.get(key[0], self.overall_rate_)) for key in keys]
+        return np.asarray(rates) * np.asarray(X['total_students'], dtype=np.float64)
+
+
+# Candidate engines by name; each builds an unfitted estimator taking the raw feature DataFrame
+CANDIDATES = {
+    'rf-50': lambda: build_pipeline(RandomForestRegressor(n_estimators=50, random_state=42)),
+    'rf-100': lambda: build_pipeline(RandomForestRegressor(n_estimators=100, random_state=42)),
+    'rf-200': lambda: build_pipeline(RandomForestRegressor(n_estimators=200, random_state=42)),
+    'gbr': lambda: build_pipeline(HistGradientBoostingRegressor(max_iter=200, random_state=42)),
+    'seasonal': SeasonalBaseline,
+}
+
+
+def rolling_origin_splits(dates, folds=4, min_train_fraction=0.5):
+    """
+    Rolling-origin (expanding window) splits over the distinct dates of a dataset.
+
+    The first min_train_fraction of the dates is only ever trained on; the
+    rest is cut into `folds` consecutive test windows, and each fold trains
+    on every row dated before its window. No fold sees the future.
+
+    Args:
+        dates: Date of each row
+        folds: Number of test windows
+        min_train_fraction: Fraction of the dates in the first training window
+
+    Returns:
+        List of (train row indices, test row indices)
+    """
+    dates = np.asarray(dates)
+    distinct = np.unique(dates)
+    first_test = int(len(distinct) * min_train_fraction)
+    if first_test < 1 or len(distinct) - first_test < folds:
+        raise ValueError(f"{len(distinct)} days are too few for {folds} folds.")
+
+    splits = []
+    for window in np.array_split(distinct[first_test:], folds):
+        train = np.flatnonzero(dates < window[0])
+        test = np.flatnonzero((dates >= window[0]) & (dates <= window[-1]))
+        splits.append((train, test))
+    return splits
+
+
+def _score(y_true, y_pred):
+    errors = np.asarray(y_pred, dtype=np.float64) - np.asarray(y_true, dtype=np.float64)
+    return {
+        'mae': float(np.abs(errors).mean()),
+        'rmse': float(np.sqrt((errors ** 2).mean())),
+        # Weighted absolute percentage error: total error relative to total attendance
+        'wape': float(np.abs(errors).sum() / max(np.abs(y_true).sum(), 1)),
+    }
+
+
+def _evaluate_fold(name, X, y, train, test):
+    model = CANDIDATES[name]()
+    started = time.perf_counter()
+    model.fit(X.iloc[train], y.iloc[train])
+    train_seconds = time.perf_counter() - started
+    return name, {**_score(y.iloc[test], model.predict(X.iloc[test])), 'train_seconds': train_seconds}
+
+
+def _median_seconds(predict, rows, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        predict(rows)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def serving_form(model):
+    """Return (serving model, file name) for a fitted candidate: the compiled forest when it has one."""
+    if is_forest(model):
+        return compile_model(model), 'annapurna_model.npz'
+    return model, 'annapurna_model.joblib'
+
+
+def _fit(name, X, y):
+    model = CANDIDATES[name]()
+    started = time.perf_counter()
+    model.fit(X, y)
+    return name, model, time.perf_counter() - started
+
+
+def profile_model(model, X, batch_rows=1000, repeats=20):
+    """Latency and artifact size of a fitted candidate in the form the API would load and call."""
+    served, filename = serving_form(model)
+    single = X.iloc[:1]
+    batch = X.iloc[np.resize(np.arange(len(X)), batch_rows)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, filename)
+        if filename.endswith('.npz'):
+            served.save(path)
+        else:
+            joblib.dump(served, path)
+        artifact_bytes = os.path.getsize(path)
+
+    return {
+        'single_row_ms': _median_seconds(served.predict, single, repeats) * 1000,
+        'batch_ms': _median_seconds(served.predict, batch, repeats) * 1000,
+        'batch_rows': batch_rows,
+        'artifact_bytes': artifact_bytes,
+        'serving_kind': 'compiled' if filename.endswith('.npz') else 'pipeline',
+    }
+
+
+def evaluate_candidates(X, y, dates, names=None, folds=4, n_jobs=-1, batch_rows=1000, repeats=20):
+    """
+    Cross-validate candidate engines and profile them as they would be served.
+
+    Every (candidate, fold) pair is fitted as its own joblib task, then
+    every candidate is refitted on all rows, also in parallel. Latency is
+    profiled afterwards, one model at a time, so the timings are not
+    skewed by fits running on the other cores.
+
+    Args:
+        X: DataFrame of raw model features
+        y: Actual attendance for each row
+        dates: Date of each row, for the rolling-origin splits
+        names: Candidate names from CANDIDATES (default: all)
+        folds: Number of rolling-origin test windows
+        n_jobs: Parallel joblib workers; -1 uses every core
+        batch_rows: Rows in the batch latency measurement
+        repeats: Timed calls per latency measurement; the median is reported
+
+    Returns:
+        (report, fitted models): report maps each candidate name to its mean
+        fold metrics (mae, rmse, wape, train_seconds) and serving profile
+        (full_train_seconds, single_row_ms, batch_ms, artifact_bytes,
+        serving_kind); fitted models maps names to models trained on all rows
+    """
+    names = list(names or CANDIDATES)
+    unknown = set(names) - set(CANDIDATES)
+    if unknown:
+        raise ValueError(f"Unknown candidates: {', '.join(sorted(unknown))}.")
+    X = X.reset_index(drop=True)
+    y = pd.Series(np.asarray(y)).reset_index(drop=True)
+    splits = rolling_origin_splits(dates, folds=folds)
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        fold_results = parallel(
+            delayed(_evaluate_fold)(name, X, y, train, test) for name in names for train, test in splits
+        )
+        fitted = parallel(delayed(_fit)(name, X, y) for name in names)
+
+    report = {}
+    for name in names:
+        scores = [metrics for result_name, metrics in fold_results if result_name == name]
+        report[name] = {metric: float(np.mean([score[metric] for score in scores])) for metric in scores[0]}
+    models = {}
+    for name, model, train_seconds in fitted:
+        report[name]['full_train_seconds'] = train_seconds
+        report[name].update(profile_model(model, X, batch_rows=batch_rows, repeats=repeats))
+        models[name] = model
+    return report, models
+
+
+def pick_winner(report, max_single_row_ms=None, max_artifact_bytes=None):
+    """
+    Name of the most accurate candidate (lowest cross-validated MAE) within the latency and size budgets.
+
+    Returns None when no candidate fits the budgets.
+    """
+    eligible = [
+        name for name, metrics in report.items()
+        if (max_single_row_ms is None or metrics['single_row_ms'] <= max_single_row_ms)
+        and (max_artifact_bytes is None or metrics['artifact_bytes'] <= max_artifact_bytes)
+    ]
+    return min(eligible, key=lambda name: report[name]['mae']) if eligible else None
@@ -1,51 +1,88 @@
-import joblib
-import pandas as pd
 import os
+import threading
+import numpy as np
+from .features import LEGACY_FEATURES, feature_columns
+from .metrics import MODEL_PREDICT_ROWS, MODEL_PREDICT_SECONDS
+from .registry import ModelRegistry
 
-# Load the trained model
+# The model is loaded lazily on first use and reloaded when the artifact changes
 model_dir = os.path.dirname(__file__)
 model_path = os.path.join(model_dir, 'annapurna_model.joblib')
+compiled_model_path = os.path.join(model_dir, 'annapurna_model.npz')
 
-try:
-    model = joblib.load(model_path)
-    print("AI prediction model loaded successfully.")
-except FileNotFoundError:
-    print("Error: Model file 'annapurna_model.joblib' not found. Please run train_model.py first.")
-    model = None
+registry = ModelRegistry(
+    # Prefer the array-backed forest exported by train_model.py; it needs no pandas or sklearn
+    candidates=[(compiled_model_path, 'compiled'), (model_path, 'pipeline')],
+    check_interval=float(os.getenv('MODEL_RELOAD_INTERVAL', '5')),
+)
 
+# Kitchens may have their own model under kitchens/<kitchen id>/; registries are created on first use
+kitchen_models_dir = os.path.join(model_dir, 'kitchens')
+_kitchen_registries = {}
+_kitchen_registries_lock = threading.Lock()
 
-def get_ai_prediction(meal_date, meal_type, total_students, live_skips):
-    """
-    Generate AI-based prediction for meal attendance.
 
-    Args:
-        meal_date: Date object for the meal
-        meal_type: Type of meal (Breakfast, Lunch, Dinner)
-        total_students: Total number of registered students
-        live_skips: Number of students who have opted out
+def kitchen_model_dir(kitchen_id):
+    """Directory holding the artifacts of a kitchen's own model."""
+    return os.path.join(kitchen_models_dir, str(kitchen_id))
 
-    Returns:
-        Dictionary containing prediction results
+
+def get_kitchen_registry(kitchen_id):
+    """Return the registry of a kitchen's own model, creating it (but loading nothing) on first use."""
+    kitchen_registry = _kitchen_registries.get(kitchen_id)
+    if kitchen_registry is None:
+        with _kitchen_registries_lock:
+            kitchen_registry = _kitchen_registries.get(kitchen_id)
+            if kitchen_registry is None:
+                directory = kitchen_model_dir(kitchen_id)
+                kitchen_registry = ModelRegistry(
+                    candidates=[
+                        (os.path.join(directory, 'annapurna_model.npz'), 'compiled'),
+                        (os.path.join(directory, 'annapurna_model.joblib'), 'pipeline'),
+                    ],
+                    check_interval=registry.check_interval,
+                    label=f'kitchen-{kitchen_id}',
+                    optional=True,
+                )
+                _kitchen_registries[kitchen_id] = kitchen_registry
+    return kitchen_registry
+
+
+def get_model(kitchen_id=None):
     """
-    if not model:
-        return {
-            "predicted_headcount": total_students - live_skips - 50,
-            "confidence_score": 0.50,
-            "model_status": "Not Loaded"
-        }
+    Return the LoadedModel serving a kitchen, or None if no model is available.
+
+    A kitchen without a model of its own falls back to the shared model;
+    checking for its artifact costs a stat every check interval.
+    """
+    if kitchen_id is not None:
+        loaded = get_kitchen_registry(kitchen_id).get()
+        if loaded is not None:
+            return loaded
+    return registry.get()
+
+
+def get_model_version(kitchen_id=None):
+    """Return the version stamp of the model serving a kitchen, or None if no model is loaded."""
+    loaded = get_model(kitchen_id)
+    return loaded.version if loaded else None
+
 
-    # Prepare input data
-    day_of_week = meal_date.weekday()
-    input_data = pd.DataFrame({
-        'meal_type': [meal_type],
-        'day_of_week': [day_of_week],
-        'total_students': [total_students]
-    })
+def model_features(loaded):
+    """Names of the raw inputs a LoadedModel reads, in training order."""
+    if loaded.kind == 'compiled':
+        return loaded.model.features
+    return tuple(getattr(loaded.model, 'feature_names_in_', LEGACY_FEATURES))
 
-    # Make prediction
-    predicted_attendance = model.predict(input_data)
-    final_prediction = int(predicted_attendance[0])
 
+def get_model_features(kitchen_id=None):
+    """Return the raw inputs of the model serving a kitchen, or None if no model is loaded."""
+    loaded = get_model(kitchen_id)
+    return model_features(loaded) if loaded else None
+
+
+def build_prediction(final_prediction, version):
+    """Wrap a model headcount in the prediction dictionary served by the API."""
     # Generate preparation sheet
     prep_sheet = {
         "Rice (kg)": round(final_prediction * 0.1, 1),
@@ -56,5 +93,166 @@ def get_ai_prediction(meal_date, meal_type, total_students, live_skips):
         "predicted_headcount": final_prediction,
         "confidence_score": 0.95,
         "prep_sheet": prep_sheet,
-        "model_status": "Loaded and Operational"
+        "model_status": f"Loaded and Operational (version {version})",
+        "model_version": version
     }
+
+
+def heuristic_predictions(rows, model_status="Not Loaded"):
+    """
+    Cheap headcount estimates from live skips, used when the model cannot answer.
+
+    Args:
+        rows: Iterable of dicts with total_students and live_skips keys
+        model_status: Reason reported in each prediction
+
+    Returns:
+        List of prediction dictionaries, in the same order as rows
+    """
+    return [
+        {
+            "predicted_headcount": row['total_students'] - row['live_skips'] - 50,
+            "confidence_score": 0.50,
+            "model_status": model_status,
+            "model_version": None
+        }
+        for row in rows
+    ]
+
+
+def get_ai_predictions(rows, kitchen_id=None):
+    """
+    Generate AI-based predictions for many meals with a single model call.
+
+    Args:
+        rows: Iterable of dicts with meal_date, meal_type, total_students
+            and live_skips keys, plus the daily feature store columns
+            (is_holiday, is_exam, rate_lag_7, rate_rolling_7) for models
+            that read them; absent ones take their defaults
+        kitchen_id: Kitchen the meals belong to; None uses the shared model
+
+    Returns:
+        List of prediction dictionaries, in the same order as rows
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+
+    # Use one model snapshot for the whole batch, even if a reload happens meanwhile
+    loaded = get_model(kitchen_id)
+    if loaded is None:
+        return heuristic_predictions(rows)
+
+    MODEL_PREDICT_ROWS.labels(loaded.kind).observe(len(rows))
+    columns = feature_columns(rows, model_features(loaded))
+
+    if loaded.kind == 'compiled':
+        with MODEL_PREDICT_SECONDS.labels(loaded.kind).time():
+            predicted_attendance = loaded.model.predict(columns)
+        return [build_prediction(int(value), loaded.version) for value in predicted_attendance]
+
+    import pandas as pd
+
+    # Make predictions in one vectorized call, one input row per meal
+    with MODEL_PREDICT_SECONDS.labels(loaded.kind).time():
+        predicted_attendance = loaded.model.predict(pd.DataFrame(columns))
+    return [build_prediction(int(value), loaded.version) for value in predicted_attendance]
+
+
+def get_ai_prediction(meal_date, meal_type, total_students, live_skips, kitchen_id=None, features=None):
+    """
+    Generate AI-based prediction for meal attendance.
+
+    Args:
+        meal_date: Date object for the meal
+        meal_type: Type of meal (Breakfast, Lunch, Dinner)
+        total_students: Total number of registered students
+        live_skips: Number of students who have opted out
+        kitchen_id: Kitchen serving the meal; None uses the shared model
+        features: The meal's row of daily feature store columns, if any
+
+    Returns:
+        Dictionary containing prediction results
+    """
+    return get_ai_predictions([{
+        **(features or {}),
+        'meal_date': meal_date,
+        'meal_type': meal_type,
+        'total_students': total_students,
+        'live_skips': live_skips
+    }], kitchen_id=kitchen_id)[0]
+
+
+def get_ai_forecasts(rows, coverage=0.8, kitchen_id=None):
+    """
+    Predict headcounts together with an interval from the spread of the forest's trees.
+
+    The interval spans the central `coverage` fraction of the per-tree
+    predictions; it reflects disagreement between trees rather than a
+    calibrated confidence level.
+
+    Args:
+        rows: Iterable of dicts as accepted by get_ai_predictions
+        coverage: Fraction of tree predictions the interval covers
+        kitchen_id: Kitchen the meals belong to; None uses the shared model
+
+    Returns:
+        List of dicts with predicted_headcount, lower_bound, upper_bound and
+        model_version, in the same order as rows (bounds and version are
+        None for heuristic estimates when no model is loaded; bounds are
+        None for models other than random forests)
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+
+    loaded = get_model(kitchen_id)
+    if loaded is None:
+        return [
+            {
+                "predicted_headcount": prediction['predicted_headcount'],
+                "lower_bound": None,
+                "upper_bound": None,
+                "model_version": None
+            }
+            for prediction in heuristic_predictions(rows)
+        ]
+
+    MODEL_PREDICT_ROWS.labels(loaded.kind).observe(len(rows))
+    columns = feature_columns(rows, model_features(loaded))
+
+    with MODEL_PREDICT_SECONDS.labels(loaded.kind).time():
+        if loaded.kind == 'compiled':
+            per_tree = loaded.model.predict_trees(columns)
+        else:
+            import pandas as pd
+            from .train_model import is_forest
+
+            if not is_forest(loaded.model):
+                # Boosted and baseline models have no per-tree spread to take an interval from
+                predicted_attendance = loaded.model.predict(pd.DataFrame(columns))
+                return [
+                    {
+                        "predicted_headcount": int(value),
+                        "lower_bound": None,
+                        "upper_bound": None,
+                        "model_version": loaded.version
+                    }
+                    for value in predicted_attendance
+                ]
+            features = loaded.model.named_steps['preprocessor'].transform(pd.DataFrame(columns))
+            per_tree = np.column_stack([
+                tree.predict(features) for tree in loaded.model.named_steps['regressor'].estimators_
+            ])
+
+    tail = (1 - coverage) / 2
+    lower, upper = np.quantile(per_tree, [tail, 1 - tail], axis=1)
+    return [
+        {
+            "predicted_headcount": int(mean),
+            "lower_bound": int(low),
+            "upper_bound": int(high),
+            "model_version": loaded.version
+        }
+        for mean, low, high in zip(per_tree.mean(axis=1), lower, upper)
+    ]
@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .forest import CompiledForest
+from .metrics import MODEL_LOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+LoadedModel = namedtuple('LoadedModel', ['model', 'kind', 'version', 'path'])
+
+
+def version_stamp(path):
+    """Version stamp of an artifact on disk, derived from its mtime and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class ModelRegistry:
+    """
+    Lazily loads the attendance model and hot-swaps it when the artifact changes.
+
+    Nothing is read from disk until the first get(). After that the
+    artifact is re-stat'ed at most every check_interval seconds and, if its
+    version stamp changed, the new model is loaded off to the side and
+    swapped in with a single reference assignment. Callers keep whatever
+    LoadedModel they already hold, so in-flight requests finish on the
+    model they started with.
+
+    A label is prefixed to version stamps so models from different
+    registries never share a version. Optional registries (per-kitchen
+    models that may not have been trained) do not log a missing artifact
+    as an error.
+    """
+
+    def __init__(self, candidates, check_interval=5.0, label=None, optional=False):
+        # Ordered (path, kind) pairs; the first artifact that exists wins
+        self.candidates = list(candidates)
+        self.check_interval = check_interval
+        self.label = label
+        self.optional = optional
+        self._current = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _find_artifact(self):
+        for path, kind in self.candidates:
+            try:
+                version = version_stamp(path)
+            except FileNotFoundError:
+                continue
+            return path, kind, f"{self.label}:{version}" if self.label else version
+        return None
+
+    def _load(self, path, kind):
+        with MODEL_LOAD_SECONDS.labels(kind).time():
+            if kind == 'compiled':
+                return CompiledForest.load(path)
+            # Only the sklearn fallback needs joblib (and, through it, sklearn)
+            import joblib
+            return joblib.load(path)
+
+    def _is_fresh(self):
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval
+
+    def get(self):
+        """Return the current LoadedModel, or None if no artifact is available."""
+        current = self._current
+        if self._is_fresh():
+            return current
+
+        # Only one thread re-checks the artifact; others keep serving the current model
+        if not self._lock.acquire(blocking=current is None):
+            return current
+        try:
+            if self._is_fresh():
+                return self._current
+            self._checked_at = time.monotonic()
+
+            artifact = self._find_artifact()
+            if artifact is None:
+                if self._current is None and not self.optional:
+                    logger.error("Model file not found. Please run train_model.py first.")
+                return self._current
+
+            path, kind, version = artifact
+            if self._current is None or (path, version) != (self._current.path, self._current.version):
+                try:
+                    model = self._load(path, kind)
+                except Exception:
+                    # Possibly a half-written artifact; keep the old model and retry later
+                    logger.exception("Failed to load model artifact '%s'.", path)
+                    return self._current
+                self._current = LoadedModel(model, kind, version, path)
+                logger.info("AI prediction model loaded (%s, version %s).", kind, version)
+            return self._current
+        finally:
+            self._lock.release()
+
+    def reset(self):
+        """Drop the loaded model so the next get() reloads from disk."""
+        with self._lock:
+            self._current = None
+            self._checked_at = None
@@ -0,0 +1,108 @@
+import argparse
+import datetime
+import time
+import numpy as np
+
+MEAL_TYPES = ('Breakfast', 'Lunch', 'Dinner')
+
+# Day-of-year windows (inclusive) used by default for seasonality
+DEFAULT_EXAM_WEEKS = ((120, 133), (320, 333))
+DEFAULT_HOLIDAYS = ((1, 5), (298, 304), (356, 366))
+
+
+def _in_windows(day_of_year, windows):
+    mask = np.zeros(day_of_year.shape, dtype=bool)
+    for first, last in windows:
+        mask |= (day_of_year >= first) & (day_of_year <= last)
+    return mask
+
+
+def generate_synthetic_history(num_days=730, start_date=datetime.date(2023, 1, 1), institutions=(2000,),
+                               exam_weeks=DEFAULT_EXAM_WEEKS, holidays=DEFAULT_HOLIDAYS, seed=None):
+    """
+    Generate synthetic meal attendance history with vectorized NumPy operations.
+
+    One row is produced per (institution, date, meal). Weekends draw a
+    lower base attendance than weekdays, exam weeks nudge attendance up and
+    holidays cut it sharply; Gaussian noise scaled to each institution's
+    size is added on top.
+
+    Args:
+        num_days: Number of consecutive days to generate
+        start_date: First date of the history
+        institutions: Student totals per institution, or an int number of
+            institutions whose sizes are drawn at random
+        exam_weeks: Day-of-year windows with exam-time attendance
+        holidays: Day-of-year windows with holiday attendance
+        seed: Seed for the random generator, for reproducible datasets
+
+    Returns:
+        Dictionary of equal-length column arrays: date, meal_type (index
+        into MEAL_TYPES), day_of_week, total_students, institution,
+        is_exam, is_holiday and actual_attendance
+    """
+    rng = np.random.default_rng(seed)
+    if isinstance(institutions, int):
+        institutions = rng.integers(500, 5000, size=institutions)
+    sizes = np.asarray(institutions, dtype=np.int32)
+
+    dates = np.datetime64(start_date, 'D') + np.arange(num_days)
+    # 1970-01-01 was a Thursday (weekday 3)
+    day_of_week = ((dates.astype(np.int64) + 3) % 7).astype(np.int8)
+    day_of_year = (dates - dates.astype('datetime64[Y]')).astype(np.int64) + 1
+    is_exam = _in_windows(day_of_year, exam_weeks)
+    is_holiday = _in_windows(day_of_year, holidays)
+
+    # Row order: institution, then date, then meal
+    num_institutions, num_meals = len(sizes), len(MEAL_TYPES)
+    per_institution = num_days * num_meals
+    num_rows = num_institutions * per_institution
+
+    day_index = np.tile(np.repeat(np.arange(num_days), num_meals), num_institutions)
+    institution = np.repeat(np.arange(num_institutions, dtype=np.int16), per_institution)
+    total_students = sizes[institution]
+
+    weekend = day_of_week[day_index] >= 5
+    base_rate = np.where(weekend, rng.uniform(0.6, 0.8, num_rows), rng.uniform(0.85, 0.98, num_rows))
+    base_rate = np.where(is_exam[day_index], np.minimum(base_rate * 1.04, 1.0), base_rate)
+    base_rate = np.where(is_holiday[day_index], base_rate * 0.35, base_rate)
+
+    noise = rng.normal(0, 20, num_rows) * (total_students / 2000)
+    actual_attendance = np.clip(total_students * base_rate + noise, 0, total_students).astype(np.int32)
+
+    return {
+        'date': dates[day_index],
+        'meal_type': np.tile(np.arange(num_meals, dtype=np.int8), num_institutions * num_days),
+        'day_of_week': day_of_week[day_index],
+        'total_students': total_students,
+        'institution': institution,
+        'is_exam': is_exam[day_index],
+        'is_holiday': is_holiday[day_index],
+        'actual_attendance': actual_attendance,
+    }
+
+
+def save_history(history, path):
+    """Write history columns to a single uncompressed .npz (one .npy per column)."""
+    with open(path, 'wb') as f:
+        np.savez(f, **history)
+
+
+def load_history(path):
+    """Read history columns written by save_history."""
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic attendance history dataset.')
+    parser.add_argument('output', help='Path of the .npz file to write')
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--institutions', type=int, default=1, help='Number of institutions with random sizes')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = generate_synthetic_history(num_days=args.days, institutions=args.institutions, seed=args.seed)
+    save_history(history, args.output)
+    print(f"Wrote {len(history['date'])} rows to '{args.output}' in {time.perf_counter() - started:.2f}s")
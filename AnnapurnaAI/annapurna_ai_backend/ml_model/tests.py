@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+from .features import FEATURES, LEGACY_FEATURES
+from .forest import CompiledForest
+from .synthetic import MEAL_TYPES
+from .train_model import compile_model, fit_model
+
+
+def meal_frame(rows, seed=0, meal_types=MEAL_TYPES):
+    """Random raw model inputs for `rows` meals, with every column of FEATURES."""
+    rng = np.random.default_rng(seed)
+    rates = rng.uniform(0, 1, size=rows)
+    return pd.DataFrame({
+        'meal_type': rng.choice(meal_types, size=rows),
+        'day_of_week': rng.integers(0, 7, size=rows),
+        'total_students': rng.integers(50, 3000, size=rows),
+        'is_holiday': rng.integers(0, 2, size=rows),
+        'is_exam': rng.integers(0, 2, size=rows),
+        'rate_lag_7': np.where(rates < 0.2, -1.0, rates),
+        'rate_rolling_7': rng.uniform(0, 1, size=rows),
+    })
+
+
+class CompiledForestParityTests(unittest.TestCase):
+    """The compiled forest the API serves must score meals exactly like the pipeline it was compiled from."""
+
+    def fit(self, features):
+        X = meal_frame(400)[list(features)]
+        rates = {'Breakfast': 0.6, 'Lunch': 0.85, 'Dinner': 0.75}
+        y = X['meal_type'].map(rates) * X['total_students'] * np.where(X['day_of_week'] >= 5, 0.7, 1.0)
+        model = fit_model(X, y, n_estimators=10)
+        return model, compile_model(model)
+
+    def assert_parity(self, model, compiled, X):
+        # Compiled forests take columns by name, so give them in reverse order
+        shuffled = X[list(reversed(X.columns))]
+        np.testing.assert_allclose(compiled.predict(shuffled), model.predict(X), rtol=1e-9)
+        np.testing.assert_allclose(
+            compiled.predict({name: shuffled[name].tolist() for name in shuffled}), model.predict(X), rtol=1e-9
+        )
+
+    def test_feature_store_model(self):
+        model, compiled = self.fit(FEATURES)
+        self.assertEqual(compiled.features, FEATURES)
+        self.assert_parity(model, compiled, meal_frame(200, seed=1)[list(FEATURES)])
+
+    def test_legacy_model(self):
+        model, compiled = self.fit(LEGACY_FEATURES)
+        self.assertEqual(compiled.features, LEGACY_FEATURES)
+        self.assert_parity(model, compiled, meal_frame(200, seed=1)[list(LEGACY_FEATURES)])
+
+    def test_unseen_meal_type(self):
+        model, compiled = self.fit(FEATURES)
+        X = meal_frame(100, seed=2, meal_types=MEAL_TYPES + ('Snacks',))[list(FEATURES)]
+        self.assertIn('Snacks', set(X['meal_type']))
+        self.assert_parity(model, compiled, X)
+
+    def test_predict_one(self):
+        model, compiled = self.fit(FEATURES)
+        X = meal_frame(5, seed=3)[list(FEATURES)]
+        expected = model.predict(X)
+        for (_, row), value in zip(X.iterrows(), expected):
+            self.assertAlmostEqual(compiled.predict_one(**row.to_dict()), value, places=6)
+
+    def test_saved_artifact(self):
+        model, compiled = self.fit(FEATURES)
+        X = meal_frame(100, seed=4)[list(FEATURES)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'annapurna_model.npz')
+            compiled.save(path)
+            loaded = CompiledForest.load(path)
+        self.assertEqual(loaded.features, FEATURES)
+        self.assert_parity(model, loaded, X)
@@ -5,48 +5,131 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 import joblib
+import argparse
 import datetime
+import json
 import os
 
+try:
+    from .features import FEATURES, lag_features
+    from .forest import CompiledForest
+    from .synthetic import MEAL_TYPES, generate_synthetic_history, load_history, save_history
+except ImportError:
+    # Running as a script: python ml_model/train_model.py
+    from features import FEATURES, lag_features
+    from forest import CompiledForest
+    from synthetic import MEAL_TYPES, generate_synthetic_history, load_history, save_history
 
-def train_and_save_model():
-    print("Starting model training process...")
 
-    # Generate synthetic training data
-    num_records = 730
-    start_date = datetime.date(2023, 1, 1)
-    dates = [start_date + datetime.timedelta(days=i) for i in range(num_records)]
-    meal_types = ['Breakfast', 'Lunch', 'Dinner']
-    total_students = 2000
-    data = []
-
-    for date in dates:
-        for meal in meal_types:
-            day_of_week = date.weekday()
-            # Weekend meals have lower attendance
-            if day_of_week >= 5:
-                base_attendance = total_students * np.random.uniform(0.6, 0.8)
-            else:
-                base_attendance = total_students * np.random.uniform(0.85, 0.98)
-
-            actual_attendance = int(base_attendance + np.random.normal(0, 20))
-            data.append({
-                'date': date,
-                'meal_type': meal,
-                'day_of_week': day_of_week,
-                'total_students': total_students,
-                'actual_attendance': actual_attendance
-            })
-
-    df = pd.DataFrame(data)
-    print(f"Generated {len(df)} records of synthetic data.")
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+CHECKPOINT_FILENAME = 'retrain_checkpoint.json'
+
+
+def is_forest(model):
+    """Whether a fitted model is a preprocessing + RandomForest pipeline, i.e. compilable and incrementally updatable."""
+    steps = getattr(model, 'named_steps', {})
+    return isinstance(steps.get('regressor'), RandomForestRegressor)
+
+
+def compile_model(model):
+    """
+    Flatten a fitted preprocessing + RandomForest pipeline into a CompiledForest.
+
+    One-hot columns produced by the ColumnTransformer are folded back into
+    equality tests on the raw meal_type code; passthrough columns map to
+    their raw feature index. The raw feature order is the one the pipeline
+    was fitted with, and is stored in the compiled artifact.
+    """
+    preprocessor = model.named_steps['preprocessor']
+    regressor = model.named_steps['regressor']
+    categories = preprocessor.named_transformers_['cat'].categories_[0]
+    features = tuple(str(name) for name in preprocessor.feature_names_in_)
+
+    # For every transformed column: (raw feature index, category code or -1)
+    column_map = []
+    for name, _, columns in preprocessor.transformers_:
+        if name == 'cat':
+            column_map.extend((features.index(columns[0]), code) for code in range(len(categories)))
+        elif name == 'remainder':
+            column_map.extend((features.index(column), -1) for column in columns)
+    column_map = np.array(column_map, dtype=np.int64)
+
+    feature, threshold, is_category, left, right, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in regressor.estimators_:
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+        mapped = column_map[np.where(is_leaf, 0, tree.feature)]
+
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, mapped[:, 0]))
+        is_category.append(~is_leaf & (mapped[:, 1] >= 0))
+        threshold.append(np.where(is_category[-1], mapped[:, 1], tree.threshold))
+        left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        value.append(tree.value[:, 0, 0])
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return CompiledForest(
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        is_category=np.concatenate(is_category),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.array(roots, dtype=np.int32),
+        max_depth=max_depth,
+        categories=categories,
+        features=features,
+    )
 
-    # Prepare features and target
-    features = ['meal_type', 'day_of_week', 'total_students']
-    target = 'actual_attendance'
-    X = df[features]
-    y = df[target]
 
+def export_compiled_model(model, X, path):
+    """Compile the pipeline, check it reproduces model.predict on X, and save it."""
+    compiled = compile_model(model)
+
+    # Distinct feature rows are enough, plus an unseen meal type to cover handle_unknown='ignore'
+    X = X.drop_duplicates()
+    check = pd.concat([X, X.head(1).assign(meal_type='Unknown')], ignore_index=True)
+    expected = model.predict(check)
+    actual = compiled.predict(check)
+    if not np.allclose(expected, actual):
+        raise ValueError("Compiled forest does not match the sklearn pipeline predictions.")
+
+    compiled.save(path)
+    print(f"Compiled model saved successfully as '{path}'")
+    return compiled
+
+
+def history_to_frame(history):
+    """
+    Turn generated history columns into the DataFrame the pipeline trains on.
+
+    Lag features are derived per institution and meal exactly as the daily
+    feature store derives them per kitchen and meal.
+    """
+    rates = history['actual_attendance'] / history['total_students']
+    groups = history['institution'].astype(np.int64) * len(MEAL_TYPES) + history['meal_type']
+    rate_lag_7, rate_rolling_7 = lag_features(groups, history['date'].astype(np.int64), rates)
+    return pd.DataFrame({
+        'date': history['date'],
+        'meal_type': np.asarray(MEAL_TYPES)[history['meal_type']],
+        'day_of_week': history['day_of_week'],
+        'total_students': history['total_students'],
+        'is_holiday': history['is_holiday'].astype(np.int8),
+        'is_exam': history['is_exam'].astype(np.int8),
+        'rate_lag_7': rate_lag_7,
+        'rate_rolling_7': rate_rolling_7,
+        'actual_attendance': history['actual_attendance']
+    })
+
+
+def build_pipeline(regressor):
+    """Unfitted pipeline one-hot encoding meal_type and passing the other raw features to regressor."""
     # Create preprocessing pipeline
     preprocessor = ColumnTransformer(
         transformers=[
@@ -56,20 +139,151 @@ def train_and_save_model():
     )
 
     # Create model pipeline
-    model = Pipeline(steps=[
+    return Pipeline(steps=[
         ('preprocessor', preprocessor),
-        ('regressor', RandomForestRegressor(n_estimators=100, random_state=42))
+        ('regressor', regressor)
     ])
 
-    print("Training the Random Forest model...")
+
+def fit_model(X, y, n_estimators=100):
+    """
+    Fit a fresh preprocessing + RandomForest pipeline.
+
+    Args:
+        X: DataFrame of raw features; its column order becomes the model's
+        y: Actual attendance for each row
+        n_estimators: Number of trees to grow
+    """
+    model = build_pipeline(RandomForestRegressor(n_estimators=n_estimators, random_state=42))
     model.fit(X, y)
+    return model
+
+
+def train_and_save_model(num_days=730, institutions=(2000,), seed=42, history_path=None):
+    print("Starting model training process...")
+
+    if history_path and os.path.exists(history_path):
+        history = load_history(history_path)
+        print(f"Loaded synthetic history from '{history_path}'.")
+    else:
+        history = generate_synthetic_history(num_days=num_days, institutions=institutions, seed=seed)
+        if history_path:
+            save_history(history, history_path)
+            print(f"Saved synthetic history to '{history_path}'.")
+
+    df = history_to_frame(history)
+    print(f"Generated {len(df)} records of synthetic data.")
+
+    # Prepare features and target
+    X = df[list(FEATURES)]
+    y = df['actual_attendance']
+
+    print("Training the Random Forest model...")
+    model = fit_model(X, y)
+
+    save_model(model, X)
+
+
+def _dump_atomic(model, path):
+    # Dump to a temporary file and rename, so a running server never loads a partial artifact
+    joblib.dump(model, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+
+def save_model(model, X, model_dir=MODEL_DIR, version=None):
+    """
+    Save the pipeline and its compiled form as the deployed model.
+
+    With a version, a copy is also kept as annapurna_model-v<version>.joblib.
+    Models other than random forests have no compiled form; any compiled
+    artifact left by an earlier forest is removed once the new model is in
+    place, so the registry serves the new pipeline.
+    """
+    if version is not None:
+        versioned_filename = os.path.join(model_dir, f'annapurna_model-v{version}.joblib')
+        _dump_atomic(model, versioned_filename)
+        print(f"Model version saved as '{versioned_filename}'")
+
+    compiled_filename = os.path.join(model_dir, 'annapurna_model.npz')
+    if is_forest(model):
+        # Export the compiled form first; the registry prefers it and reloads on change
+        export_compiled_model(model, X, compiled_filename)
 
-    # Save the model
-    model_dir = os.path.dirname(__file__)
     model_filename = os.path.join(model_dir, 'annapurna_model.joblib')
-    joblib.dump(model, model_filename)
+    _dump_atomic(model, model_filename)
     print(f"Model saved successfully as '{model_filename}'")
 
+    if not is_forest(model) and os.path.exists(compiled_filename):
+        os.remove(compiled_filename)
+        print(f"Removed the compiled forest '{compiled_filename}'")
+
+
+def load_checkpoint(model_dir=MODEL_DIR):
+    """Return the training checkpoint of a model directory, or {} if it has none."""
+    checkpoint_path = os.path.join(model_dir, CHECKPOINT_FILENAME)
+    if not os.path.exists(checkpoint_path):
+        return {}
+    with open(checkpoint_path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(model, version, last_trained_date, rows, model_dir=MODEL_DIR, **extra):
+    """
+    Record what the deployed model of a directory was trained on; retraining continues after last_trained_date.
+
+    Returns:
+        The checkpoint dictionary written
+    """
+    checkpoint = {
+        'version': version,
+        'last_trained_date': last_trained_date.isoformat(),
+        'trained_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'rows': rows,
+        **extra,
+    }
+    if is_forest(model):
+        checkpoint['trees'] = len(model.named_steps['regressor'].estimators_)
+    checkpoint_path = os.path.join(model_dir, CHECKPOINT_FILENAME)
+    with open(f'{checkpoint_path}.tmp', 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(f'{checkpoint_path}.tmp', checkpoint_path)
+    return checkpoint
+
+
+def update_model(model, X, y, new_trees=20, max_trees=300):
+    """
+    Incrementally update a fitted pipeline with new rows.
+
+    The fitted preprocessor is reused as-is, and new trees grown only on
+    the new rows are added to the forest with warm_start. Once the forest
+    has more than max_trees trees, the oldest ones are dropped, so the
+    model size and training cost stay bounded.
+
+    Raises:
+        ValueError: If the model is not a random forest pipeline
+    """
+    if not is_forest(model):
+        raise ValueError("Only random forest models can be updated incrementally.")
+    preprocessor = model.named_steps['preprocessor']
+    regressor = model.named_steps['regressor']
+
+    regressor.set_params(warm_start=True, n_estimators=len(regressor.estimators_) + new_trees)
+    regressor.fit(preprocessor.transform(X), y)
+
+    if len(regressor.estimators_) > max_trees:
+        regressor.estimators_ = regressor.estimators_[-max_trees:]
+        regressor.set_params(n_estimators=max_trees)
+    return model
+
 
 if __name__ == '__main__':
-    train_and_save_model()
+    parser = argparse.ArgumentParser(description='Train and save the attendance model.')
+    parser.add_argument('--days', type=int, default=730, help='Days of synthetic history (default: 730)')
+    parser.add_argument('--students', type=int, nargs='+', default=[2000],
+                        help='Student totals, one per institution (default: 2000)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--history', default=None,
+                        help='.npz history to train from; generated and saved there if missing')
+    args = parser.parse_args()
+
+    train_and_save_model(num_days=args.days, institutions=args.students, seed=args.seed, history_path=args.history)
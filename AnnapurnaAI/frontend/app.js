@@ -17,6 +17,8 @@ let selectedRating = 0;
 let selectedTags = [];
 let weeklyMenuCache = {}; 
 let prepSheetData = [];
+let dashboardStream = null;
+let dashboardMealType = null;
 
 // --- API Helper Function ---
 async function apiFetch(endpoint, options = {}) {
@@ -155,6 +157,7 @@ async function login(userType) {
 
 
 function logout() {
+    stopDashboardStream();
     localStorage.removeItem('access_token');
     localStorage.removeItem('refresh_token');
     currentUser = null;
@@ -230,19 +233,21 @@ async function updateStudentInfo() {
 }
 
 async function fetchStudentDashboardData() {
-    console.log("Fetching student dashboard data (menus and attendance)...");
+    console.log("Fetching student dashboard data (day view)...");
     const today = new Date().toISOString().split('T')[0];
     todaysMenus = {};
     mealStatuses = {};
 
     try {
-        const menuResponse = await apiFetch(`/menus/?meal_date=${today}`);
-        if (!menuResponse.ok) throw new Error("Failed to fetch today's menus.");
-        const menusToday = await menuResponse.json();
+        // One request returns today's menus with this student's skip state inlined
+        const dayResponse = await apiFetch(`/student/day/?date=${today}`);
+        if (!dayResponse.ok) throw new Error("Failed to fetch today's menus.");
+        const dayData = await dayResponse.json();
+        const menusToday = dayData.menus;
 
-        // Debug: Print ALL menu types returned from backend
-        menusToday.forEach(menu => {
-            console.log("Returned menu type (raw):", menu.meal_type);
+        // Default: assume attending, unless the menu is marked as skipped
+        ['breakfast', 'lunch', 'dinner'].forEach(mt => {
+            mealStatuses[mt] = { status: 'attending', attendance_id: null, menu_id: null };
         });
 
         // Normalize and map menus for accurate matching
@@ -251,6 +256,11 @@ async function fetchStudentDashboardData() {
             const mealTypeKey = menu.meal_type.trim().toLowerCase();
             if (!['breakfast', 'lunch', 'dinner'].includes(mealTypeKey)) return;
             todaysMenus[mealTypeKey] = menu.id;
+            mealStatuses[mealTypeKey] = {
+                status: menu.skipped ? 'skipped' : 'attending',
+                attendance_id: menu.attendance_id,
+                menu_id: menu.id
+            };
 
             // UI update: show meal name if DOM present
             const mealSection = document.getElementById(mealTypeKey);
@@ -264,33 +274,6 @@ async function fetchStudentDashboardData() {
         // Debug: log constructed menu map
         console.log("todaysMenus mapping:", todaysMenus);
 
-        // Fetch attendance for today
-        const attendanceResponse = await apiFetch(`/attendance/?menu__meal_date=${today}`);
-        if (!attendanceResponse.ok) throw new Error("Failed to fetch attendance.");
-        const attendanceToday = await attendanceResponse.json();
-
-        // Default: assume attending, unless attendance marks as skipped
-        ['breakfast', 'lunch', 'dinner'].forEach(mt => {
-            mealStatuses[mt] = {
-                status: 'attending',
-                attendance_id: null,
-                menu_id: todaysMenus[mt] || null
-            };
-        });
-
-        // For each attendance, switch to skipped if found
-        attendanceToday.forEach(att => {
-            // Defensive: backend may send null or string
-            const matchingMeal = Object.keys(todaysMenus).find(key => String(todaysMenus[key]) === String(att.menu));
-            if (matchingMeal && att.id !== undefined) {
-                mealStatuses[matchingMeal] = {
-                    status: 'skipped',
-                    attendance_id: att.id,
-                    menu_id: att.menu
-                };
-            }
-        });
-
         // Debug: see resulting meal status mapping
         console.log("mealStatuses mapping:", mealStatuses);
 
@@ -640,6 +623,9 @@ async function showManagerView(viewId) {
     if (viewId === 'dashboard') {
         await updateManagerDashboard();
         initializeCharts();
+        startDashboardStream();
+    } else {
+        stopDashboardStream();
     }
 }
 
@@ -657,15 +643,8 @@ async function updateManagerDashboard() {
         console.log("Backend data received:", data);
 
         // Update live metrics with REAL data
-        const headcountEl = document.querySelector('.headcount-number');
-        const headcountTotalEl = document.querySelector('.headcount-total');
-        
-        if (headcountEl) headcountEl.textContent = data.live_data.live_headcount;
-        if (headcountTotalEl) headcountTotalEl.textContent = `out of ${data.live_data.total_students}`;
-        
-        const percentage = (data.live_data.live_headcount / data.live_data.total_students) * 100;
-        const progressEl = document.querySelector('.headcount-display + .progress-bar .progress');
-        if (progressEl) progressEl.style.width = `${percentage}%`;
+        dashboardMealType = data.meal_details.type;
+        renderLiveHeadcount(data.live_data.live_headcount, data.live_data.total_students);
         
         const metricValues = document.querySelectorAll('.metric-value');
         if (metricValues[0]) metricValues[0].textContent = `₹${data.financials.projected_daily_savings}`;
@@ -693,6 +672,45 @@ async function updateManagerDashboard() {
 }
 
 
+function renderLiveHeadcount(liveHeadcount, totalStudents) {
+    const headcountEl = document.querySelector('.headcount-number');
+    const headcountTotalEl = document.querySelector('.headcount-total');
+    
+    if (headcountEl) headcountEl.textContent = liveHeadcount;
+    if (headcountTotalEl) headcountTotalEl.textContent = `out of ${totalStudents}`;
+    
+    const percentage = totalStudents ? (liveHeadcount / totalStudents) * 100 : 0;
+    const progressEl = document.querySelector('.headcount-display + .progress-bar .progress');
+    if (progressEl) progressEl.style.width = `${percentage}%`;
+}
+
+// --- Live Dashboard Stream (Server-Sent Events) ---
+function applyDashboardEvent(event) {
+    const data = JSON.parse(event.data);
+    const meal = data.meals.find(m => m.type === dashboardMealType);
+    if (meal) {
+        renderLiveHeadcount(meal.live_headcount, data.total_students);
+    }
+}
+
+function startDashboardStream() {
+    const token = localStorage.getItem('access_token');
+    if (dashboardStream || !token || !window.EventSource) return;
+
+    // EventSource reconnects on its own, using the retry interval sent by the server
+    dashboardStream = new EventSource(`${API_BASE_URL}/dashboard/stream/?token=${encodeURIComponent(token)}`);
+    dashboardStream.addEventListener('snapshot', applyDashboardEvent);
+    dashboardStream.addEventListener('delta', applyDashboardEvent);
+    dashboardStream.onerror = () => console.warn('Dashboard stream interrupted, reconnecting...');
+}
+
+function stopDashboardStream() {
+    if (dashboardStream) {
+        dashboardStream.close();
+        dashboardStream = null;
+    }
+}
+
 function showManagerProfile() {
     showNotification('Manager profile feature coming soon!', 'info');
 }
@@ -1066,26 +1084,3 @@ document.addEventListener('keydown', function(e) {
     }
 });
 
-// Simulate real-time updates for manager dashboard
-setInterval(() => {
-    // This interval is now less important because we fetch real data
-    // but we can leave it to simulate live updates
-    if (currentUserType === 'manager' && currentManagerView === 'dashboard') {
-        const headcountEl = document.querySelector('.headcount-number');
-        if (headcountEl) {
-            const currentHeadcount = parseInt(headcountEl.textContent);
-            if (isNaN(currentHeadcount)) return; // Don't run if data isn't loaded
-            const newHeadcount = currentHeadcount + Math.floor(Math.random() * 5) - 2;
-            const totalText = document.querySelector('.headcount-total') ? document.querySelector('.headcount-total').textContent : '';
-            const totalStudents = parseInt(totalText.split(' ')[2]) || 0;
-            const clampedHeadcount = Math.max(0, Math.min(totalStudents || newHeadcount, newHeadcount));
-
-            headcountEl.textContent = clampedHeadcount;
-            const percentage = totalStudents ? (clampedHeadcount / totalStudents) * 100 : 0;
-            const progressEl = document.querySelector('.headcount-display + .progress-bar .progress');
-            if (progressEl) {
-                progressEl.style.width = `${percentage}%`;
-            }
-        }
-    }
-}, 30000); // Update every 30 seconds